@@ -0,0 +1,159 @@
+"""
+Content-addressed artifacts (STL, G-code, other project files) served over HTTP.
+
+cad_data used to carry the whole STL base64-encoded inside the Socket.IO
+event: a 20 MB model became ~27 MB of JSON text per emit. Instead the file is
+registered here under the SHA-256 of its contents and clients get a small
+{"url", "hash", ...} payload to fetch it from GET /artifacts/<hash>.
+
+Responses are FileResponses (sendfile / pathsend where the server supports it,
+Range requests included) with the hash as a strong ETag and an immutable
+Cache-Control, so a repeat view of the same model is a browser cache hit or at
+worst a 304. Only files registered by the server can be fetched; a hash whose
+file has since changed or been removed is a 404.
+"""
+
+import hashlib
+import mimetypes
+import os
+from collections import OrderedDict
+
+from fastapi.responses import FileResponse, Response
+
+from executors import TOOLS, run_in
+
+URL_PREFIX = "/artifacts"
+
+MEDIA_TYPES = {
+    ".stl": "model/stl",
+    ".gcode": "text/x-gcode",
+    ".3mf": "model/3mf",
+}
+
+
+def file_digest(path, chunk_size=1024 * 1024) -> str:
+    """SHA-256 of a file's contents (hex)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class Artifact:
+    def __init__(self, digest, path, stat_result):
+        self.digest = digest
+        self.path = os.path.abspath(path)
+        self.name = os.path.basename(path)
+        self.stat_result = stat_result
+
+    @property
+    def size(self):
+        return self.stat_result.st_size
+
+    @property
+    def format(self):
+        return os.path.splitext(self.name)[1].lstrip(".").lower()
+
+    @property
+    def url(self):
+        return f"{URL_PREFIX}/{self.digest}"
+
+    def unchanged(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return False
+        return st.st_size == self.stat_result.st_size and st.st_mtime_ns == self.stat_result.st_mtime_ns
+
+    def to_payload(self) -> dict:
+        """What cad_data carries instead of the file itself."""
+        return {"format": self.format, "url": self.url, "hash": self.digest, "filename": self.name, "size": self.size}
+
+
+class ArtifactStore:
+    def __init__(self, max_entries=256):
+        """
+        :param max_entries: Artifacts remembered before the least recently used one is forgotten.
+        """
+        self.max_entries = max_entries
+        self._by_digest = OrderedDict()
+        self._by_path = {} # abspath -> Artifact (skip re-hashing an unchanged file)
+
+        self.added = 0
+        self.hashed_bytes = 0
+        self.served = 0
+        self.not_modified = 0
+        self.missing = 0
+
+    def __len__(self):
+        return len(self._by_digest)
+
+    async def add(self, path) -> Artifact:
+        """Register a file and return its Artifact. Hashing runs on the tools pool."""
+        abspath = os.path.abspath(path)
+        known = self._by_path.get(abspath)
+        if known is not None and known.unchanged():
+            self._by_digest[known.digest] = known
+            self._by_digest.move_to_end(known.digest)
+            return known
+        stat_result = os.stat(abspath)
+        digest = await run_in(TOOLS, file_digest, abspath)
+        artifact = Artifact(digest, abspath, stat_result)
+        self._by_digest[digest] = artifact
+        self._by_digest.move_to_end(digest)
+        self._by_path[abspath] = artifact
+        self.added += 1
+        self.hashed_bytes += stat_result.st_size
+        while len(self._by_digest) > self.max_entries:
+            _, old = self._by_digest.popitem(last=False)
+            if self._by_path.get(old.path) is old:
+                del self._by_path[old.path]
+        return artifact
+
+    def resolve(self, digest):
+        """The Artifact for `digest`, or None if unknown or its file no longer matches."""
+        artifact = self._by_digest.get(digest)
+        if artifact is None:
+            return None
+        if not artifact.unchanged():
+            del self._by_digest[digest]
+            if self._by_path.get(artifact.path) is artifact:
+                del self._by_path[artifact.path]
+            return None
+        self._by_digest.move_to_end(digest)
+        return artifact
+
+    def response(self, digest, if_none_match=None):
+        """HTTP response for GET /artifacts/<digest>: the file, a 304 or a 404."""
+        artifact = self.resolve(digest)
+        if artifact is None:
+            self.missing += 1
+            return Response(status_code=404)
+        etag = f'"{artifact.digest}"'
+        headers = {"etag": etag, "cache-control": "public, max-age=31536000, immutable"}
+        if if_none_match:
+            tags = [t.strip() for t in if_none_match.split(",")]
+            if "*" in tags or etag in tags or f"W/{etag}" in tags:
+                self.not_modified += 1
+                return Response(status_code=304, headers=headers)
+        self.served += 1
+        media_type = MEDIA_TYPES.get(os.path.splitext(artifact.name)[1].lower()) or mimetypes.guess_type(artifact.name)[0]
+        return FileResponse(
+            artifact.path,
+            headers=headers,
+            media_type=media_type or "application/octet-stream",
+            filename=artifact.name,
+            content_disposition_type="inline",
+            stat_result=artifact.stat_result,
+        )
+
+    def stats(self) -> dict:
+        return {
+            "artifacts": len(self._by_digest),
+            "added": self.added,
+            "hashed_bytes": self.hashed_bytes,
+            "served": self.served,
+            "not_modified": self.not_modified,
+            "missing": self.missing,
+        }
@@ -0,0 +1,245 @@
+"""
+Callback-driven microphone capture.
+
+PortAudio calls our stream callback on its own thread for every buffer; the
+callback copies the PCM into a preallocated ring and, only if the asyncio
+reader is parked, wakes it with loop.call_soon_threadsafe. This replaces one
+worker-thread hop (stream.read) per chunk.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import pyaudio
+
+from executors import AUDIO, run_in
+
+
+class PcmRingBuffer:
+    """
+    Preallocated single-producer / single-consumer byte ring.
+
+    The producer (PortAudio thread) only advances `_write_pos` and the consumer
+    (event loop) only advances `_read_pos`; both are monotonically increasing
+    byte counters, so no lock is needed. When the ring is full the incoming
+    block is dropped (the producer never moves the read side).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._view = memoryview(self._buf)
+        self._write_pos = 0
+        self._read_pos = 0
+        self.overflows = 0
+        self.dropped_bytes = 0
+
+    def available(self) -> int:
+        return self._write_pos - self._read_pos
+
+    def free(self) -> int:
+        return self.capacity - self.available()
+
+    @property
+    def write_pos(self) -> int:
+        return self._write_pos
+
+    def write(self, data: bytes) -> bool:
+        n = len(data)
+        if n > self.capacity - self.available():
+            self.overflows += 1
+            self.dropped_bytes += n
+            return False
+        start = self._write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        self._view[start:start + first] = data[:first]
+        if first < n:
+            self._view[0:n - first] = data[first:]
+        # Publish only after the copy is complete
+        self._write_pos += n
+        return True
+
+    def read(self, n: int):
+        """Return exactly n bytes, or None if fewer are buffered."""
+        if self.available() < n:
+            return None
+        start = self._read_pos % self.capacity
+        first = min(n, self.capacity - start)
+        if first == n:
+            out = bytes(self._view[start:start + n])
+        else:
+            out = bytes(self._view[start:]) + bytes(self._view[0:n - first])
+        self._read_pos += n
+        return out
+
+    def discard(self, upto=None):
+        """Drop buffered bytes up to write position `upto` (default: everything). Consumer side only."""
+        target = self._write_pos if upto is None else min(upto, self._write_pos)
+        if target > self._read_pos:
+            self._read_pos = target
+
+
+class ReconnectBuffer:
+    """
+    Holds mic chunks captured while no Live session is connected.
+
+    Bounded to `max_seconds` of audio; once full the oldest chunk is dropped
+    so what gets flushed to the new session is the most recent speech.
+    Event-loop side only.
+    """
+
+    def __init__(self, max_seconds=5.0, bytes_per_second=32000):
+        self.max_bytes = int(max_seconds * bytes_per_second)
+        self.bytes_per_second = bytes_per_second
+        self._chunks = deque()
+        self._bytes = 0
+        self.buffered_bytes = 0
+        self.dropped_bytes = 0
+        self.flushed_bytes = 0
+        self.flushes = 0
+
+    def __len__(self):
+        return len(self._chunks)
+
+    def push(self, data: bytes):
+        self._chunks.append(data)
+        self._bytes += len(data)
+        self.buffered_bytes += len(data)
+        while self._bytes > self.max_bytes and self._chunks:
+            old = self._chunks.popleft()
+            self._bytes -= len(old)
+            self.dropped_bytes += len(old)
+
+    def drain(self):
+        """Return and forget everything buffered, oldest first."""
+        chunks = list(self._chunks)
+        self._chunks.clear()
+        if chunks:
+            self.flushes += 1
+            self.flushed_bytes += self._bytes
+        self._bytes = 0
+        return chunks
+
+    def clear(self):
+        self._chunks.clear()
+        self._bytes = 0
+
+    def stats(self) -> dict:
+        return {
+            "pending_ms": round(1000.0 * self._bytes / self.bytes_per_second, 1),
+            "buffered_bytes": self.buffered_bytes,
+            "flushed_bytes": self.flushed_bytes,
+            "dropped_bytes": self.dropped_bytes,
+            "flushes": self.flushes,
+        }
+
+
+class CallbackMicCapture:
+    """
+    Opens the input stream in callback mode and exposes an awaitable read().
+
+    Counters:
+      - input_overflows / input_underflows: status flags reported by PortAudio
+      - ring_overflows / dropped_bytes: blocks lost because the reader fell behind
+      - stalls: reads that waited longer than two buffer periods for data
+    """
+
+    def __init__(self, pya, chunk_size=1024, rate=16000, channels=1, format=pyaudio.paInt16,
+                 input_device_index=None, buffer_chunks=32):
+        self.pya = pya
+        self.chunk_size = chunk_size
+        self.rate = rate
+        self.channels = channels
+        self.format = format
+        self.input_device_index = input_device_index
+        self.chunk_bytes = chunk_size * channels * pyaudio.get_sample_size(format)
+        self.ring = PcmRingBuffer(self.chunk_bytes * buffer_chunks)
+
+        self.stream = None
+        self._loop = None
+        self._data_ready = None
+        self._waiting = False
+
+        self.input_overflows = 0
+        self.input_underflows = 0
+        self.stalls = 0
+        self.chunks_read = 0
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._data_ready = asyncio.Event()
+        self.stream = await run_in(
+            AUDIO,
+            self.pya.open,
+            format=self.format,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            input_device_index=self.input_device_index,
+            frames_per_buffer=self.chunk_size,
+            stream_callback=self._callback,
+        )
+        return self.stream
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        # Runs on the PortAudio thread: keep it short and never block
+        if status_flags & pyaudio.paInputOverflow:
+            self.input_overflows += 1
+        if status_flags & pyaudio.paInputUnderflow:
+            self.input_underflows += 1
+        if in_data:
+            self.ring.write(in_data)
+        if self._waiting:
+            self._waiting = False
+            self._loop.call_soon_threadsafe(self._data_ready.set)
+        return (None, pyaudio.paContinue)
+
+    async def read(self) -> bytes:
+        """Wait for and return the next chunk_size frames of PCM."""
+        data = self.ring.read(self.chunk_bytes)
+        if data is not None:
+            self.chunks_read += 1
+            return data
+
+        wait_start = time.monotonic()
+        while data is None:
+            self._data_ready.clear()
+            self._waiting = True
+            # Re-check after arming the flag so a write that raced us is not missed
+            data = self.ring.read(self.chunk_bytes)
+            if data is not None:
+                self._waiting = False
+                break
+            await self._data_ready.wait()
+            data = self.ring.read(self.chunk_bytes)
+
+        if time.monotonic() - wait_start > 2 * self.chunk_size / self.rate:
+            self.stalls += 1
+        self.chunks_read += 1
+        return data
+
+    def discard_buffered(self):
+        """Throw away queued audio (e.g. while muted) so reads resume at 'now'."""
+        self.ring.discard()
+
+    def stats(self) -> dict:
+        return {
+            "mode": "callback",
+            "chunks_read": self.chunks_read,
+            "buffered_bytes": self.ring.available(),
+            "input_overflows": self.input_overflows,
+            "input_underflows": self.input_underflows,
+            "ring_overflows": self.ring.overflows,
+            "dropped_bytes": self.ring.dropped_bytes,
+            "stalls": self.stalls,
+        }
+
+    def close(self):
+        if self.stream:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
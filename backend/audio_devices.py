@@ -0,0 +1,112 @@
+"""
+Cached PortAudio device lookup.
+
+Enumerating devices with get_device_count() / get_device_info_by_index() is
+slow on some hosts (each call can probe the driver), and AudioLoop used to do
+it on every Gemini reconnect. The manager enumerates once, remembers how a
+requested input name/index resolved and what native format the device
+reported, and only re-enumerates when asked to (e.g. after a failed open).
+"""
+
+
+class AudioDeviceManager:
+    def __init__(self, pya, default_rate=16000, default_channels=1):
+        self.pya = pya
+        self.default_rate = default_rate
+        self.default_channels = default_channels
+        self._devices = None
+        self._default_input = None
+        self._resolved_inputs = {}
+        self._formats = {}
+        self.enumerations = 0
+
+    def refresh(self):
+        """Forget everything; the next lookup re-enumerates (devices plugged/unplugged)."""
+        self._devices = None
+        self._default_input = None
+        self._resolved_inputs.clear()
+        self._formats.clear()
+
+    def devices(self):
+        """All device info dicts, enumerated once."""
+        if self._devices is None:
+            self.enumerations += 1
+            devices = []
+            for i in range(self.pya.get_device_count()):
+                try:
+                    devices.append(self.pya.get_device_info_by_index(i))
+                except Exception:
+                    continue
+            self._devices = devices
+        return self._devices
+
+    def device_info(self, index):
+        for info in self.devices():
+            if info.get("index") == index:
+                return info
+        return self.pya.get_device_info_by_index(index)
+
+    def default_input_index(self):
+        if self._default_input is None:
+            self._default_input = self.pya.get_default_input_device_info()["index"]
+        return self._default_input
+
+    def resolve_input(self, name=None, index=None):
+        """
+        Device index for a requested input: name match first, then explicit
+        index, then the system default. Results are cached per request.
+        """
+        key = (name, index)
+        if key in self._resolved_inputs:
+            return self._resolved_inputs[key]
+
+        resolved = None
+        if name:
+            print(f"[Jarvis] Attempting to find input device matching: '{name}'")
+            wanted = name.lower()
+            for info in self.devices():
+                if info.get("maxInputChannels", 0) <= 0:
+                    continue
+                dev_name = info.get("name", "")
+                # Simple case-insensitive check, first match wins
+                if wanted in dev_name.lower() or dev_name.lower() in wanted:
+                    resolved = info["index"]
+                    print(f"[Jarvis] Resolved input device '{name}' to index {resolved} ({dev_name})")
+                    break
+            if resolved is None:
+                print(f"[Jarvis] Could not find device matching '{name}'. Checking index...")
+
+        if resolved is None and index is not None:
+            try:
+                resolved = int(index)
+                print(f"[Jarvis] Requesting Input Device Index: {resolved}")
+            except ValueError:
+                print(f"[Jarvis] Invalid device index '{index}', reverting to default.")
+
+        if resolved is None:
+            print("[Jarvis] Using Default Input Device")
+            resolved = self.default_input_index()
+
+        self._resolved_inputs[key] = resolved
+        return resolved
+
+    def input_format(self, index):
+        """(rate, channels) the input device natively runs at, channels capped at stereo."""
+        if index not in self._formats:
+            rate, channels = self.default_rate, self.default_channels
+            try:
+                info = self.device_info(index)
+                rate = int(info.get("defaultSampleRate", rate))
+                # Cap at stereo: multi-channel interfaces are downmixed anyway
+                channels = max(1, min(int(info.get("maxInputChannels", channels)), 2))
+            except Exception as e:
+                print(f"[Jarvis] [WARN] Could not query input device format: {e}")
+            self._formats[index] = (rate, channels)
+        return self._formats[index]
+
+    def stats(self):
+        return {
+            "enumerations": self.enumerations,
+            "devices": len(self._devices) if self._devices is not None else None,
+            "resolved_inputs": len(self._resolved_inputs),
+        }
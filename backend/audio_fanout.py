@@ -0,0 +1,106 @@
+"""
+Batched model-audio fan-out to the frontend.
+
+on_audio_data used to emit every PCM chunk as {'data': list(bytes)}, a JSON
+array of ints several times the size of the audio, encoded on the event
+loop. AudioFanout collects chunks and emits once per `interval` as either:
+
+  - "binary":   {'pcm': <bytes>, 'rate', 'seq'}  sent as a Socket.IO binary attachment
+  - "envelope": {'envelope': <bytes>, 'seq'}      `envelope_bins` peak levels (0-255)
+                                                  for clients that only draw the visualizer
+"""
+
+import asyncio
+
+import numpy as np
+
+FANOUT_MODES = ("binary", "envelope")
+
+
+def pcm16_envelope(data: bytes, bins: int = 64) -> bytes:
+    """Peak |amplitude| of int16 PCM over `bins` equal slices, scaled to 0-255."""
+    count = len(data) // 2
+    out = np.zeros(bins, dtype=np.uint8)
+    if count == 0:
+        return out.tobytes()
+    samples = np.abs(np.frombuffer(data, dtype="<i2", count=count).astype(np.int32))
+    per_bin = -(-count // bins)
+    padded = np.zeros(per_bin * bins, dtype=np.int32)
+    padded[:count] = samples
+    peaks = padded.reshape(bins, per_bin).max(axis=1)
+    out[:] = np.minimum(peaks * 255 // 32768, 255)
+    return out.tobytes()
+
+
+class AudioFanout:
+    """
+    Coalesces audio chunks and emits them on a fixed cadence.
+
+    push() is called from the event loop for every chunk; the first chunk of
+    a batch arms a timer and the batch is emitted when it fires, so there is
+    at most one emit per `interval` and none while the model is silent.
+    """
+
+    def __init__(self, emit, interval=0.05, mode="binary", envelope_bins=64, sample_rate=24000):
+        """
+        :param emit: async callable taking the payload dict (e.g. partial(sio.emit, 'audio_data')).
+        :param interval: Seconds between emits while audio is flowing.
+        :param mode: "binary" (raw PCM attachment) or "envelope" (visualizer levels only).
+        """
+        if mode not in FANOUT_MODES:
+            raise ValueError(f"Unknown audio fan-out mode '{mode}', expected one of {FANOUT_MODES}")
+        self.emit = emit
+        self.interval = interval
+        self.mode = mode
+        self.envelope_bins = envelope_bins
+        self.sample_rate = sample_rate
+
+        self._pending = []
+        self._timer = None
+        self._seq = 0
+
+        self.chunks_in = 0
+        self.bytes_in = 0
+        self.emits = 0
+        self.bytes_out = 0
+
+    def push(self, data: bytes):
+        self.chunks_in += 1
+        self.bytes_in += len(data)
+        self._pending.append(data)
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.interval, self._flush)
+
+    def _flush(self):
+        self._timer = None
+        if not self._pending:
+            return
+        pcm = self._pending[0] if len(self._pending) == 1 else b"".join(self._pending)
+        self._pending = []
+        self._seq += 1
+        if self.mode == "envelope":
+            body = pcm16_envelope(pcm, self.envelope_bins)
+            payload = {"envelope": body, "seq": self._seq}
+        else:
+            body = pcm
+            payload = {"pcm": body, "rate": self.sample_rate, "seq": self._seq}
+        self.emits += 1
+        self.bytes_out += len(body)
+        asyncio.create_task(self.emit(payload))
+
+    def close(self):
+        """Stop the timer and drop anything not yet emitted."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending = []
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "interval_ms": round(self.interval * 1000, 1),
+            "chunks_in": self.chunks_in,
+            "bytes_in": self.bytes_in,
+            "emits": self.emits,
+            "bytes_out": self.bytes_out,
+        }
@@ -8,20 +8,25 @@ import base64
 import numpy as np
 import urllib.request
 
+from camera_broker import get_camera_broker
+from executors import VISION, run_in
+
 class FaceAuthenticator:
     # MediaPipe Face Landmarker model URL
     MODEL_URL = "https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task"
     MODEL_PATH = os.path.join(os.path.dirname(__file__), "face_landmarker.task")
     
-    def __init__(self, reference_image_path="reference.jpg", on_status_change=None, on_frame=None):
+    def __init__(self, reference_image_path="reference.jpg", on_status_change=None, on_frame=None, camera_broker=None):
         """
         :param reference_image_path: Path to the user's reference photo.
         :param on_status_change: Async callback(is_authenticated: bool).
         :param on_frame: Async callback(frame_data_b64: str) to send frames to frontend.
+        :param camera_broker: Shared CameraBroker (defaults to the process-wide one).
         """
         self.reference_image_path = reference_image_path
         self.on_status_change = on_status_change
         self.on_frame = on_frame
+        self.camera = camera_broker or get_camera_broker()
         
         self.authenticated = False
         self.running = False
@@ -149,7 +154,7 @@ class FaceAuthenticator:
         loop = asyncio.get_running_loop()
         
         # Use a separate thread for blocking camera/CV operations
-        await asyncio.to_thread(self._run_cv_loop, loop)
+        await run_in(VISION, self._run_cv_loop, loop)
 
         print("[AUTH] Authentication loop finished.")
     
@@ -158,64 +163,44 @@ class FaceAuthenticator:
         self.running = False
 
     def _run_cv_loop(self, loop):
-        def try_open_camera(index):
-            print(f"[AUTH] Trying to open camera with index {index}...")
-            cap = cv2.VideoCapture(index, cv2.CAP_AVFOUNDATION)
-            if not cap.isOpened():
-                print(f"[AUTH] [ERR] Could not open video device {index}.")
-                return None
-            
-            ret, frame = cap.read()
-            if not ret:
-                 print(f"[AUTH] [ERR] Opened device {index} but failed to read first frame.")
-                 cap.release()
-                 return None
-            
-            print(f"[AUTH] [OK] Successfully opened and read from device {index}.")
-            return cap
-
-        video_capture = try_open_camera(0)
-        
-        if video_capture is None:
-             print("[AUTH] Device 0 failed. Trying device 1...")
-             video_capture = try_open_camera(1)
+        # Frames come from the shared broker (which tries device 0 then 1); we never open the camera ourselves
+        subscription = self.camera.subscribe("auth")
 
-        if video_capture is None:
-             print("[AUTH] [ERR] All camera attempts failed. Authentication cannot proceed.")
-             self.running = False
-             return
-
-        process_this_frame = True
+        try:
+            process_this_frame = True
         
-        while self.running and not self.authenticated:
-            ret, frame = video_capture.read()
-            if not ret:
-                print("[AUTH] [ERR] Failed to read frame from camera loop.")
-                break
+            while self.running and not self.authenticated:
+                frame = subscription.wait_next(timeout=1.0)
+                if frame is None:
+                    if not self.camera.running:
+                        print("[AUTH] [ERR] Camera unavailable. Authentication cannot proceed.")
+                        self.running = False
+                        break
+                    continue
             
-            # Convert BGR to RGB
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                # Convert BGR to RGB
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
-            # Process every other frame for performance
-            if process_this_frame:
-                current_landmarks = self._extract_landmarks(rgb_frame)
+                # Process every other frame for performance
+                if process_this_frame:
+                    current_landmarks = self._extract_landmarks(rgb_frame)
                 
-                if self._compare_landmarks(self.reference_landmarks, current_landmarks):
-                    self.authenticated = True
-                    print("[AUTH] [OPEN] FACE RECOGNIZED! Access Granted.")
-                    if self.on_status_change:
-                        asyncio.run_coroutine_threadsafe(self.on_status_change(True), loop)
-                    self.running = False
-                    break
-
-            process_this_frame = not process_this_frame
-
-            # Send frame to frontend if callback exists
-            if self.on_frame:
-                small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
-                _, buffer = cv2.imencode('.jpg', small_frame)
-                b64_str = base64.b64encode(buffer).decode('utf-8')
+                    if self._compare_landmarks(self.reference_landmarks, current_landmarks):
+                        self.authenticated = True
+                        print("[AUTH] [OPEN] FACE RECOGNIZED! Access Granted.")
+                        if self.on_status_change:
+                            asyncio.run_coroutine_threadsafe(self.on_status_change(True), loop)
+                        self.running = False
+                        break
+
+                process_this_frame = not process_this_frame
+
+                # Send frame to frontend if callback exists
+                if self.on_frame:
+                    small_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)
+                    _, buffer = cv2.imencode('.jpg', small_frame)
+                    b64_str = base64.b64encode(buffer).decode('utf-8')
                 
-                asyncio.run_coroutine_threadsafe(self.on_frame(b64_str), loop)
-
-        video_capture.release()
+                    asyncio.run_coroutine_threadsafe(self.on_frame(b64_str), loop)
+        finally:
+            subscription.close()
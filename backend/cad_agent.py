@@ -1,6 +1,5 @@
 import os
 import json
-import asyncio
 from datetime import datetime
 from google import genai
 from google.genai import types
@@ -9,11 +8,14 @@ from dotenv import load_dotenv
 from pydantic import BaseModel, Field
 from typing import List, Optional
 
+from executors import CAD, run_in
+
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 
 class CadAgent:
-    def __init__(self, on_thought=None, on_status=None):
-        self.client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
+    def __init__(self, on_thought=None, on_status=None, client=None):
+        # A shared genai client can be passed in (one per process instead of one per session)
+        self.client = client or genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
         # Using Gemini 2.5 Pro for thinking/streaming support
         self.model = "gemini-3-pro-preview"
         self.on_thought = on_thought  # Callback for streaming thoughts 
@@ -160,7 +162,8 @@ export_stl(result_part, 'output.stl')
                 
                 # Use the current Python interpreter (unified environment with build123d + mediapipe)
                 try:
-                    proc = await asyncio.to_thread(
+                    proc = await run_in(
+                        CAD,
                         subprocess.run,
                         [sys.executable, script_path],
                         capture_output=True,
@@ -205,15 +208,10 @@ Original request: {prompt}
                 # 5. Read Output
                 if os.path.exists(output_stl):
                     print(f"[CadAgent DEBUG] [file] '{output_stl}' found.")
-                    with open(output_stl, "rb") as f:
-                        stl_data = f.read()
-                        
-                    import base64
-                    b64_stl = base64.b64encode(stl_data).decode('utf-8')
-                    
+                    # The server registers the file as an artifact; the STL itself
+                    # is fetched over HTTP instead of travelling inside cad_data
                     return {
                         "format": "stl",
-                        "data": b64_stl,
                         "file_path": output_stl
                     }
                 else:
@@ -376,10 +374,11 @@ Ensure you still export to 'output.stl'.
                 import subprocess
                 import sys
                 
-                # Use asyncio.to_thread for Windows compatibility (asyncio.create_subprocess_exec
+                # Use a worker thread (CAD pool) for Windows compatibility (asyncio.create_subprocess_exec
                 # throws NotImplementedError on Windows with certain event loop policies)
                 try:
-                    proc = await asyncio.to_thread(
+                    proc = await run_in(
+                        CAD,
                         subprocess.run,
                         [sys.executable, script_path],
                         capture_output=True,
@@ -411,15 +410,10 @@ Ensure you still export to 'output.stl'.
                 # 5. Read Output
                 if os.path.exists(output_stl):
                     print(f"[CadAgent DEBUG] [file] '{output_stl}' found.")
-                    with open(output_stl, "rb") as f:
-                        stl_data = f.read()
-                        
-                    import base64
-                    b64_stl = base64.b64encode(stl_data).decode('utf-8')
-                    
+                    # The server registers the file as an artifact; the STL itself
+                    # is fetched over HTTP instead of travelling inside cad_data
                     return {
                         "format": "stl",
-                        "data": b64_stl,
                         "file_path": output_stl
                     }
                 else:
@@ -0,0 +1,249 @@
+"""
+Shared camera capture.
+
+One CameraBroker owns the cv2.VideoCapture and a single reader thread. Any
+number of subscribers (face auth, vision frames for the model, previews)
+get the latest frame by reference at their own rate, so the device is
+opened once and each frame is read once no matter how many consumers there
+are. Frames are shared: subscribers must treat them as read-only (cv2 calls
+like cvtColor/resize already return new arrays).
+
+The device is opened on the first subscription and released `idle_timeout`
+seconds after the last one closes, so quick hand-offs (auth -> vision) don't
+reopen it.
+"""
+
+import asyncio
+import threading
+import time
+
+import cv2
+
+
+class CameraSubscription:
+    """One consumer's view of the broker; see CameraBroker.subscribe."""
+
+    def __init__(self, broker, name, fps=None):
+        self.broker = broker
+        self.name = name
+        self.fps = fps
+        self.frames_delivered = 0
+        self._last_seq = 0
+        self._last_time = 0.0
+        self._closed = False
+        self._loop = None
+        self._event = None
+
+    def _deliver(self, latest):
+        self._last_seq = latest[0]
+        self._last_time = time.monotonic()
+        self.frames_delivered += 1
+        return latest[2]
+
+    def _rate_delay(self):
+        if not self.fps:
+            return 0.0
+        return max(0.0, self._last_time + 1.0 / self.fps - time.monotonic())
+
+    def wait_next(self, timeout=None):
+        """
+        Blocking (thread consumers): next frame newer than the last one this
+        subscriber got, no faster than its fps. None on timeout, close, or if
+        the camera is unavailable.
+        """
+        delay = self._rate_delay()
+        if delay:
+            time.sleep(delay)
+        latest = self.broker._wait_newer(self._last_seq, timeout, lambda: self._closed)
+        return self._deliver(latest) if latest else None
+
+    async def next_frame(self):
+        """Async version of wait_next (no thread hop; the reader thread wakes us)."""
+        delay = self._rate_delay()
+        if delay:
+            await asyncio.sleep(delay)
+        while not self._closed:
+            # Register before checking so a frame landing in between still wakes us
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+            latest = self.broker.latest()
+            if latest and latest[0] > self._last_seq:
+                self._event = None
+                return self._deliver(latest)
+            if not self.broker.running:
+                self._event = None
+                return None
+            await self._event.wait()
+        return None
+
+    def _notify(self):
+        # Called on the reader thread
+        event = self._event
+        if event is not None:
+            self._loop.call_soon_threadsafe(event.set)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._notify()
+            self.broker._unsubscribe(self)
+
+
+class CameraBroker:
+    def __init__(self, indices=(0, 1), api_preference=cv2.CAP_AVFOUNDATION, idle_timeout=5.0, opener=None):
+        """
+        :param indices: Device indices tried in order when opening.
+        :param idle_timeout: Seconds with no subscribers before the device is released.
+        :param opener: Optional callable(index) -> capture object (tests / other backends).
+        """
+        self.indices = indices
+        self.api_preference = api_preference
+        self.idle_timeout = idle_timeout
+        self._opener = opener
+        self._cond = threading.Condition()
+        self._subs = set()
+        self._thread = None
+        self._latest = None # (seq, captured_at, frame)
+        self._seq = 0
+
+        self.device_index = None
+        self.opens = 0
+        self.open_failures = 0
+        self.frames_read = 0
+        self.read_errors = 0
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def latest(self):
+        """(seq, captured_at, frame) of the newest frame, or None."""
+        return self._latest
+
+    def subscribe(self, name, fps=None):
+        """Register a consumer; starts the reader (and opens the device) if needed."""
+        sub = CameraSubscription(self, name, fps)
+        with self._cond:
+            self._subs.add(sub)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._reader, name="camera-reader", daemon=True)
+                self._thread.start()
+        return sub
+
+    def _unsubscribe(self, sub):
+        with self._cond:
+            self._subs.discard(sub)
+            self._cond.notify_all()
+
+    def _wait_newer(self, seq, timeout, closed):
+        with self._cond:
+            self._cond.wait_for(
+                lambda: closed() or self._thread is None or (self._latest and self._latest[0] > seq),
+                timeout,
+            )
+            latest = self._latest
+        if closed() or not latest or latest[0] <= seq:
+            return None
+        return latest
+
+    def _open_device(self):
+        for index in self.indices:
+            print(f"[CAMERA] Trying to open camera with index {index}...")
+            cap = self._opener(index) if self._opener else cv2.VideoCapture(index, self.api_preference)
+            if not cap.isOpened():
+                print(f"[CAMERA] [ERR] Could not open video device {index}.")
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                print(f"[CAMERA] [ERR] Opened device {index} but failed to read first frame.")
+                cap.release()
+                continue
+            print(f"[CAMERA] [OK] Successfully opened and read from device {index}.")
+            self.device_index = index
+            self.opens += 1
+            return cap, frame
+        return None, None
+
+    def _publish(self, frame):
+        with self._cond:
+            self._seq += 1
+            self._latest = (self._seq, time.monotonic(), frame)
+            self.frames_read += 1
+            subs = list(self._subs)
+            self._cond.notify_all()
+        for sub in subs:
+            sub._notify()
+
+    def _stop_reader(self):
+        with self._cond:
+            self._thread = None
+            self._latest = None
+            subs = list(self._subs)
+            self._cond.notify_all()
+        for sub in subs:
+            sub._notify()
+
+    def _reader(self):
+        cap, first = self._open_device()
+        if cap is None:
+            print("[CAMERA] [ERR] All camera attempts failed.")
+            self.open_failures += 1
+            self._stop_reader()
+            return
+        self._publish(first)
+        idle_since = None
+        consecutive_errors = 0
+        try:
+            while True:
+                with self._cond:
+                    if not self._subs:
+                        idle_since = idle_since or time.monotonic()
+                        if time.monotonic() - idle_since > self.idle_timeout:
+                            # Decided under the lock so a concurrent subscribe() starts a new reader
+                            self._thread = None
+                            self._latest = None
+                            break
+                    else:
+                        idle_since = None
+                if idle_since is not None:
+                    time.sleep(0.1)
+                    continue
+                ret, frame = cap.read()
+                if not ret:
+                    self.read_errors += 1
+                    consecutive_errors += 1
+                    if consecutive_errors >= 10:
+                        print("[CAMERA] [ERR] Camera stopped delivering frames.")
+                        self._stop_reader()
+                        break
+                    time.sleep(0.05)
+                    continue
+                consecutive_errors = 0
+                self._publish(frame)
+        finally:
+            cap.release()
+            print("[CAMERA] Camera released.")
+
+    def stats(self) -> dict:
+        with self._cond:
+            subs = {sub.name: {"fps": sub.fps, "frames": sub.frames_delivered} for sub in self._subs}
+        return {
+            "running": self.running,
+            "device_index": self.device_index,
+            "opens": self.opens,
+            "open_failures": self.open_failures,
+            "frames_read": self.frames_read,
+            "read_errors": self.read_errors,
+            "subscribers": subs,
+        }
+
+
+_default_broker = None
+
+
+def get_camera_broker():
+    """Process-wide broker shared by the authenticator and AudioLoop."""
+    global _default_broker
+    if _default_broker is None:
+        _default_broker = CameraBroker()
+    return _default_broker
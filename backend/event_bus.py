@@ -0,0 +1,322 @@
+"""
+Ordered, coalescing outbound event bus for Socket.IO emits.
+
+The AudioLoop callbacks used to fire asyncio.create_task(sio.emit(...)) for
+every event: one task per event, no ordering between them and nothing to stop
+a slow client's backlog from growing. Instead every connected client gets one
+ordered queue drained by a single sender task, and each event name has a
+delivery policy:
+
+  - "ordered":  queued as-is (the default)
+  - "coalesce": high-rate streams (transcription deltas, CAD thoughts) are
+                merged into one frame per `interval`; an ordered or lossy event
+                flushes the pending frame first so relative order is kept
+  - "latest":   lossy streams (browser frames, audio envelope) keep only the
+                newest unsent payload; an older one still in the queue is
+                replaced in place
+
+A queue that reaches `max_queue` drops its oldest "latest" entry, else its
+oldest coalesced one, and counts the drop. Ordered events (confirmation
+requests, errors, cad_data...) are never dropped: if only those are left the
+client is too far behind to trust its view, so its channel is closed and
+`disconnect(sid)` is called; the client reconnects and gets fresh state.
+
+Events can also be routed to a topic (see EVENT_TOPICS). A client that has
+subscribed to a set of topics only receives broadcasts of routed events for
+those topics, so e.g. a multi-MB cad_data STL isn't serialized and sent to a
+dashboard that only shows the lights. Clients that never subscribe get every
+topic, and events sent to one client (`to=sid`) ignore subscriptions.
+"""
+
+import asyncio
+from collections import deque
+
+POLICIES = ("ordered", "coalesce", "latest")
+
+TOPICS = ("cad", "printers", "kasa", "transcripts")
+
+# Events only delivered to clients subscribed to their topic
+EVENT_TOPICS = {
+    "cad_data": "cad",
+    "cad_status": "cad",
+    "cad_thought": "cad",
+    "printer_list": "printers",
+    "print_status_update": "printers",
+    "slicing_progress": "printers",
+    "kasa_devices": "kasa",
+    "kasa_update": "kasa",
+    "transcription": "transcripts",
+}
+
+
+def parse_topics(value):
+    """Topics from a list or a comma-separated string; unknown names are dropped."""
+    if isinstance(value, str):
+        value = value.split(",")
+    return {t.strip() for t in value or () if isinstance(t, str) and t.strip() in TOPICS}
+
+
+def merge_text(prev, new):
+    """Concatenate consecutive {"text"} payloads from the same sender (None if they can't merge)."""
+    if prev.get("sender") != new.get("sender"):
+        return None
+    return {**prev, "text": prev.get("text", "") + new.get("text", "")}
+
+
+def merge_browser_frame(prev, new):
+    """Newest screenshot wins, but log lines from the replaced frame are kept."""
+    logs = [log for log in (prev.get("log"), new.get("log")) if log]
+    return {**new, "log": "\n".join(logs)}
+
+
+class _Entry:
+    __slots__ = ("event", "data")
+
+    def __init__(self, event, data):
+        self.event = event
+        self.data = data
+
+
+class ClientChannel:
+    """One client's outbound queue and the task that drains it."""
+
+    def __init__(self, bus, sid, topics=None):
+        self.bus = bus
+        self.sid = sid
+        self.topics = topics # None = every topic
+        self.queue = deque()
+        self._frame = [] # coalesced entries waiting for the next flush
+        self._latest = {} # event -> unsent entry in the queue
+        self._timer = None
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._drain(), name=f"events-{sid}")
+
+        self.sent = 0
+        self.errors = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.replaced = 0
+        self.max_depth = 0
+
+    def wants(self, topic):
+        return topic is None or self.topics is None or topic in self.topics
+
+    def publish(self, event, data, policy, merge):
+        if self.closed:
+            return
+        if policy == "coalesce":
+            last = self._frame[-1] if self._frame else None
+            if last is not None and last.event == event and merge is not None:
+                merged = merge(last.data, data)
+                if merged is not None:
+                    last.data = merged
+                    self.coalesced += 1
+                    return
+            self._frame.append(_Entry(event, data))
+            if self._timer is None:
+                self._timer = asyncio.get_running_loop().call_later(self.bus.interval, self.flush)
+            return
+
+        self.flush()
+        if policy == "latest":
+            entry = self._latest.get(event)
+            if entry is not None:
+                entry.data = merge(entry.data, data) if merge is not None else data
+                self.replaced += 1
+                return
+            entry = self._latest[event] = _Entry(event, data)
+            self._enqueue(entry)
+        else:
+            self._enqueue(_Entry(event, data))
+
+    def flush(self):
+        """Move the pending coalesced frame into the queue."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        frame, self._frame = self._frame, []
+        for entry in frame:
+            self._enqueue(entry)
+
+    def _enqueue(self, entry):
+        if self.closed:
+            return
+        if len(self.queue) >= self.bus.max_queue and not self._drop_one():
+            self.bus._overflowed(self)
+            return
+        self.queue.append(entry)
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self._wakeup.set()
+
+    def _drop_one(self):
+        """Drop the oldest lossy entry. False if every queued entry is ordered."""
+        victim = None
+        for policy in ("latest", "coalesce"):
+            victim = next((e for e in self.queue if self.bus.policy(e.event) == policy), None)
+            if victim is not None:
+                break
+        if victim is None:
+            return False
+        self.queue.remove(victim)
+        if self._latest.get(victim.event) is victim:
+            del self._latest[victim.event]
+        self.dropped += 1
+        self.bus.dropped[victim.event] = self.bus.dropped.get(victim.event, 0) + 1
+        return True
+
+    async def _drain(self):
+        while True:
+            if not self.queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            entry = self.queue.popleft()
+            if self._latest.get(entry.event) is entry:
+                del self._latest[entry.event]
+            try:
+                await self.bus.emit(entry.event, entry.data, self.sid)
+                self.sent += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"[EventBus] Emit '{entry.event}' to {self.sid} failed: {e}")
+
+    def close(self):
+        self.closed = True
+        self.queue.clear()
+        self._frame = []
+        self._latest.clear()
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "topics": sorted(self.topics) if self.topics is not None else "all",
+            "depth": len(self.queue),
+            "pending_frame": len(self._frame),
+            "max_depth": self.max_depth,
+            "sent": self.sent,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "replaced": self.replaced,
+        }
+
+
+class EventBus:
+    def __init__(self, emit, interval=0.05, max_queue=500, routes=None, disconnect=None):
+        """
+        :param emit: async callable(event, data, sid) that sends one event to one client.
+        :param interval: Seconds between flushes of coalesced streams.
+        :param max_queue: Events queued per client before the oldest lossy one is dropped.
+        :param routes: {event: topic} for events only sent to subscribers (e.g. EVENT_TOPICS).
+        :param disconnect: async callable(sid) for a client whose queue is full of ordered events.
+        """
+        self.emit = emit
+        self.disconnect = disconnect
+        self.interval = interval
+        self.max_queue = max_queue
+        self._policies = {}
+        self._routes = dict(routes or {})
+        self._clients = {}
+        self.published = 0
+        self.dropped = {} # event -> drops across all clients
+        self.filtered = {} # event -> deliveries skipped because the client isn't subscribed
+        self.overflows = 0 # clients disconnected with a queue full of ordered events
+        self._tasks = set()
+
+    def register(self, event, policy, merge=None):
+        """
+        Set the delivery policy of `event`. `merge(prev, new)` combines two
+        payloads: required for "coalesce" (return None when they can't be
+        merged), optional for "latest" (default: the new payload replaces the old).
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown event policy '{policy}', expected one of {POLICIES}")
+        self._policies[event] = (policy, merge)
+
+    def policy(self, event):
+        return self._policies.get(event, ("ordered", None))[0]
+
+    def route(self, event, topic):
+        """Only broadcast `event` to clients subscribed to `topic` (None = everyone)."""
+        if topic is None:
+            self._routes.pop(event, None)
+        else:
+            self._routes[event] = topic
+
+    def add_client(self, sid, topics=None):
+        if sid not in self._clients:
+            self._clients[sid] = ClientChannel(self, sid, set(topics) if topics is not None else None)
+
+    def subscribe(self, sid, topics):
+        """Replace a client's subscriptions (None = every topic). Returns False for unknown clients."""
+        channel = self._clients.get(sid)
+        if channel is None:
+            return False
+        channel.topics = set(topics) if topics is not None else None
+        return True
+
+    def remove_client(self, sid):
+        channel = self._clients.pop(sid, None)
+        if channel:
+            channel.close()
+
+    def _overflowed(self, channel):
+        """`channel`'s queue is full and nothing in it may be dropped: cut the client off."""
+        self.overflows += 1
+        print(f"[EventBus] Client {channel.sid} fell {len(channel.queue)} ordered events behind; disconnecting it")
+        if self._clients.get(channel.sid) is channel:
+            del self._clients[channel.sid]
+        channel.close()
+        if self.disconnect is not None:
+            task = asyncio.create_task(self.disconnect(channel.sid))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @property
+    def clients(self):
+        return list(self._clients)
+
+    def publish(self, event, data, to=None, clients=None):
+        """
+        Queue `event` for one client (`to`) or every connected client. Must be called on the event loop.
+        `clients` narrows a broadcast to those sids (e.g. one session's audience); topics still apply.
+        """
+        policy, merge = self._policies.get(event, ("ordered", None))
+        self.published += 1
+        if to is not None:
+            channels = [self._clients[to]] if to in self._clients else []
+        else:
+            topic = self._routes.get(event)
+            if clients is None:
+                candidates = list(self._clients.values())
+            else:
+                candidates = [self._clients[sid] for sid in clients if sid in self._clients]
+            channels = [c for c in candidates if c.wants(topic)]
+            skipped = len(candidates) - len(channels)
+            if skipped:
+                self.filtered[event] = self.filtered.get(event, 0) + skipped
+        for channel in channels:
+            channel.publish(event, data, policy, merge)
+
+    def close(self):
+        for sid in list(self._clients):
+            self.remove_client(sid)
+
+    def stats(self) -> dict:
+        clients = {sid: channel.stats() for sid, channel in self._clients.items()}
+        return {
+            "interval_ms": round(self.interval * 1000, 1),
+            "max_queue": self.max_queue,
+            "published": self.published,
+            "depth": sum(c["depth"] for c in clients.values()),
+            "dropped": dict(self.dropped),
+            "filtered": dict(self.filtered),
+            "overflows": self.overflows,
+            "routes": dict(self._routes),
+            "policies": {event: policy for event, (policy, _) in self._policies.items()},
+            "clients": clients,
+        }
@@ -0,0 +1,133 @@
+"""
+Named, sized thread pools for blocking work.
+
+asyncio.to_thread sends everything to one shared default executor, so a
+burst of slow tool calls (psutil.cpu_percent(interval=1), nvidia-smi, HTTP,
+CAD/slicer subprocesses) can queue ahead of a mic read or speaker write.
+Blocking calls are instead routed explicitly:
+
+  - AUDIO:  mic reads, speaker writes, PortAudio stream opens
+  - VISION: camera/frame encoding, scene signatures, the face-auth CV loop
+  - TOOLS:  tool handlers, network calls, subprocess waits
+  - CAD:    build123d script runs (shared by every session, so concurrent
+            sessions can't start more CAD builds than the machine can take)
+  - SCREEN: the screen-share grabber (one thread; mss handles are per-thread)
+
+Each pool records how long work waited for a free thread (queue wait) and how
+long it ran, so starvation shows up in /metrics/executors.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import threading
+import time
+
+from latency_trace import LatencyHistogram
+
+AUDIO = "audio"
+VISION = "vision"
+TOOLS = "tools"
+SCREEN = "screen"
+CAD = "cad"
+
+# Audio: blocking-mode mic read + speaker write + a spare for stream opens / a stuck write
+# Vision: face-auth loop holds one thread while it runs
+# CAD: each build is a CPU-heavy subprocess
+POOL_SIZES = {AUDIO: 4, VISION: 3, TOOLS: 8, SCREEN: 1, CAD: 2}
+
+
+class InstrumentedExecutor:
+    def __init__(self, name, max_workers, window=500):
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"jarvis-{name}")
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.pending = 0 # queued + running
+        self.running = 0
+        self.max_pending = 0
+        self.wait = LatencyHistogram(window)
+        self.run_time = LatencyHistogram(window)
+
+    def submit(self, fn, *args, **kwargs) -> concurrent.futures.Future:
+        queued = time.perf_counter()
+        with self._lock:
+            self.submitted += 1
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+
+        def call():
+            start = time.perf_counter()
+            with self._lock:
+                self.running += 1
+                self.wait.add((start - queued) * 1000.0)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self.running -= 1
+                    self.pending -= 1
+                    self.completed += 1
+                    if not ok:
+                        self.failed += 1
+                    self.run_time.add((time.perf_counter() - start) * 1000.0)
+
+        try:
+            return self._pool.submit(call)
+        except RuntimeError:
+            # Pool already shut down
+            with self._lock:
+                self.pending -= 1
+            raise
+
+    async def run(self, fn, *args, **kwargs):
+        """Like asyncio.to_thread, but on this pool (context variables are carried over too)."""
+        ctx = contextvars.copy_context()
+        future = self.submit(functools.partial(ctx.run, fn, *args, **kwargs))
+        return await asyncio.wrap_future(future)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "pending": self.pending,
+                "running": self.running,
+                "max_pending": self.max_pending,
+                "queue_wait_ms": self.wait.to_dict(),
+                "run_ms": self.run_time.to_dict(),
+            }
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name, max_workers=None) -> InstrumentedExecutor:
+    """Process-wide pool for `name`, created on first use (size from POOL_SIZES unless given)."""
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            size = max_workers or POOL_SIZES.get(name, 2)
+            executor = _executors[name] = InstrumentedExecutor(name, size)
+        return executor
+
+
+async def run_in(name, fn, *args, **kwargs):
+    """Run blocking `fn(*args, **kwargs)` on the named pool."""
+    return await get_executor(name).run(fn, *args, **kwargs)
+
+
+def executor_stats() -> dict:
+    with _executors_lock:
+        executors = dict(_executors)
+    return {name: executor.stats() for name, executor in executors.items()}
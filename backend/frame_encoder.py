@@ -0,0 +1,35 @@
+"""
+JPEG encoding for camera frames sent to the Live API.
+
+Frames stay in OpenCV's BGR layout end to end: cv2.resize (INTER_AREA) for
+the downscale and cv2.imencode for the JPEG, instead of BGR->RGB conversion,
+PIL thumbnail and PIL save.
+"""
+
+import base64
+
+import cv2
+
+
+def fit_within(frame, max_size=1024):
+    """Downscale so the longer side is at most max_size (never upscales)."""
+    h, w = frame.shape[:2]
+    scale = max_size / float(max(h, w))
+    if scale >= 1.0:
+        return frame
+    size = (max(1, int(round(w * scale))), max(1, int(round(h * scale))))
+    return cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+
+
+def encode_jpeg(frame, max_size=1024, quality=80) -> bytes:
+    """BGR ndarray -> JPEG bytes."""
+    ok, buf = cv2.imencode(".jpg", fit_within(frame, max_size), [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not ok:
+        raise ValueError("JPEG encoding failed")
+    return buf.tobytes()
+
+
+def encode_frame_payload(frame, max_size=1024, quality=80) -> dict:
+    """Realtime-input payload (base64 JPEG) for one BGR frame."""
+    jpeg = encode_jpeg(frame, max_size, quality)
+    return {"mime_type": "image/jpeg", "data": base64.b64encode(jpeg).decode()}
@@ -0,0 +1,82 @@
+"""
+Latest-only ingestion for JPEG frames pushed by the frontend (`video_frame`).
+
+The socket handler stores the blob as-is and returns: no task per frame, no
+base64 on the event loop. A frame that arrives before the previous one was
+used simply replaces it. Decoding for the scene gate and base64 for the Live
+API happen only when AudioLoop.get_image_payload actually needs a frame
+(VAD onset or text input), at most once per frame.
+
+The model only ever sees the newest frame at those moments, so the client is
+told the rate worth sending (`target_fps`) instead of pushing every few
+animation frames.
+"""
+
+import base64
+import time
+
+
+class FrameIngest:
+    def __init__(self, target_fps=1.0):
+        """
+        :param target_fps: Frame rate the frontend is asked to send while a session is running.
+        """
+        self.target_fps = target_fps
+        self._latest = None # (seq, received_at, JPEG bytes)
+        self._seq = 0
+        self._used_seq = 0
+
+        self.frames_received = 0
+        self.frames_replaced = 0
+        self.frames_used = 0
+        self.bytes_received = 0
+
+    def push(self, data):
+        """
+        Store one frame (JPEG bytes, or base64 text from older clients).
+        Returns False if the data is empty or not a frame.
+        """
+        if isinstance(data, str):
+            try:
+                data = base64.b64decode(data)
+            except (ValueError, TypeError):
+                return False
+        if not isinstance(data, (bytes, bytearray, memoryview)) or not data:
+            return False
+        if self._latest is not None and self._latest[0] > self._used_seq:
+            self.frames_replaced += 1
+        self._seq += 1
+        self._latest = (self._seq, time.monotonic(), bytes(data))
+        self.frames_received += 1
+        self.bytes_received += len(data)
+        return True
+
+    def latest(self):
+        """(seq, received_at, JPEG bytes) of the newest frame, or None."""
+        return self._latest
+
+    def mark_used(self, seq):
+        """The frame with this seq was looked at (gated or sent) by a consumer."""
+        if seq > self._used_seq:
+            self._used_seq = seq
+            self.frames_used += 1
+
+    @staticmethod
+    def to_payload(jpeg: bytes) -> dict:
+        """Realtime-input payload for a stored frame."""
+        return {"mime_type": "image/jpeg", "data": base64.b64encode(jpeg).decode()}
+
+    def clear(self):
+        self._latest = None
+        self._used_seq = self._seq
+
+    def stats(self) -> dict:
+        latest = self._latest
+        return {
+            "target_fps": self.target_fps,
+            "frames_received": self.frames_received,
+            "frames_replaced": self.frames_replaced,
+            "frames_used": self.frames_used,
+            "bytes_received": self.bytes_received,
+            "latest_age_s": round(time.monotonic() - latest[1], 3) if latest else None,
+        }
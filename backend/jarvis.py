@@ -1,18 +1,13 @@
 import asyncio
-import base64
-import io
 import os
 import sys
 import traceback
 from pathlib import Path
 from dotenv import load_dotenv
-import cv2
 import pyaudio
-import PIL.Image
 import mss
 import argparse
-import math
-import struct
+import threading
 import time
 
 from google import genai
@@ -24,6 +19,24 @@ if sys.version_info < (3, 11, 0):
     asyncio.ExceptionGroup = exceptiongroup.ExceptionGroup
 
 from tools import tools_list
+from vad import VoiceActivityDetector, SPEECH_START, SPEECH_END
+from audio_capture import CallbackMicCapture, ReconnectBuffer
+from audio_devices import AudioDeviceManager
+from realtime_sender import RealtimeSender, OutboundScheduler
+from silence_gate import SilenceGate
+from playback import PlaybackEngine
+from resampler import PolyphaseResampler
+from latency_trace import LatencyTracer
+from frame_encoder import encode_frame_payload
+from scene_gate import SceneGate
+from screen_capture import ScreenCapturer
+from camera_broker import get_camera_broker
+from frame_ingest import FrameIngest
+from tool_registry import ToolFailure, ToolRegistry
+from tool_cache import ToolCache
+from pending_calls import PendingCallManager
+from job_supervisor import JobSupervisor
+from executors import AUDIO, VISION, TOOLS, SCREEN, get_executor, run_in
 
 FORMAT = pyaudio.paInt16
 CHANNELS = 1
@@ -33,6 +46,7 @@ CHUNK_SIZE = 1024
 
 MODEL = "models/gemini-2.5-flash-native-audio-preview-12-2025"
 DEFAULT_MODE = "camera"
+PRINT_STL_TIMEOUT = 300.0 # Slice + upload limit for the print_stl tool
 
 load_dotenv(Path(__file__).resolve().parent.parent / ".env")
 client = genai.Client(http_options={"api_version": "v1beta"}, api_key=os.getenv("GEMINI_API_KEY"))
@@ -315,7 +329,7 @@ except ImportError:
     list_top_processes = search_web = wikipedia_summary = format_system_status_for_speech = None
 
 class AudioLoop:
-    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_cad_data=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_cad_status=None, on_cad_thought=None, on_project_update=None, on_device_update=None, on_error=None, input_device_index=None, input_device_name=None, output_device_index=None, kasa_agent=None):
+    def __init__(self, video_mode=DEFAULT_MODE, on_audio_data=None, on_video_frame=None, on_cad_data=None, on_web_data=None, on_transcription=None, on_tool_confirmation=None, on_cad_status=None, on_cad_thought=None, on_project_update=None, on_device_update=None, on_error=None, input_device_index=None, input_device_name=None, output_device_index=None, kasa_agent=None, capture_mode="blocking", send_latency_budget=0.2, silence_gate=False, gate_silence_window=3.0, playback_mode="blocking", native_capture=True, latency_trace_dir=None, camera_mode="lazy", jpeg_quality=80, frame_max_size=1024, scene_gate=True, scene_threshold=0.03, camera_broker=None, frontend_fps=1.0, on_tool_confirmation_expired=None, confirmation_timeout=60.0, on_job_update=None, genai_client=None, printer_agent=None, project_manager=None, audio_io=True):
         self.video_mode = video_mode
         self.on_audio_data = on_audio_data
         self.on_video_frame = on_video_frame
@@ -331,6 +345,31 @@ class AudioLoop:
         self.input_device_index = input_device_index
         self.input_device_name = input_device_name
         self.output_device_index = output_device_index
+        # False: no local mic/speaker (extra sessions share the machine with the one that owns them);
+        # model audio is still handed to on_audio_data
+        self.audio_io = audio_io
+        # Process-wide genai client (Live API + CAD/web agents) unless a session brings its own
+        self.client = genai_client or client
+        # Mic capture: "blocking" (stream.read on the audio executor) or "callback" (PortAudio callback + ring buffer)
+        self.capture_mode = capture_mode
+        self.mic_capture = None
+        self.audio_stream = None
+        # Device enumeration/resolution is cached; mic and speaker streams stay open across reconnects
+        self.devices = AudioDeviceManager(pya, default_rate=SEND_SAMPLE_RATE, default_channels=CHANNELS)
+        # Mic audio captured while the Live session is reconnecting, flushed into the next session
+        self.reconnect_buffer = ReconnectBuffer(max_seconds=5.0, bytes_per_second=SEND_SAMPLE_RATE * 2)
+        self.output_stream = None
+        self._output_write_lock = threading.Lock()
+        # Open the mic at the device's native rate/channels and convert to 16 kHz mono in-process
+        self.native_capture = native_capture
+        self.resampler = None
+        # Speaker output: "blocking" (stream.write on the audio executor) or "callback" (jitter buffer + instant barge-in)
+        self.playback_mode = playback_mode
+        self.playback_engine = None
+        # Merges queued mic chunks into fewer session.send calls when the link backs up
+        self.realtime_sender = RealtimeSender(sample_rate=SEND_SAMPLE_RATE, latency_budget=send_latency_budget)
+        # Per-turn speech-end -> first audio/playback timings (JSONL trace if a dir is given)
+        self.latency = LatencyTracer(trace_dir=latency_trace_dir)
 
         self.audio_in_queue = None
         self.out_queue = None
@@ -357,10 +396,10 @@ class AudioLoop:
             if self.on_cad_status:
                 self.on_cad_status(status_info)
         
-        self.cad_agent = CadAgent(on_thought=handle_cad_thought, on_status=handle_cad_status)
-        self.web_agent = WebAgent()
+        self.cad_agent = CadAgent(on_thought=handle_cad_thought, on_status=handle_cad_status, client=self.client)
+        self.web_agent = WebAgent(client=self.client)
         self.kasa_agent = kasa_agent if kasa_agent else KasaAgent()
-        self.printer_agent = PrinterAgent()
+        self.printer_agent = printer_agent if printer_agent else PrinterAgent()
 
         self.send_text_task = None
         self.stop_event = asyncio.Event()
@@ -368,22 +407,67 @@ class AudioLoop:
         self.stop_event = asyncio.Event()
         
         self.permissions = {} # Default Empty (Will treat unset as True)
-        self._pending_confirmations = {}
+        # Confirmation-gated tool calls wait here so receive_audio keeps streaming
+        self.pending_calls = PendingCallManager(
+            timeout=confirmation_timeout,
+            on_request=lambda data: self.on_tool_confirmation and self.on_tool_confirmation(data),
+            on_expired=on_tool_confirmation_expired,
+        )
+        # Background tools (CAD, web agent, file ops) run as tracked jobs with per-kind limits
+        self.jobs = JobSupervisor(
+            limits={"generate_cad": 1, "iterate_cad": 1, "run_web_agent": 1, "print_stl": 1},
+            default_limit=2,
+            cancel_on_reconnect=("read_directory", "read_file"),
+            on_change=on_job_update,
+        )
+        # Set while a Live session is connected; background jobs wait on it to report back
+        self.session_ready = asyncio.Event()
+        # Idempotent tools reuse results for a short TTL (see _register_tools)
+        self.tools = ToolRegistry(cache=ToolCache(max_entries=256), supervisor=self.jobs)
+        self._register_tools()
 
         # Video buffering state
         self._latest_image_payload = None
-        # VAD State
+        self._latest_image_signature = None
+        self._latest_image_time = 0.0
+        # Frames pushed by the frontend: latest JPEG only, base64 deferred until one is sent
+        self.frame_ingest = FrameIngest(target_fps=frontend_fps)
+        self._pushed_frame = None # (seq, payload, signature) cache for the pushed frame
+        # Camera: "lazy" keeps only the latest raw frame and encodes it when a frame is needed,
+        # "push" encodes every frame and queues it like before
+        self.camera_mode = camera_mode
+        self.jpeg_quality = jpeg_quality
+        self.frame_max_size = frame_max_size
+        self._latest_raw_frame = None # (seq, captured_at, BGR ndarray)
+        self._encoded_frame = None # (seq, payload, signature) cache for the raw frame above
+        self._offered_frame = None # (payload, signature, source) returned by get_image_payload, not yet sent
+        self._frame_seq = 0
+        # Shared with the face authenticator so the camera is opened/read once
+        self.camera = camera_broker or get_camera_broker()
+        self.frames_captured = 0
+        self.frames_encoded = 0
+        # Skips frames the model has effectively already seen (None = send every requested frame)
+        self.scene_gate = SceneGate(threshold=scene_threshold) if scene_gate else None
+        # video_mode="screen": tile-delta screen capture with adaptive rate/size
+        self.screen_capturer = None
+        # VAD State (mirrors self.vad so other components can read it cheaply)
+        self.vad = VoiceActivityDetector(sample_rate=SEND_SAMPLE_RATE, chunk_size=CHUNK_SIZE)
         self._is_speaking = False
         self._silence_start_time = None
+        # Optional upstream silence gating (None = forward every mic chunk)
+        self.silence_gate = SilenceGate(silence_window=gate_silence_window, sample_rate=SEND_SAMPLE_RATE, chunk_size=CHUNK_SIZE) if silence_gate else None
         
-        # Initialize ProjectManager
-        from project_manager import ProjectManager
-        # Assuming we are running from backend/ or root? 
-        # Using abspath of current file to find root
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # If jarvis.py is in backend/, project root is one up
-        project_root = os.path.dirname(current_dir)
-        self.project_manager = ProjectManager(project_root)
+        # Initialize ProjectManager (sessions pass a view of a shared one)
+        if project_manager is not None:
+            self.project_manager = project_manager
+        else:
+            from project_manager import ProjectManager
+            # Assuming we are running from backend/ or root? 
+            # Using abspath of current file to find root
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            # If jarvis.py is in backend/, project root is one up
+            project_root = os.path.dirname(current_dir)
+            self.project_manager = ProjectManager(project_root)
         
         # Sync Initial Project State
         if self.on_project_update:
@@ -408,24 +492,81 @@ class AudioLoop:
     def set_paused(self, paused):
         self.paused = paused
 
+    def get_capture_stats(self):
+        """Mic capture counters (overflows/underruns are only tracked in callback mode)."""
+        stats = self.mic_capture.stats() if self.mic_capture else {"mode": self.capture_mode}
+        stats["reconnect_buffer"] = self.reconnect_buffer.stats()
+        stats["devices"] = self.devices.stats()
+        return stats
+
+    def get_send_stats(self):
+        """Batch size and send latency counters for the realtime sender, plus per-lane queue depth/age."""
+        stats = self.realtime_sender.stats.to_dict()
+        stats["lanes"] = self.out_queue.stats() if self.out_queue else None
+        return stats
+
+    def get_playback_stats(self):
+        """Jitter buffer depth, underruns and barge-in latency (callback playback only)."""
+        if self.playback_engine:
+            return self.playback_engine.stats()
+        return {"mode": self.playback_mode}
+
+    def get_gate_stats(self):
+        """Bytes forwarded/saved by the upstream silence gate for the current session."""
+        if not self.silence_gate:
+            return {"enabled": False}
+        return {"enabled": True, **self.silence_gate.stats()}
+
+    def get_video_stats(self):
+        """Camera frames captured vs. actually JPEG-encoded."""
+        return {
+            "camera_mode": self.camera_mode,
+            "frames_captured": self.frames_captured,
+            "frames_encoded": self.frames_encoded,
+            "scene_gate": self.scene_gate.stats() if self.scene_gate else {"enabled": False},
+            "screen": self.screen_capturer.stats() if self.screen_capturer else None,
+            "camera": self.camera.stats(),
+            "frontend": self.frame_ingest.stats(),
+        }
+
+    def get_latency_stats(self):
+        """Speech-end to response/playback latency percentiles and the most recent turns."""
+        return self.latency.summary()
+
+    def get_usage(self):
+        """Compact resource counters for this loop (per-session accounting in the session manager)."""
+        send = self.realtime_sender.stats
+        tools = self.tools.stats()
+        jobs = self.jobs.stats()
+        return {
+            "project": self.project_manager.current_project,
+            "connected": self.session is not None,
+            "mic_bytes_sent": send.bytes_sent,
+            "sends": send.sends,
+            "send_errors": send.send_errors,
+            "voice_turns": self.latency.turns,
+            "tool_calls": sum(t["calls"] for t in tools["tools"].values()),
+            "tool_errors": sum(t["errors"] + t["timeouts"] for t in tools["tools"].values()),
+            "jobs_running": jobs["running"],
+            "jobs_queued": jobs["queued"],
+            "pending_confirmations": len(self.pending_calls.stats()["pending"]),
+            "frames_encoded": self.frames_encoded,
+        }
+
     def stop(self):
         self.stop_event.set()
         
     def resolve_tool_confirmation(self, request_id, confirmed):
         print(f"[Jarvis DEBUG] [RESOLVE] resolve_tool_confirmation called. ID: {request_id}, Confirmed: {confirmed}")
-        if request_id in self._pending_confirmations:
-            future = self._pending_confirmations[request_id]
-            if not future.done():
-                print(f"[Jarvis DEBUG] [RESOLVE] Future found and pending. Setting result to: {confirmed}")
-                future.set_result(confirmed)
-            else:
-                 print(f"[Jarvis DEBUG] [WARN] Request {request_id} future already done. Result: {future.result()}")
-        else:
-            print(f"[Jarvis DEBUG] [WARN] Confirmation Request {request_id} not found in pending dict. Keys: {list(self._pending_confirmations.keys())}")
+        if not self.pending_calls.resolve(request_id, bool(confirmed)):
+            print(f"[Jarvis DEBUG] [WARN] Confirmation Request {request_id} not pending (already answered or expired).")
 
     def clear_audio_queue(self):
         """Clears the queue of pending audio chunks to stop playback immediately."""
         try:
+            if self.playback_engine:
+                # Also drop audio already handed to the output buffer
+                self.playback_engine.interrupt()
             count = 0
             while not self.audio_in_queue.empty():
                 self.audio_in_queue.get_nowait()
@@ -435,138 +576,250 @@ class AudioLoop:
         except Exception as e:
             print(f"[Jarvis DEBUG] [ERR] Failed to clear audio queue: {e}")
 
-    async def send_frame(self, frame_data):
-        # Update the latest frame payload
-        if isinstance(frame_data, bytes):
-            b64_data = base64.b64encode(frame_data).decode('utf-8')
-        else:
-            b64_data = frame_data 
+    def push_frame(self, frame_data):
+        """Store a frontend frame (JPEG bytes or base64); cheap enough to call from the socket handler."""
+        return self.frame_ingest.push(frame_data)
 
-        # Store as the designated "next frame to send"
-        self._latest_image_payload = {"mime_type": "image/jpeg", "data": b64_data}
-        # No event signal needed - listen_audio pulls it
+    async def send_frame(self, frame_data):
+        self.push_frame(frame_data)
+
+    async def get_image_payload(self, source="request"):
+        """
+        Newest frame as a realtime-input payload, or None if there is none or
+        the scene gate finds it unchanged since the last frame the model saw.
+
+        Raw camera frames (lazy mode) are only JPEG-encoded here, once per
+        captured frame and only if they pass the gate; JPEGs pushed by the
+        frontend are only decoded for the gate and base64-encoded here.
+        """
+        raw = self._latest_raw_frame
+        pushed = self.frame_ingest.latest()
+        if pushed is not None and pushed[1] >= self._latest_image_time and (raw is None or pushed[1] >= raw[1]):
+            seq, _, jpeg = pushed
+            self.frame_ingest.mark_used(seq)
+            self._pushed_frame = await self._gate_and_encode(
+                seq, self._pushed_frame, source,
+                lambda: self.scene_gate.jpeg_signature(jpeg),
+                lambda: FrameIngest.to_payload(jpeg),
+            )
+            return self._offer_frame(self._pushed_frame[1], self._pushed_frame[2], source)
+
+        if raw is None or raw[1] < self._latest_image_time:
+            payload = self._latest_image_payload
+            if payload is None:
+                return None
+            if not self._scene_changed(self._latest_image_signature, source):
+                return None
+            return self._offer_frame(payload, self._latest_image_signature, source)
+
+        seq, _, frame = raw
+        self._encoded_frame = await self._gate_and_encode(
+            seq, self._encoded_frame, source,
+            lambda: self.scene_gate.signature(frame),
+            lambda: self._encode_raw_frame(frame),
+        )
+        return self._offer_frame(self._encoded_frame[1], self._encoded_frame[2], source)
+
+    def _scene_changed(self, signature, source):
+        """Scene-gate check only: the gate learns the frame once it has actually been sent (frame_sent)."""
+        if not self.scene_gate or self.scene_gate.changed(signature):
+            return True
+        self.scene_gate.record(source, False)
+        return False
+
+    def _offer_frame(self, payload, signature, source):
+        if payload is not None:
+            self._offered_frame = (payload, signature, source)
+        return payload
+
+    def frame_sent(self, payload):
+        """
+        A payload from get_image_payload reached the Live API: from now on the
+        scene gate compares against it. A frame whose send failed is never
+        recorded, so the same scene is offered again next time.
+        """
+        offered = self._offered_frame
+        if offered is None or offered[0] is not payload:
+            return
+        self._offered_frame = None
+        if self.scene_gate:
+            self.scene_gate.mark_sent(offered[1], offered[2])
+
+    async def _gate_and_encode(self, seq, cached, source, signature_fn, encode_fn):
+        """
+        Scene-gate frame `seq` and encode it only if it passes. `cached` is the
+        (seq, payload, signature) entry from a previous call; the returned
+        entry has payload None when the frame was suppressed.
+        """
+        if cached is None or cached[0] != seq:
+            signature = await run_in(VISION, signature_fn) if self.scene_gate else None
+            cached = (seq, None, signature)
+        if not self._scene_changed(cached[2], source):
+            return (seq, None, cached[2])
+        if cached[1] is None:
+            cached = (seq, await run_in(VISION, encode_fn), cached[2])
+        return cached
+
+    def _encode_raw_frame(self, frame):
+        self.frames_encoded += 1
+        return encode_frame_payload(frame, self.frame_max_size, self.jpeg_quality)
 
     async def send_realtime(self):
-        while True:
-            msg = await self.out_queue.get()
+        async def send(msg):
             await self.session.send(input=msg, end_of_turn=False)
-
-    async def listen_audio(self):
-        mic_info = pya.get_default_input_device_info()
-
-        # Resolve Input Device by Name if provided
-        resolved_input_device_index = None
-        
-        if self.input_device_name:
-            print(f"[Jarvis] Attempting to find input device matching: '{self.input_device_name}'")
-            count = pya.get_device_count()
-            best_match = None
-            
-            for i in range(count):
-                try:
-                    info = pya.get_device_info_by_index(i)
-                    if info['maxInputChannels'] > 0:
-                        name = info.get('name', '')
-                        # Simple case-insensitive check
-                        if self.input_device_name.lower() in name.lower() or name.lower() in self.input_device_name.lower():
-                             print(f"   Candidate {i}: {name}")
-                             # Prioritize exact match or very close match if possible, but first match is okay for now
-                             resolved_input_device_index = i
-                             best_match = name
-                             break
-                except Exception:
-                    continue
-            
-            if resolved_input_device_index is not None:
-                print(f"[Jarvis] Resolved input device '{self.input_device_name}' to index {resolved_input_device_index} ({best_match})")
+            if isinstance(msg, dict) and msg.get("mime_type") == "audio/pcm":
+                self.latency.audio_sent(len(msg["data"]))
             else:
-                print(f"[Jarvis] Could not find device matching '{self.input_device_name}'. Checking index...")
-
-        # Fallback to index if Name lookup failed or wasn't provided
-        if resolved_input_device_index is None and self.input_device_index is not None:
-             try:
-                 resolved_input_device_index = int(self.input_device_index)
-                 print(f"[Jarvis] Requesting Input Device Index: {resolved_input_device_index}")
-             except ValueError:
-                 print(f"[Jarvis] Invalid device index '{self.input_device_index}', reverting to default.")
-                 resolved_input_device_index = None
-
-        if resolved_input_device_index is None:
-             print("[Jarvis] Using Default Input Device")
-
-        try:
-            self.audio_stream = await asyncio.to_thread(
+                self.frame_sent(msg)
+
+        await self.realtime_sender.run(self.out_queue, send)
+
+    @staticmethod
+    def _capture_chunk_frames(rate):
+        """Frames per read so one chunk covers the same ~64 ms at any native rate."""
+        return max(1, int(round(CHUNK_SIZE * rate / SEND_SAMPLE_RATE)))
+
+    async def _open_input_stream(self, input_device_index, rate, channels):
+        frames = self._capture_chunk_frames(rate)
+        if self.capture_mode == "callback":
+            capture = CallbackMicCapture(
+                pya,
+                chunk_size=frames,
+                rate=rate,
+                channels=channels,
+                format=FORMAT,
+                input_device_index=input_device_index,
+            )
+            self.audio_stream = await capture.start()
+            self.mic_capture = capture
+        else:
+            self.audio_stream = await run_in(
+                AUDIO,
                 pya.open,
                 format=FORMAT,
-                channels=CHANNELS,
-                rate=SEND_SAMPLE_RATE,
+                channels=channels,
+                rate=rate,
                 input=True,
-                input_device_index=resolved_input_device_index if resolved_input_device_index is not None else mic_info["index"],
-                frames_per_buffer=CHUNK_SIZE,
+                input_device_index=input_device_index,
+                frames_per_buffer=frames,
             )
-        except OSError as e:
-            print(f"[Jarvis] [ERR] Failed to open audio input stream: {e}")
-            print("[Jarvis] [WARN] Audio features will be disabled. Please check microphone permissions.")
+
+    async def _enqueue_mic_audio(self, block):
+        """Queue one PCM block for the current session, or hold it while reconnecting."""
+        queue = self.out_queue
+        if queue is None:
+            self.reconnect_buffer.push(block)
+            return
+        if len(self.reconnect_buffer):
+            # Audio from the reconnect window goes out first, in capture order
+            pending = self.reconnect_buffer.drain()
+            print(f"[Jarvis DEBUG] [RECONNECT] Flushing {len(pending)} mic chunks captured while reconnecting.")
+            for data in pending:
+                await queue.put({"data": data, "mime_type": "audio/pcm"})
+                self.latency.audio_queued(len(data))
+        await queue.put({"data": block, "mime_type": "audio/pcm"})
+        self.latency.audio_queued(len(block))
+
+    def _park_outbound_audio(self):
+        """Session is gone: keep its unsent mic audio for the next one and start buffering."""
+        queue = self.out_queue
+        self.out_queue = None
+        if queue is None:
             return
+        while not queue.empty():
+            msg = queue.get_nowait()
+            if isinstance(msg, dict) and msg.get("mime_type") == "audio/pcm":
+                self.reconnect_buffer.push(msg["data"])
+
+    async def listen_audio(self):
+        """
+        Mic capture loop. Started once by run() and kept alive across Live
+        reconnects; while no session is up, chunks go to the reconnect buffer.
+        """
+        input_device_index = self.devices.resolve_input(self.input_device_name, self.input_device_index)
+
+        # Prefer the device's native format; PortAudio-side resampling to 16 kHz is
+        # unsupported on many USB/Bluetooth mics. We downmix/resample ourselves.
+        capture_rate, capture_channels = SEND_SAMPLE_RATE, CHANNELS
+        if self.native_capture:
+            capture_rate, capture_channels = self.devices.input_format(input_device_index)
+
+        formats_to_try = [(capture_rate, capture_channels)]
+        if (capture_rate, capture_channels) != (SEND_SAMPLE_RATE, CHANNELS):
+            formats_to_try.append((SEND_SAMPLE_RATE, CHANNELS))
+
+        for attempt, (rate, channels) in enumerate(formats_to_try):
+            try:
+                await self._open_input_stream(input_device_index, rate, channels)
+                capture_rate, capture_channels = rate, channels
+                break
+            except OSError as e:
+                if attempt + 1 < len(formats_to_try):
+                    print(f"[Jarvis] [WARN] Failed to open mic at {rate} Hz x{channels} ({e}). Falling back to {SEND_SAMPLE_RATE} Hz mono.")
+                    continue
+                print(f"[Jarvis] [ERR] Failed to open audio input stream: {e}")
+                print("[Jarvis] [WARN] Audio features will be disabled. Please check microphone permissions.")
+                # Devices may have changed; re-enumerate on the next attempt
+                self.devices.refresh()
+                return
+
+        self.resampler = PolyphaseResampler(capture_rate, SEND_SAMPLE_RATE, capture_channels)
+        capture_chunk = self._capture_chunk_frames(capture_rate)
+        print(f"[Jarvis] Mic format: {capture_rate} Hz x{capture_channels} -> {SEND_SAMPLE_RATE} Hz mono")
+
+        print(f"[Jarvis] Mic capture mode: {self.capture_mode}")
 
         if __debug__:
             kwargs = {"exception_on_overflow": False}
         else:
             kwargs = {}
         
-        # VAD Constants
-        VAD_THRESHOLD = 800 # Adj based on mic sensitivity (800 is conservative for 16-bit)
-        SILENCE_DURATION = 0.5 # Seconds of silence to consider "done speaking"
-        
         while True:
             if self.paused:
+                if self.mic_capture:
+                    # The callback keeps filling the ring while muted; don't replay stale audio
+                    self.mic_capture.discard_buffered()
+                self.reconnect_buffer.clear()
                 await asyncio.sleep(0.1)
                 continue
 
             try:
-                data = await asyncio.to_thread(self.audio_stream.read, CHUNK_SIZE, **kwargs)
-                
-                # 1. Send Audio
-                if self.out_queue:
-                    await self.out_queue.put({"data": data, "mime_type": "audio/pcm"})
-                
-                # 2. VAD Logic for Video
-                # rms = audioop.rms(data, 2)
-                # Replacement for audioop.rms(data, 2)
-                count = len(data) // 2
-                if count > 0:
-                    shorts = struct.unpack(f"<{count}h", data)
-                    sum_squares = sum(s**2 for s in shorts)
-                    rms = int(math.sqrt(sum_squares / count))
+                if self.mic_capture:
+                    raw = await self.mic_capture.read()
                 else:
-                    rms = 0
+                    raw = await run_in(AUDIO, self.audio_stream.read, capture_chunk, **kwargs)
+                data = self.resampler.process(raw)
                 
-                if rms > VAD_THRESHOLD:
-                    # Speech Detected
-                    self._silence_start_time = None
-                    
-                    if not self._is_speaking:
-                        # NEW Speech Utterance Started
-                        self._is_speaking = True
-                        print(f"[Jarvis DEBUG] [VAD] Speech Detected (RMS: {rms}). Sending Video Frame.")
-                        
-                        # Send ONE frame
-                        if self._latest_image_payload and self.out_queue:
-                            await self.out_queue.put(self._latest_image_payload)
-                        else:
-                            print(f"[Jarvis DEBUG] [VAD] No video frame available to send.")
-                            
+                # 1. VAD
+                # The VAD clears silence_start_time on SPEECH_END; keep it for the latency trace
+                prev_silence_start = self._silence_start_time
+                vad_event = self.vad.process(data)
+                self._is_speaking = self.vad.is_speaking
+                self._silence_start_time = self.vad.silence_start_time
+
+                # 2. Send Audio (through the silence gate if enabled)
+                if self.silence_gate:
+                    for block in self.silence_gate.process(data, self._is_speaking, self._silence_start_time):
+                        await self._enqueue_mic_audio(block)
                 else:
-                    # Silence
-                    if self._is_speaking:
-                        if self._silence_start_time is None:
-                            self._silence_start_time = time.time()
-                        
-                        elif time.time() - self._silence_start_time > SILENCE_DURATION:
-                            # Silence confirmed, reset state
-                            print(f"[Jarvis DEBUG] [VAD] Silence detected. Resetting speech state.")
-                            self._is_speaking = False
-                            self._silence_start_time = None
+                    await self._enqueue_mic_audio(data)
+
+                # 3. VAD Logic for Video
+
+                if vad_event == SPEECH_START:
+                    # NEW Speech Utterance Started
+                    print(f"[Jarvis DEBUG] [VAD] Speech Detected (RMS: {int(self.vad.last_rms)}, threshold: {int(self.vad.threshold)}). Sending Video Frame.")
+                    
+                    # Send ONE frame (skipped if the scene hasn't changed since the last one)
+                    image_payload = await self.get_image_payload("vad_onset") if self.out_queue else None
+                    if image_payload and self.out_queue:
+                        await self.out_queue.put(image_payload)
+                    else:
+                        print(f"[Jarvis DEBUG] [VAD] No new video frame to send.")
+
+                elif vad_event == SPEECH_END:
+                    print(f"[Jarvis DEBUG] [VAD] Silence detected. Resetting speech state.")
+                    self.latency.speech_end(at=prev_silence_start)
 
             except Exception as e:
                 print(f"Error reading audio: {e}")
@@ -577,8 +830,8 @@ class AudioLoop:
         if self.on_cad_status:
             self.on_cad_status("generating")
             
-        # Auto-create project if stuck in temp
-        if self.project_manager.current_project == "temp":
+        # Auto-create project if stuck in temp (or a session scratch project)
+        if self.project_manager.is_scratch():
             import datetime
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             new_project_name = f"Project_{timestamp}"
@@ -620,7 +873,7 @@ class AudioLoop:
             # Notify the model that the task is done - this triggers speech about completion
             completion_msg = "System Notification: CAD generation is complete! The 3D model is now displayed for the user. Let them know it's ready."
             try:
-                await self.session.send(input=completion_msg, end_of_turn=True)
+                await self._notify_model(completion_msg)
                 print(f"[Jarvis DEBUG] [NOTE] Sent completion notification to model.")
             except Exception as e:
                  print(f"[Jarvis DEBUG] [ERR] Failed to send completion notification: {e}")
@@ -629,7 +882,7 @@ class AudioLoop:
             print(f"[Jarvis DEBUG] [ERR] CadAgent returned None.")
             # Optionally notify failure
             try:
-                await self.session.send(input="System Notification: CAD generation failed.", end_of_turn=True)
+                await self._notify_model("System Notification: CAD generation failed.")
             except Exception:
                 pass
 
@@ -638,8 +891,8 @@ class AudioLoop:
     async def handle_write_file(self, path, content):
         print(f"[Jarvis DEBUG] [FS] Writing file: '{path}'")
         
-        # Auto-create project if stuck in temp
-        if self.project_manager.current_project == "temp":
+        # Auto-create project if stuck in temp (or a session scratch project)
+        if self.project_manager.is_scratch():
             import datetime
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             new_project_name = f"Project_{timestamp}"
@@ -685,7 +938,7 @@ class AudioLoop:
 
         print(f"[Jarvis DEBUG] [FS] Result: {result}")
         try:
-             await self.session.send(input=f"System Notification: {result}", end_of_turn=True)
+             await self._notify_model(f"System Notification: {result}")
         except Exception as e:
              print(f"[Jarvis DEBUG] [ERR] Failed to send fs result: {e}")
 
@@ -702,7 +955,7 @@ class AudioLoop:
 
         print(f"[Jarvis DEBUG] [FS] Result: {result}")
         try:
-             await self.session.send(input=f"System Notification: {result}", end_of_turn=True)
+             await self._notify_model(f"System Notification: {result}")
         except Exception as e:
              print(f"[Jarvis DEBUG] [ERR] Failed to send fs result: {e}")
 
@@ -720,7 +973,7 @@ class AudioLoop:
 
         print(f"[Jarvis DEBUG] [FS] Result: {result}")
         try:
-             await self.session.send(input=f"System Notification: {result}", end_of_turn=True)
+             await self._notify_model(f"System Notification: {result}")
         except Exception as e:
              print(f"[Jarvis DEBUG] [ERR] Failed to send fs result: {e}")
 
@@ -737,10 +990,450 @@ class AudioLoop:
         
         # Send the final result back to the main model
         try:
-             await self.session.send(input=f"System Notification: Web Agent has finished.\nResult: {result}", end_of_turn=True)
+             await self._notify_model(f"System Notification: Web Agent has finished.\nResult: {result}")
         except Exception as e:
              print(f"[Jarvis DEBUG] [ERR] Failed to send web agent result to model: {e}")
 
+    def _register_tools(self):
+        """
+        One entry per function the model may call. Background tools are
+        acknowledged immediately and report back via System Notifications;
+        foreground tools answer with their result. Read-only tools get a
+        cache_ttl; tools that change state invalidate what they make stale.
+        """
+        reg = self.tools.register
+        # Both may create a named project for work started in a scratch project
+        reg("generate_cad", self._tool_generate_cad, background=True, timeout=None, invalidates=("list_projects",))
+        reg("run_web_agent", self._tool_run_web_agent, background=True, timeout=None,
+            ack="Web Navigation started. Do not reply to this message.")
+        reg("write_file", self._tool_write_file, background=True, ack="Writing file...", invalidates=("list_projects",))
+        reg("read_directory", self._tool_read_directory, background=True, ack="Reading directory...")
+        reg("read_file", self._tool_read_file, background=True, ack="Reading file...")
+        reg("create_project", self._tool_create_project, timeout=10.0, concurrency=1, invalidates=("list_projects",))
+        reg("switch_project", self._tool_switch_project, timeout=10.0, concurrency=1, invalidates=("list_projects",))
+        reg("list_projects", self._tool_list_projects, timeout=10.0, cache_ttl=30)
+        # Not cached: every call also pushes the device list to the frontend (and only reads KasaAgent's memory)
+        reg("list_smart_devices", self._tool_list_smart_devices, timeout=5.0)
+        reg("control_light", self._tool_control_light, timeout=15.0)
+        reg("discover_printers", self._tool_discover_printers, timeout=30.0, concurrency=1)
+        # Slicing + upload can take minutes: run as a job (bounded inside the handler) so the receive loop isn't held
+        reg("print_stl", self._tool_print_stl, background=True, timeout=None,
+            ack="Print job started. You will get a System Notification with the result.")
+        reg("get_print_status", self._tool_get_print_status, timeout=15.0)
+        reg("iterate_cad", self._tool_iterate_cad, background=True, timeout=None,
+            ack="Updating the design. You will get a System Notification when it is ready.")
+        reg("get_briefing", self._tool_get_briefing, timeout=45.0, cache_ttl=120)
+        reg("get_today_schedule", self._tool_get_today_schedule, timeout=20.0, cache_ttl=60)
+        reg("reschedule_event", self._tool_reschedule_event, timeout=20.0, concurrency=1,
+            invalidates=("get_today_schedule", "get_briefing"))
+        reg("get_system_status", self._tool_get_system_status, timeout=15.0, cache_ttl=10)
+        reg("kill_process", self._tool_kill_process, timeout=15.0, concurrency=1,
+            invalidates=("get_system_status", "get_briefing"))
+        reg("web_search", self._tool_web_search, timeout=20.0, cache_ttl=300)
+        reg("wikipedia_lookup", self._tool_wikipedia_lookup, timeout=20.0, cache_ttl=3600)
+
+    def get_job_stats(self):
+        """Background job counts and the live job table."""
+        return self.jobs.stats()
+
+    def cancel_job(self, job_id):
+        return self.jobs.cancel(job_id)
+
+    async def _notify_model(self, text, end_of_turn=True, wait=30.0):
+        """
+        Send a System Notification from a background job. If the session is
+        reconnecting, wait (up to `wait` s) for the new one instead of
+        sending into the dead one.
+        """
+        try:
+            await asyncio.wait_for(self.session_ready.wait(), wait)
+        except asyncio.TimeoutError:
+            print(f"[Jarvis DEBUG] [ERR] No Live session for {wait:g}s, dropping notification.")
+            return False
+        await self.session.send(input=text, end_of_turn=end_of_turn)
+        return True
+
+    def get_tool_stats(self):
+        """Per-tool call counts, errors/timeouts and latency percentiles, plus pending confirmations."""
+        return {**self.tools.stats(), "confirmations": self.pending_calls.stats()}
+
+    async def _execute_tool_call(self, fc):
+        """
+        Permission check + registry call for one function call. Returns a
+        FunctionResponse, or None if there is nothing to send yet (no-response
+        tools, or calls parked for confirmation).
+        """
+        if fc.name not in self.tools:
+            print(f"[Jarvis DEBUG] [WARN] Unknown tool '{fc.name}' ignored.")
+            return None
+
+        # Check Permissions (Default to True if not set)
+        if not self.permissions.get(fc.name, True):
+            print(f"[Jarvis DEBUG] [TOOL] Permission check: '{fc.name}' -> AUTO-ALLOW")
+            return await self._run_tool_call(fc)
+
+        # Park the call until the user answers; the response is sent from on_resolved
+        session = self.session
+
+        async def on_resolved(confirmed, reason):
+            if reason == "session_ended" or self.session is not session:
+                # The call belongs to a Live session that no longer exists
+                return
+            try:
+                if confirmed:
+                    response = await self._run_tool_call(fc)
+                else:
+                    response = self._denied_tool_response(fc, reason)
+                if response is not None:
+                    await self._send_tool_response(response)
+            except Exception as e:
+                print(f"[Jarvis DEBUG] [ERR] Failed to complete confirmed call '{fc.name}': {e}")
+
+        self.pending_calls.park(fc.name, fc.args, on_resolved)
+        return None
+
+    async def _run_tool_call(self, fc):
+        result = await self.tools.call(fc.name, dict(fc.args or {}))
+        if result is None:
+            return None
+        return types.FunctionResponse(id=fc.id, name=fc.name, response={"result": result})
+
+    def _denied_tool_response(self, fc, reason):
+        print(f"[Jarvis DEBUG] [DENY] Tool call '{fc.name}' denied ({reason}).")
+        self.tools.record_denied(fc.name)
+        if reason == "timeout":
+            result = "The user did not confirm this tool call in time, so it was not run."
+        else:
+            result = "User denied the request to use this tool."
+        return types.FunctionResponse(id=fc.id, name=fc.name, response={"result": result})
+
+    async def _send_tool_response(self, function_response):
+        print(f"[Jarvis DEBUG] [RESPONSE] Sending function response for '{function_response.name}'")
+        await self.session.send_tool_response(function_responses=[function_response])
+
+    async def _tool_generate_cad(self, args):
+        prompt = args.get("prompt", "")
+        print(f"\n[Jarvis DEBUG] --------------------------------------------------")
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call Detected: 'generate_cad'")
+        print(f"[Jarvis DEBUG] [IN] Arguments: prompt='{prompt}'")
+        # No function response needed - model already acknowledged when user asked
+        await self.handle_cad_request(prompt)
+
+    async def _tool_run_web_agent(self, args):
+        prompt = args.get("prompt", "")
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'run_web_agent' with prompt='{prompt}'")
+        await self.handle_web_agent_request(prompt)
+
+    async def _tool_write_file(self, args):
+        path = args["path"]
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'write_file' path='{path}'")
+        await self.handle_write_file(path, args["content"])
+
+    async def _tool_read_directory(self, args):
+        path = args["path"]
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'read_directory' path='{path}'")
+        await self.handle_read_directory(path)
+
+    async def _tool_read_file(self, args):
+        path = args["path"]
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'read_file' path='{path}'")
+        await self.handle_read_file(path)
+
+    async def _tool_create_project(self, args):
+        name = args["name"]
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'create_project' name='{name}'")
+        success, msg = self.project_manager.create_project(name)
+        if success:
+            # Auto-switch to the newly created project
+            self.project_manager.switch_project(name)
+            msg += f" Switched to '{name}'."
+            if self.on_project_update:
+                self.on_project_update(name)
+        return msg
+
+    async def _tool_switch_project(self, args):
+        name = args["name"]
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'switch_project' name='{name}'")
+        success, msg = self.project_manager.switch_project(name)
+        if success:
+            if self.on_project_update:
+                self.on_project_update(name)
+            # Gather project context and send to AI (silently, no response expected)
+            context = self.project_manager.get_project_context()
+            print(f"[Jarvis DEBUG] [PROJECT] Sending project context to AI ({len(context)} chars)")
+            try:
+                await self.session.send(input=f"System Notification: {msg}\n\n{context}", end_of_turn=False)
+            except Exception as e:
+                print(f"[Jarvis DEBUG] [ERR] Failed to send project context: {e}")
+        return msg
+
+    async def _tool_list_projects(self, args):
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'list_projects'")
+        projects = self.project_manager.list_projects()
+        return f"Available projects: {', '.join(projects)}"
+
+    def _kasa_device_list(self):
+        """Frontend representation of the KasaAgent's cached devices."""
+        devices = []
+        for ip, dev in self.kasa_agent.devices.items():
+            dev_type = "unknown"
+            if dev.is_bulb: dev_type = "bulb"
+            elif dev.is_plug: dev_type = "plug"
+            elif dev.is_strip: dev_type = "strip"
+            elif dev.is_dimmer: dev_type = "dimmer"
+
+            devices.append({
+                "ip": ip,
+                "alias": dev.alias,
+                "model": dev.model,
+                "type": dev_type,
+                "is_on": dev.is_on,
+                "brightness": dev.brightness if dev.is_bulb or dev.is_dimmer else None,
+                "hsv": dev.hsv if dev.is_bulb and dev.is_color else None,
+                "has_color": dev.is_color if dev.is_bulb else False,
+                "has_brightness": dev.is_dimmable if dev.is_bulb or dev.is_dimmer else False
+            })
+        return devices
+
+    async def _tool_list_smart_devices(self, args):
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'list_smart_devices'")
+        # Use cached devices directly for speed
+        frontend_list = self._kasa_device_list()
+        dev_summaries = [
+            f"{d['alias']} (IP: {d['ip']}, Type: {d['type']}) {'[ON]' if d['is_on'] else '[OFF]'}"
+            for d in frontend_list
+        ]
+
+        result_str = "No devices found in cache."
+        if dev_summaries:
+            result_str = "Found Devices (Cached):\n" + "\n".join(dev_summaries)
+
+        # Trigger frontend update
+        if self.on_device_update:
+            self.on_device_update(frontend_list)
+        return result_str
+
+    async def _tool_control_light(self, args):
+        target = args["target"]
+        action = args["action"]
+        brightness = args.get("brightness")
+        color = args.get("color")
+
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'control_light' Target='{target}' Action='{action}'")
+
+        result_msg = f"Action '{action}' on '{target}' failed."
+        success = False
+
+        if action == "turn_on":
+            success = await self.kasa_agent.turn_on(target)
+            if success:
+                result_msg = f"Turned ON '{target}'."
+        elif action == "turn_off":
+            success = await self.kasa_agent.turn_off(target)
+            if success:
+                result_msg = f"Turned OFF '{target}'."
+        elif action == "set":
+            success = True
+            result_msg = f"Updated '{target}':"
+
+        # Apply extra attributes if 'set' or if we just turned it on and want to set them too
+        if success or action == "set":
+            if brightness is not None:
+                sb = await self.kasa_agent.set_brightness(target, brightness)
+                if sb:
+                    result_msg += f" Set brightness to {brightness}."
+            if color is not None:
+                sc = await self.kasa_agent.set_color(target, color)
+                if sc:
+                    result_msg += f" Set color to {color}."
+
+        # Notify Frontend of State Change
+        if success:
+            # KasaAgent updates its internal state on control, so we can rebuild the list
+            if self.on_device_update:
+                self.on_device_update(self._kasa_device_list())
+        else:
+            # Report Error
+            if self.on_error:
+                self.on_error(result_msg)
+        return result_msg
+
+    async def _tool_discover_printers(self, args):
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'discover_printers'")
+        printers = await self.printer_agent.discover_printers()
+        # Format for model
+        if printers:
+            printer_list = []
+            for p in printers:
+                printer_list.append(f"{p['name']} ({p['host']}:{p['port']}, type: {p['printer_type']})")
+            return "Found Printers:\n" + "\n".join(printer_list)
+        return "No printers found on network. Ensure printers are on and running OctoPrint/Moonraker."
+
+    async def _tool_print_stl(self, args):
+        stl_path = args["stl_path"]
+        printer = args["printer"]
+        profile = args.get("profile")
+
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'print_stl' STL='{stl_path}' Printer='{printer}'")
+
+        # Resolve 'current' to project STL
+        if stl_path.lower() == "current":
+            stl_path = "output.stl" # Let printer agent resolve it in root_path
+
+        # Get current project path
+        project_path = str(self.project_manager.get_current_project_path())
+
+        try:
+            result = await asyncio.wait_for(
+                self.printer_agent.print_stl(stl_path, printer, profile, root_path=project_path),
+                PRINT_STL_TIMEOUT,
+            )
+            message = result.get("message", "Unknown result")
+        except asyncio.TimeoutError:
+            message = f"Printing on '{printer}' timed out after {PRINT_STL_TIMEOUT:g} seconds."
+        except Exception as e:
+            await self._notify_model(f"System Notification: Print job on '{printer}' failed: {e}")
+            raise
+        await self._notify_model(f"System Notification: Print job on '{printer}' finished.\nResult: {message}")
+
+    async def _tool_get_print_status(self, args):
+        printer = args["printer"]
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'get_print_status' Printer='{printer}'")
+
+        status = await self.printer_agent.get_print_status(printer)
+        if not status:
+            return f"Could not get status for printer '{printer}'. Ensure it is discovered first."
+
+        result_str = f"Printer: {status.printer}\n"
+        result_str += f"State: {status.state}\n"
+        result_str += f"Progress: {status.progress_percent:.1f}%\n"
+        if status.time_remaining:
+            result_str += f"Time Remaining: {status.time_remaining}\n"
+        if status.time_elapsed:
+            result_str += f"Time Elapsed: {status.time_elapsed}\n"
+        if status.filename:
+            result_str += f"File: {status.filename}\n"
+        if status.temperatures:
+            temps = status.temperatures
+            if "hotend" in temps:
+                result_str += f"Hotend: {temps['hotend']['current']:.0f}°C / {temps['hotend']['target']:.0f}°C\n"
+            if "bed" in temps:
+                result_str += f"Bed: {temps['bed']['current']:.0f}°C / {temps['bed']['target']:.0f}°C"
+        return result_str
+
+    async def _tool_iterate_cad(self, args):
+        prompt = args["prompt"]
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'iterate_cad' Prompt='{prompt}'")
+
+        # Emit status
+        if self.on_cad_status:
+            self.on_cad_status("generating")
+
+        # Get project cad folder path
+        cad_output_dir = str(self.project_manager.get_current_project_path() / "cad")
+
+        # Call CadAgent to iterate on the design
+        try:
+            cad_data = await self.cad_agent.iterate_prototype(prompt, output_dir=cad_output_dir)
+        except Exception as e:
+            await self._notify_model(f"System Notification: Failed to iterate design with prompt: {prompt}\nError: {e}")
+            raise
+
+        if not cad_data:
+            print(f"[Jarvis DEBUG] [ERR] CadAgent iteration returned None.")
+            await self._notify_model(f"System Notification: Failed to iterate design with prompt: {prompt}")
+            return
+
+        print(f"[Jarvis DEBUG] [OK] CadAgent iteration returned data successfully.")
+
+        # Dispatch to frontend
+        if self.on_cad_data:
+            print(f"[Jarvis DEBUG] [SEND] Dispatching iterated CAD data to frontend...")
+            self.on_cad_data(cad_data)
+            print(f"[Jarvis DEBUG] [SENT] Dispatch complete.")
+
+        # Save to Project
+        self.project_manager.save_cad_artifact("output.stl", f"Iteration: {prompt}")
+
+        await self._notify_model(f"System Notification: Successfully iterated design: {prompt}. The updated 3D model is now displayed.")
+
+    async def _tool_get_briefing(self, args):
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'get_briefing'")
+        if get_briefing is None:
+            return ToolFailure("Briefing module not available.")
+        briefing = await run_in(
+            TOOLS,
+            get_briefing,
+            include_weather=True,
+            include_system=True,
+            include_news=bool(args.get("include_news", False)),
+            include_stocks=bool(args.get("include_stocks", False)),
+        )
+        return format_briefing_for_model(briefing) if format_briefing_for_model else str(briefing)
+
+    async def _tool_get_today_schedule(self, args):
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'get_today_schedule'")
+        if get_today_schedule is None:
+            return ToolFailure("Calendar not available.")
+        schedule = await run_in(TOOLS, get_today_schedule)
+        return format_schedule_for_speech(schedule) if format_schedule_for_speech else str(schedule.get("events", []))
+
+    async def _tool_reschedule_event(self, args):
+        event_id = args.get("event_id")
+        new_start = args.get("new_start_iso")
+        new_end = args.get("new_end_iso")
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'reschedule_event' event_id={event_id}")
+        if productivity_reschedule_event is None:
+            return "Calendar not available."
+        out = await run_in(
+            TOOLS, productivity_reschedule_event, "primary", event_id, new_start, new_end
+        )
+        return out.get("error", "Event rescheduled.") if not out.get("success") else "Event rescheduled successfully."
+
+    async def _tool_get_system_status(self, args):
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'get_system_status'")
+        if get_system_status is None or format_system_status_for_speech is None:
+            return ToolFailure("System ops not available.")
+        status = await run_in(TOOLS, get_system_status)
+        return format_system_status_for_speech(status)
+
+    async def _tool_kill_process(self, args):
+        name_sub = args.get("name_substring")
+        pid = args.get("pid")
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'kill_process' name_substring={name_sub} pid={pid}")
+        if kill_process_by_name is None and kill_process_by_pid is None:
+            return "System ops not available."
+        if pid is not None:
+            ok, result_str = await run_in(TOOLS, kill_process_by_pid, int(pid))
+        elif name_sub:
+            ok, result_str = await run_in(TOOLS, kill_process_by_name, name_sub)
+        else:
+            result_str = "Provide name_substring or pid."
+        return result_str
+
+    async def _tool_web_search(self, args):
+        query = args.get("query", "")
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'web_search' query='{query}'")
+        if search_web is None:
+            return ToolFailure("Web search not available.")
+        results = await run_in(TOOLS, search_web, query, 5)
+        if results and results[0].get("error"):
+            return ToolFailure(results[0]["error"])
+        return "\n".join(
+            f"- {r.get('title', '')}: {r.get('snippet', '')[:200]}..."
+            for r in (results or [])[:5]
+        ) or "No results."
+
+    async def _tool_wikipedia_lookup(self, args):
+        query = args.get("query", "")
+        print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'wikipedia_lookup' query='{query}'")
+        if wikipedia_summary is None:
+            return ToolFailure("Wikipedia lookup not available.")
+        out = await run_in(TOOLS, wikipedia_summary, query)
+        if out.get("error"):
+            return ToolFailure(out["error"])
+        return f"{out.get('title', '')}\n{out.get('summary', '')}"
+
     async def receive_audio(self):
         "Background task to reads from the websocket and write pcm chunks to the output queue"
         try:
@@ -749,6 +1442,7 @@ class AudioLoop:
                 async for response in turn:
                     # 1. Handle Audio Data
                     if data := response.data:
+                        self.latency.mark("first_audio")
                         self.audio_in_queue.put_nowait(data)
                         # NOTE: 'continue' removed here to allow processing transcription/tools in same packet
 
@@ -757,6 +1451,7 @@ class AudioLoop:
                         if response.server_content.input_transcription:
                             transcript = response.server_content.input_transcription.text
                             if transcript:
+                                self.latency.mark("first_input_transcription")
                                 # Skip if this is an exact duplicate event
                                 if transcript != self._last_input_transcription:
                                     # Calculate delta (Gemini may send cumulative or chunk-based text)
@@ -788,6 +1483,7 @@ class AudioLoop:
                         if response.server_content.output_transcription:
                             transcript = response.server_content.output_transcription.text
                             if transcript:
+                                self.latency.mark("first_output_transcription")
                                 # Skip if this is an exact duplicate event
                                 if transcript != self._last_output_transcription:
                                     # Calculate delta (Gemini may send cumulative or chunk-based text)
@@ -820,504 +1516,19 @@ class AudioLoop:
                     # 3. Handle Tool Calls
                     if response.tool_call:
                         print("The tool was called")
-                        function_responses = []
-                        for fc in response.tool_call.function_calls:
-                            if fc.name in ["generate_cad", "run_web_agent", "write_file", "read_directory", "read_file", "create_project", "switch_project", "list_projects", "list_smart_devices", "control_light", "discover_printers", "print_stl", "get_print_status", "iterate_cad", "get_briefing", "get_today_schedule", "reschedule_event", "get_system_status", "kill_process", "web_search", "wikipedia_lookup"]:
-                                prompt = fc.args.get("prompt", "") # Prompt is not present for all tools
-                                
-                                # Check Permissions (Default to True if not set)
-                                confirmation_required = self.permissions.get(fc.name, True)
-                                confirmed = False
-                                if not confirmation_required:
-                                    print(f"[Jarvis DEBUG] [TOOL] Permission check: '{fc.name}' -> AUTO-ALLOW")
-                                    confirmed = True
-                                else:
-                                    # Confirmation Logic
-                                    import uuid
-                                    request_id = str(uuid.uuid4())
-                                    print(f"[Jarvis DEBUG] [STOP] Requesting confirmation for '{fc.name}' (ID: {request_id})")
-                                    
-                                    future = asyncio.Future()
-                                    self._pending_confirmations[request_id] = future
-                                    
-                                    self.on_tool_confirmation({
-                                        "id": request_id, 
-                                        "tool": fc.name, 
-                                        "args": fc.args
-                                    })
-                                    
-                                    try:
-                                        # Wait for user response
-                                        confirmed = await future
-
-                                    finally:
-                                        self._pending_confirmations.pop(request_id, None)
-
-                                    print(f"[Jarvis DEBUG] [CONFIRM] Request {request_id} resolved. Confirmed: {confirmed}")
-
-                                    if not confirmed:
-                                        print(f"[Jarvis DEBUG] [DENY] Tool call '{fc.name}' denied by user.")
-                                        function_response = types.FunctionResponse(
-                                            id=fc.id,
-                                            name=fc.name,
-                                            response={
-                                                "result": "User denied the request to use this tool.",
-                                            }
-                                        )
-                                        function_responses.append(function_response)
-                                        continue
-
-                                # If confirmed (or no callback configured, or auto-allowed), proceed
-                                if fc.name == "generate_cad":
-                                    print(f"\n[Jarvis DEBUG] --------------------------------------------------")
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call Detected: 'generate_cad'")
-                                    print(f"[Jarvis DEBUG] [IN] Arguments: prompt='{prompt}'")
-                                    
-                                    asyncio.create_task(self.handle_cad_request(prompt))
-                                    # No function response needed - model already acknowledged when user asked
-                                
-                                elif fc.name == "run_web_agent":
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'run_web_agent' with prompt='{prompt}'")
-                                    asyncio.create_task(self.handle_web_agent_request(prompt))
-                                    
-                                    result_text = "Web Navigation started. Do not reply to this message."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id,
-                                        name=fc.name,
-                                        response={
-                                            "result": result_text,
-                                        }
-                                    )
-                                    print(f"[Jarvis DEBUG] [RESPONSE] Sending function response: {function_response}")
-                                    function_responses.append(function_response)
-
-
-
-                                elif fc.name == "write_file":
-                                    path = fc.args["path"]
-                                    content = fc.args["content"]
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'write_file' path='{path}'")
-                                    asyncio.create_task(self.handle_write_file(path, content))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Writing file..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "read_directory":
-                                    path = fc.args["path"]
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'read_directory' path='{path}'")
-                                    asyncio.create_task(self.handle_read_directory(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Reading directory..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "read_file":
-                                    path = fc.args["path"]
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'read_file' path='{path}'")
-                                    asyncio.create_task(self.handle_read_file(path))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": "Reading file..."}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "create_project":
-                                    name = fc.args["name"]
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'create_project' name='{name}'")
-                                    success, msg = self.project_manager.create_project(name)
-                                    if success:
-                                        # Auto-switch to the newly created project
-                                        self.project_manager.switch_project(name)
-                                        msg += f" Switched to '{name}'."
-                                        if self.on_project_update:
-                                            self.on_project_update(name)
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "switch_project":
-                                    name = fc.args["name"]
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'switch_project' name='{name}'")
-                                    success, msg = self.project_manager.switch_project(name)
-                                    if success:
-                                        if self.on_project_update:
-                                            self.on_project_update(name)
-                                        # Gather project context and send to AI (silently, no response expected)
-                                        context = self.project_manager.get_project_context()
-                                        print(f"[Jarvis DEBUG] [PROJECT] Sending project context to AI ({len(context)} chars)")
-                                        try:
-                                            await self.session.send(input=f"System Notification: {msg}\n\n{context}", end_of_turn=False)
-                                        except Exception as e:
-                                            print(f"[Jarvis DEBUG] [ERR] Failed to send project context: {e}")
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": msg}
-                                    )
-                                    function_responses.append(function_response)
-                                
-                                elif fc.name == "list_projects":
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'list_projects'")
-                                    projects = self.project_manager.list_projects()
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": f"Available projects: {', '.join(projects)}"}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "list_smart_devices":
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'list_smart_devices'")
-                                    # Use cached devices directly for speed
-                                    # devices_dict is {ip: SmartDevice}
-                                    
-                                    dev_summaries = []
-                                    frontend_list = []
-                                    
-                                    for ip, d in self.kasa_agent.devices.items():
-                                        dev_type = "unknown"
-                                        if d.is_bulb: dev_type = "bulb"
-                                        elif d.is_plug: dev_type = "plug"
-                                        elif d.is_strip: dev_type = "strip"
-                                        elif d.is_dimmer: dev_type = "dimmer"
-                                        
-                                        # Format for Model
-                                        info = f"{d.alias} (IP: {ip}, Type: {dev_type})"
-                                        if d.is_on:
-                                            info += " [ON]"
-                                        else:
-                                            info += " [OFF]"
-                                        dev_summaries.append(info)
-                                        
-                                        # Format for Frontend
-                                        frontend_list.append({
-                                            "ip": ip,
-                                            "alias": d.alias,
-                                            "model": d.model,
-                                            "type": dev_type,
-                                            "is_on": d.is_on,
-                                            "brightness": d.brightness if d.is_bulb or d.is_dimmer else None,
-                                            "hsv": d.hsv if d.is_bulb and d.is_color else None,
-                                            "has_color": d.is_color if d.is_bulb else False,
-                                            "has_brightness": d.is_dimmable if d.is_bulb or d.is_dimmer else False
-                                        })
-                                    
-                                    result_str = "No devices found in cache."
-                                    if dev_summaries:
-                                        result_str = "Found Devices (Cached):\n" + "\n".join(dev_summaries)
-                                    
-                                    # Trigger frontend update
-                                    if self.on_device_update:
-                                        self.on_device_update(frontend_list)
-
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "control_light":
-                                    target = fc.args["target"]
-                                    action = fc.args["action"]
-                                    brightness = fc.args.get("brightness")
-                                    color = fc.args.get("color")
-                                    
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'control_light' Target='{target}' Action='{action}'")
-                                    
-                                    result_msg = f"Action '{action}' on '{target}' failed."
-                                    success = False
-                                    
-                                    if action == "turn_on":
-                                        success = await self.kasa_agent.turn_on(target)
-                                        if success:
-                                            result_msg = f"Turned ON '{target}'."
-                                    elif action == "turn_off":
-                                        success = await self.kasa_agent.turn_off(target)
-                                        if success:
-                                            result_msg = f"Turned OFF '{target}'."
-                                    elif action == "set":
-                                        success = True
-                                        result_msg = f"Updated '{target}':"
-                                    
-                                    # Apply extra attributes if 'set' or if we just turned it on and want to set them too
-                                    if success or action == "set":
-                                        if brightness is not None:
-                                            sb = await self.kasa_agent.set_brightness(target, brightness)
-                                            if sb:
-                                                result_msg += f" Set brightness to {brightness}."
-                                        if color is not None:
-                                            sc = await self.kasa_agent.set_color(target, color)
-                                            if sc:
-                                                result_msg += f" Set color to {color}."
-
-                                    # Notify Frontend of State Change
-                                    if success:
-                                        # We don't need full discovery, just refresh known state or push update
-                                        # But for simplicity, let's get the standard list representation
-                                        # KasaAgent updates its internal state on control, so we can rebuild the list
-                                        
-                                        # Quick rebuild of list from internal dict
-                                        updated_list = []
-                                        for ip, dev in self.kasa_agent.devices.items():
-                                            # We need to ensure we have the correct dict structure expected by frontend
-                                            # We duplicate logic from KasaAgent.discover_devices a bit, but that's okay for now or we can add a helper
-                                            # Ideally KasaAgent has a 'get_devices_list()' method.
-                                            # Use the cached objects in self.kasa_agent.devices
-                                            
-                                            dev_type = "unknown"
-                                            if dev.is_bulb: dev_type = "bulb"
-                                            elif dev.is_plug: dev_type = "plug"
-                                            elif dev.is_strip: dev_type = "strip"
-                                            elif dev.is_dimmer: dev_type = "dimmer"
-
-                                            d_info = {
-                                                "ip": ip,
-                                                "alias": dev.alias,
-                                                "model": dev.model,
-                                                "type": dev_type,
-                                                "is_on": dev.is_on,
-                                                "brightness": dev.brightness if dev.is_bulb or dev.is_dimmer else None,
-                                                "hsv": dev.hsv if dev.is_bulb and dev.is_color else None,
-                                                "has_color": dev.is_color if dev.is_bulb else False,
-                                                "has_brightness": dev.is_dimmable if dev.is_bulb or dev.is_dimmer else False
-                                            }
-                                            updated_list.append(d_info)
-                                            
-                                        if self.on_device_update:
-                                            self.on_device_update(updated_list)
-                                    else:
-                                        # Report Error
-                                        if self.on_error:
-                                            self.on_error(result_msg)
-
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_msg}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "discover_printers":
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'discover_printers'")
-                                    printers = await self.printer_agent.discover_printers()
-                                    # Format for model
-                                    if printers:
-                                        printer_list = []
-                                        for p in printers:
-                                            printer_list.append(f"{p['name']} ({p['host']}:{p['port']}, type: {p['printer_type']})")
-                                        result_str = "Found Printers:\n" + "\n".join(printer_list)
-                                    else:
-                                        result_str = "No printers found on network. Ensure printers are on and running OctoPrint/Moonraker."
-                                    
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "print_stl":
-                                    stl_path = fc.args["stl_path"]
-                                    printer = fc.args["printer"]
-                                    profile = fc.args.get("profile")
-                                    
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'print_stl' STL='{stl_path}' Printer='{printer}'")
-                                    
-                                    # Resolve 'current' to project STL
-                                    if stl_path.lower() == "current":
-                                        stl_path = "output.stl" # Let printer agent resolve it in root_path
-
-                                    # Get current project path
-                                    project_path = str(self.project_manager.get_current_project_path())
-                                    
-                                    result = await self.printer_agent.print_stl(
-                                        stl_path, 
-                                        printer, 
-                                        profile, 
-                                        root_path=project_path
-                                    )
-                                    result_str = result.get("message", "Unknown result")
-                                    
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "get_print_status":
-                                    printer = fc.args["printer"]
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'get_print_status' Printer='{printer}'")
-                                    
-                                    status = await self.printer_agent.get_print_status(printer)
-                                    if status:
-                                        result_str = f"Printer: {status.printer}\n"
-                                        result_str += f"State: {status.state}\n"
-                                        result_str += f"Progress: {status.progress_percent:.1f}%\n"
-                                        if status.time_remaining:
-                                            result_str += f"Time Remaining: {status.time_remaining}\n"
-                                        if status.time_elapsed:
-                                            result_str += f"Time Elapsed: {status.time_elapsed}\n"
-                                        if status.filename:
-                                            result_str += f"File: {status.filename}\n"
-                                        if status.temperatures:
-                                            temps = status.temperatures
-                                            if "hotend" in temps:
-                                                result_str += f"Hotend: {temps['hotend']['current']:.0f}°C / {temps['hotend']['target']:.0f}°C\n"
-                                            if "bed" in temps:
-                                                result_str += f"Bed: {temps['bed']['current']:.0f}°C / {temps['bed']['target']:.0f}°C"
-                                    else:
-                                        result_str = f"Could not get status for printer '{printer}'. Ensure it is discovered first."
-                                    
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "iterate_cad":
-                                    prompt = fc.args["prompt"]
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'iterate_cad' Prompt='{prompt}'")
-                                    
-                                    # Emit status
-                                    if self.on_cad_status:
-                                        self.on_cad_status("generating")
-                                    
-                                    # Get project cad folder path
-                                    cad_output_dir = str(self.project_manager.get_current_project_path() / "cad")
-                                    
-                                    # Call CadAgent to iterate on the design
-                                    cad_data = await self.cad_agent.iterate_prototype(prompt, output_dir=cad_output_dir)
-                                    
-                                    if cad_data:
-                                        print(f"[Jarvis DEBUG] [OK] CadAgent iteration returned data successfully.")
-                                        
-                                        # Dispatch to frontend
-                                        if self.on_cad_data:
-                                            print(f"[Jarvis DEBUG] [SEND] Dispatching iterated CAD data to frontend...")
-                                            self.on_cad_data(cad_data)
-                                            print(f"[Jarvis DEBUG] [SENT] Dispatch complete.")
-                                        
-                                        # Save to Project
-                                        self.project_manager.save_cad_artifact("output.stl", f"Iteration: {prompt}")
-                                        
-                                        result_str = f"Successfully iterated design: {prompt}. The updated 3D model is now displayed."
-                                    else:
-                                        print(f"[Jarvis DEBUG] [ERR] CadAgent iteration returned None.")
-                                        result_str = f"Failed to iterate design with prompt: {prompt}"
-                                    
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "get_briefing":
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'get_briefing'")
-                                    if get_briefing is None:
-                                        result_str = "Briefing module not available."
-                                    else:
-                                        inc_news = fc.args.get("include_news", False)
-                                        inc_stocks = fc.args.get("include_stocks", False)
-                                        briefing = await asyncio.to_thread(
-                                            get_briefing,
-                                            include_weather=True,
-                                            include_system=True,
-                                            include_news=bool(inc_news),
-                                            include_stocks=bool(inc_stocks),
-                                        )
-                                        result_str = format_briefing_for_model(briefing) if format_briefing_for_model else str(briefing)
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "get_today_schedule":
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'get_today_schedule'")
-                                    if get_today_schedule is None:
-                                        result_str = "Calendar not available."
-                                    else:
-                                        schedule = await asyncio.to_thread(get_today_schedule)
-                                        result_str = format_schedule_for_speech(schedule) if format_schedule_for_speech else str(schedule.get("events", []))
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "reschedule_event":
-                                    event_id = fc.args.get("event_id")
-                                    new_start = fc.args.get("new_start_iso")
-                                    new_end = fc.args.get("new_end_iso")
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'reschedule_event' event_id={event_id}")
-                                    if productivity_reschedule_event is None:
-                                        result_str = "Calendar not available."
-                                    else:
-                                        out = await asyncio.to_thread(
-                                            productivity_reschedule_event, "primary", event_id, new_start, new_end
-                                        )
-                                        result_str = out.get("error", "Event rescheduled.") if not out.get("success") else "Event rescheduled successfully."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "get_system_status":
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'get_system_status'")
-                                    if get_system_status is None or format_system_status_for_speech is None:
-                                        result_str = "System ops not available."
-                                    else:
-                                        status = await asyncio.to_thread(get_system_status)
-                                        result_str = format_system_status_for_speech(status)
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "kill_process":
-                                    name_sub = fc.args.get("name_substring")
-                                    pid = fc.args.get("pid")
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'kill_process' name_substring={name_sub} pid={pid}")
-                                    if kill_process_by_name is None and kill_process_by_pid is None:
-                                        result_str = "System ops not available."
-                                    elif pid is not None:
-                                        ok, result_str = await asyncio.to_thread(kill_process_by_pid, int(pid))
-                                    elif name_sub:
-                                        ok, result_str = await asyncio.to_thread(kill_process_by_name, name_sub)
-                                    else:
-                                        result_str = "Provide name_substring or pid."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "web_search":
-                                    query = fc.args.get("query", "")
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'web_search' query='{query}'")
-                                    if search_web is None:
-                                        result_str = "Web search not available."
-                                    else:
-                                        results = await asyncio.to_thread(search_web, query, 5)
-                                        if results and results[0].get("error"):
-                                            result_str = results[0]["error"]
-                                        else:
-                                            result_str = "\n".join(
-                                                f"- {r.get('title', '')}: {r.get('snippet', '')[:200]}..."
-                                                for r in (results or [])[:5]
-                                            ) or "No results."
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                                elif fc.name == "wikipedia_lookup":
-                                    query = fc.args.get("query", "")
-                                    print(f"[Jarvis DEBUG] [TOOL] Tool Call: 'wikipedia_lookup' query='{query}'")
-                                    if wikipedia_summary is None:
-                                        result_str = "Wikipedia lookup not available."
-                                    else:
-                                        out = await asyncio.to_thread(wikipedia_summary, query)
-                                        if out.get("error"):
-                                            result_str = out["error"]
-                                        else:
-                                            result_str = f"{out.get('title', '')}\n{out.get('summary', '')}"
-                                    function_response = types.FunctionResponse(
-                                        id=fc.id, name=fc.name, response={"result": result_str}
-                                    )
-                                    function_responses.append(function_response)
-
-                        if function_responses:
-                            await self.session.send_tool_response(function_responses=function_responses)
+                        self.latency.mark("tool_call")
+                        # Independent calls run concurrently; each response goes out as soon as it's ready
+                        await self.tools.dispatch(
+                            response.tool_call.function_calls,
+                            self._execute_tool_call,
+                            self._send_tool_response,
+                        )
                 
                 # Turn/Response Loop Finished
                 self.flush_chat()
+                self.latency.turn_complete()
+                if self.playback_engine:
+                    self.playback_engine.mark_end_of_turn()
 
                 while not self.audio_in_queue.empty():
                     self.audio_in_queue.get_nowait()
@@ -1327,71 +1538,164 @@ class AudioLoop:
             # CRITICAL: Re-raise to crash the TaskGroup and trigger outer loop reconnect
             raise e
 
+    def _write_output(self, data):
+        # A cancelled play_audio can leave a write running in its worker thread
+        with self._output_write_lock:
+            self.output_stream.write(data)
+
     async def play_audio(self):
-        stream = await asyncio.to_thread(
-            pya.open,
-            format=FORMAT,
-            channels=CHANNELS,
-            rate=RECEIVE_SAMPLE_RATE,
-            output=True,
-            output_device_index=self.output_device_index,
-        )
+        if not self.audio_io:
+            # No speaker: model audio only goes to the frontend
+            while True:
+                bytestream = await self.audio_in_queue.get()
+                self.latency.mark("first_playback")
+                if self.on_audio_data:
+                    self.on_audio_data(bytestream)
+
+        # Output stream / playback engine are opened once and reused across reconnects
+        if self.playback_mode == "callback":
+            if self.playback_engine is None:
+                engine = PlaybackEngine(pya, rate=RECEIVE_SAMPLE_RATE, channels=CHANNELS, format=FORMAT)
+                await engine.start(output_device_index=self.output_device_index)
+                self.playback_engine = engine
+                print(f"[Jarvis] Playback mode: callback (jitter target {engine.stats()['jitter_target_ms']} ms)")
+            while True:
+                bytestream = await self.audio_in_queue.get()
+                if self.on_audio_data:
+                    self.on_audio_data(bytestream)
+                self.latency.mark("first_playback")
+                await self.playback_engine.write(bytestream)
+
+        if self.output_stream is None:
+            self.output_stream = await run_in(
+                AUDIO,
+                pya.open,
+                format=FORMAT,
+                channels=CHANNELS,
+                rate=RECEIVE_SAMPLE_RATE,
+                output=True,
+                output_device_index=self.output_device_index,
+            )
         while True:
             bytestream = await self.audio_in_queue.get()
             if self.on_audio_data:
                 self.on_audio_data(bytestream)
-            await asyncio.to_thread(stream.write, bytestream)
+            self.latency.mark("first_playback")
+            await run_in(AUDIO, self._write_output, bytestream)
 
     async def get_frames(self):
-        cap = await asyncio.to_thread(cv2.VideoCapture, 0, cv2.CAP_AVFOUNDATION)
-        while True:
-            if self.paused:
-                await asyncio.sleep(0.1)
-                continue
-            frame = await asyncio.to_thread(self._get_frame, cap)
-            if frame is None:
-                break
-            await asyncio.sleep(1.0)
-            if self.out_queue:
-                await self.out_queue.put(frame)
-        cap.release()
-
-    def _get_frame(self, cap):
-        ret, frame = cap.read()
-        if not ret:
+        # The broker owns the device; the authenticator or a preview may be reading it too
+        sub = self.camera.subscribe("vision", fps=2.0 if self.camera_mode == "lazy" else 1.0)
+        try:
+            while True:
+                if self.paused:
+                    await asyncio.sleep(0.1)
+                    continue
+                frame = await sub.next_frame()
+                if frame is None:
+                    print("[Jarvis] [WARN] Camera unavailable, stopping vision frames.")
+                    break
+                self.frames_captured += 1
+                if self.camera_mode == "lazy":
+                    # Keep only the newest raw frame; get_image_payload encodes on demand
+                    self._frame_seq += 1
+                    self._latest_raw_frame = (self._frame_seq, time.monotonic(), frame)
+                    continue
+                payload = await run_in(VISION, encode_frame_payload, frame, self.frame_max_size, self.jpeg_quality)
+                self.frames_encoded += 1
+                if self.out_queue:
+                    await self.out_queue.put(payload)
+        finally:
+            sub.close()
+
+    def _get_screen(self, capturer):
+        # Runs on the screen worker thread: grab, tile diff, encode if changed
+        result = capturer.capture()
+        if result is None:
             return None
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        img = PIL.Image.fromarray(frame_rgb)
-        img.thumbnail([1024, 1024])
-        image_io = io.BytesIO()
-        img.save(image_io, format="jpeg")
-        image_io.seek(0)
-        image_bytes = image_io.read()
-        return {"mime_type": "image/jpeg", "data": base64.b64encode(image_bytes).decode()}
-
-    async def _get_screen(self):
-        pass 
+        payload, frame = result
+        signature = self.scene_gate.signature(frame) if self.scene_gate else None
+        return payload, signature
+
     async def get_screen(self):
-         pass
+        if self.screen_capturer is None:
+            self.screen_capturer = ScreenCapturer(max_size=self.frame_max_size, quality=self.jpeg_quality)
+        capturer = self.screen_capturer
+        # New session: the first grab is always sent
+        capturer.reset()
+        # One dedicated thread: mss handles must stay on the thread that created them
+        executor = get_executor(SCREEN)
+        try:
+            while True:
+                if self.paused:
+                    await asyncio.sleep(0.1)
+                    continue
+                started = time.monotonic()
+                result = await executor.run(self._get_screen, capturer)
+                if result is not None:
+                    payload, signature = result
+                    # Also the frame a text input / VAD onset would piggyback (gate sees it once it's sent)
+                    self._latest_image_payload = payload
+                    self._latest_image_signature = signature
+                    self._latest_image_time = time.monotonic()
+                    if self.out_queue:
+                        await self.out_queue.put(self._offer_frame(payload, signature, "screen"))
+                await asyncio.sleep(max(0.0, capturer.interval - (time.monotonic() - started)))
+        finally:
+            executor.submit(capturer.close)
+
+    def _close_audio_streams(self):
+        if self.mic_capture:
+            self.mic_capture.close()
+            self.mic_capture = None
+            self.audio_stream = None
+        if self.audio_stream:
+            try:
+                self.audio_stream.close()
+            except Exception:
+                pass
+            self.audio_stream = None
+        if self.playback_engine:
+            self.playback_engine.close()
+            self.playback_engine = None
+        if self.output_stream:
+            try:
+                with self._output_write_lock:
+                    self.output_stream.close()
+            except Exception:
+                pass
+            self.output_stream = None
 
     async def run(self, start_message=None):
         retry_delay = 1
         is_reconnect = False
+        # Mic capture outlives individual Live sessions (see listen_audio)
+        mic_task = None
         
         while not self.stop_event.is_set():
             try:
                 print(f"[Jarvis DEBUG] [CONNECT] Connecting to Gemini Live API...")
                 async with (
-                    client.aio.live.connect(model=MODEL, config=config) as session,
+                    self.client.aio.live.connect(model=MODEL, config=config) as session,
                     asyncio.TaskGroup() as tg,
                 ):
                     self.session = session
+                    self.session_ready.set()
 
                     self.audio_in_queue = asyncio.Queue()
-                    self.out_queue = asyncio.Queue(maxsize=10)
+                    if self.silence_gate:
+                        self.silence_gate.reset()
+                    self.latency.start_session()
+                    if self.scene_gate:
+                        # A fresh session has no visual context yet
+                        self.scene_gate.reset()
+                    # From here on, listen_audio flushes the reconnect buffer into the new queue
+                    # Audio lane first, images latest-only (a stale frame is replaced, not queued)
+                    self.out_queue = OutboundScheduler(audio_maxsize=10)
 
                     tg.create_task(self.send_realtime())
-                    tg.create_task(self.listen_audio())
+                    if self.audio_io and (mic_task is None or mic_task.done()):
+                        mic_task = asyncio.create_task(self.listen_audio())
                     # tg.create_task(self._process_video_queue()) # Removed in favor of VAD
 
                     if self.video_mode == "camera":
@@ -1452,6 +1756,8 @@ class AudioLoop:
             except Exception as e:
                 # This catches the ExceptionGroup from TaskGroup or direct exceptions
                 print(f"[Jarvis DEBUG] [ERR] Connection Error: {e}")
+                # Buffer mic audio for the next session instead of filling the dead queue during backoff
+                self._park_outbound_audio()
                 
                 if self.stop_event.is_set():
                     break
@@ -1462,12 +1768,18 @@ class AudioLoop:
                 is_reconnect = True # Next loop will be a reconnect
                 
             finally:
-                # Cleanup before retry
-                if hasattr(self, 'audio_stream') and self.audio_stream:
-                    try:
-                        self.audio_stream.close()
-                    except: 
-                        pass
+                # Cleanup before retry: audio devices stay open, only the session's queue goes
+                self._park_outbound_audio()
+                self.session_ready.clear()
+                self.pending_calls.cancel_all("session_ended")
+                # Long jobs (CAD, web agent) carry on and report to the next session
+                await self.jobs.session_ended()
+
+        if mic_task:
+            mic_task.cancel()
+            await asyncio.gather(mic_task, return_exceptions=True)
+        await self.jobs.cancel_all()
+        self._close_audio_streams()
 
 def get_input_devices():
     p = pyaudio.PyAudio()
@@ -0,0 +1,142 @@
+"""
+Supervision of long-running background jobs (CAD generation, web agent, file
+tools).
+
+Every job gets an id and moves through queued -> running -> done / failed /
+cancelled. Jobs of the same kind share a concurrency limit; extra jobs wait
+in "queued". Exceptions are recorded on the job instead of disappearing with
+an unreferenced task. Jobs outlive a Live reconnect by default: they report
+back through AudioLoop, which waits for the new session. Kinds listed in
+`cancel_on_reconnect` are cancelled when the session they belong to ends,
+and stop() cancels everything.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import deque
+
+class Job:
+    def __init__(self, kind, label=""):
+        self.id = uuid.uuid4().hex[:8]
+        self.kind = kind
+        self.label = label
+        self.state = "queued"
+        self.error = None
+        self.created = time.monotonic()
+        self.started = None
+        self.finished = None
+        self.task = None
+
+    def to_dict(self, now=None):
+        now = time.monotonic() if now is None else now
+        started = self.started
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "label": self.label,
+            "state": self.state,
+            "error": self.error,
+            "queued_s": round((started or self.finished or now) - self.created, 2),
+            "duration_s": round((self.finished or now) - started, 2) if started else None,
+        }
+
+
+class JobSupervisor:
+    def __init__(self, limits=None, default_limit=2, cancel_on_reconnect=(), on_change=None, history=20):
+        """
+        :param limits: {kind: max running jobs} overrides.
+        :param default_limit: Max running jobs for kinds not in `limits`.
+        :param cancel_on_reconnect: Kinds cancelled when the Live session ends.
+        :param on_change: Callback(table) whenever a job changes state.
+        :param history: Finished jobs kept in the table.
+        """
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.cancel_on_reconnect = set(cancel_on_reconnect)
+        self.on_change = on_change
+        self._jobs = {}
+        self._finished = deque(maxlen=history)
+        self._slots = {}
+        self.counts = {"submitted": 0, "done": 0, "failed": 0, "cancelled": 0}
+
+    def _slot(self, kind):
+        if kind not in self._slots:
+            self._slots[kind] = asyncio.Semaphore(self.limits.get(kind, self.default_limit))
+        return self._slots[kind]
+
+    def submit(self, kind, factory, label="") -> Job:
+        """Start `factory()` (a coroutine function) as a supervised job of `kind`."""
+        job = Job(kind, label)
+        self._jobs[job.id] = job
+        self.counts["submitted"] += 1
+        job.task = asyncio.create_task(self._run(job, factory), name=f"job-{kind}-{job.id}")
+        print(f"[Jarvis DEBUG] [JOB] {job.id} {kind} queued")
+        self._changed()
+        return job
+
+    async def _run(self, job, factory):
+        try:
+            async with self._slot(job.kind):
+                job.state = "running"
+                job.started = time.monotonic()
+                self._changed()
+                await factory()
+            job.state = "done"
+        except asyncio.CancelledError:
+            job.state = "cancelled"
+        except Exception as e:
+            job.state = "failed"
+            job.error = str(e)
+            print(f"[Jarvis DEBUG] [ERR] Job {job.id} ({job.kind}) failed: {e}")
+        finally:
+            job.finished = time.monotonic()
+            self.counts[job.state] = self.counts.get(job.state, 0) + 1
+            self._jobs.pop(job.id, None)
+            self._finished.append(job)
+            print(f"[Jarvis DEBUG] [JOB] {job.id} {job.kind} {job.state}")
+            self._changed()
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id) -> bool:
+        job = self._jobs.get(job_id)
+        if job is None or job.task.done():
+            return False
+        job.task.cancel()
+        return True
+
+    async def cancel_all(self, kinds=None):
+        """Cancel active jobs (all of them, or only the given kinds) and wait for them to unwind."""
+        tasks = [j.task for j in self._jobs.values() if kinds is None or j.kind in kinds]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def session_ended(self):
+        if self.cancel_on_reconnect:
+            await self.cancel_all(self.cancel_on_reconnect)
+
+    def table(self) -> list:
+        """Active jobs (oldest first) followed by recently finished ones (newest first)."""
+        now = time.monotonic()
+        active = sorted(self._jobs.values(), key=lambda j: j.created)
+        return [j.to_dict(now) for j in active] + [j.to_dict(now) for j in reversed(self._finished)]
+
+    def _changed(self):
+        if self.on_change:
+            try:
+                self.on_change(self.table())
+            except Exception as e:
+                print(f"[Jarvis DEBUG] [ERR] Job table callback failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            **self.counts,
+            "queued": sum(1 for j in self._jobs.values() if j.state == "queued"),
+            "running": sum(1 for j in self._jobs.values() if j.state == "running"),
+            "limits": {**self.limits, "default": self.default_limit},
+            "jobs": self.table(),
+        }
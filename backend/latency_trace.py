@@ -0,0 +1,281 @@
+"""
+End-to-end voice latency tracing.
+
+A turn opens when the VAD reports the end of the user's speech and collects
+the first occurrence of each downstream event, measured in ms from the moment
+the voice actually stopped:
+
+  - speech_end_sent: the mic audio containing the end of speech left send_realtime
+  - first_input_transcription / first_output_transcription
+  - tool_call: first tool call of the response
+  - first_audio: first response.data from the Live API
+  - first_playback: first model audio handed to the speaker
+  - turn_complete: the Live API finished the response
+
+Finished turns feed rolling p50/p95/p99 histograms and, if a trace
+directory is given, one JSON line each in a per-session trace file. Lines are
+appended by a background writer thread, so finishing a turn never does file
+I/O on the event loop.
+"""
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+MARKS = (
+    "speech_end_sent",
+    "first_input_transcription",
+    "first_output_transcription",
+    "tool_call",
+    "first_audio",
+    "first_playback",
+    "turn_complete",
+)
+
+# Marks that show the model has started answering the open turn
+RESPONSE_MARKS = ("first_output_transcription", "tool_call", "first_audio")
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an unsorted sequence (None if empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[idx]
+
+
+class LatencyHistogram:
+    """Rolling window of latency samples in ms."""
+
+    def __init__(self, window=500):
+        self.count = 0
+        self._values = deque(maxlen=window)
+
+    def add(self, ms):
+        self.count += 1
+        self._values.append(ms)
+
+    def to_dict(self):
+        values = list(self._values)
+        return {
+            "count": self.count,
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99),
+            "max": max(values) if values else None,
+        }
+
+
+class TraceWriter:
+    """Appends lines to trace files on a daemon thread, in the order they were queued."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.lines = 0
+        self.errors = 0
+
+    def write(self, path, line):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="latency-trace-writer", daemon=True)
+                self._thread.start()
+        self._queue.put((path, line))
+
+    def flush(self):
+        """Block until every queued line has been written (or failed)."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            by_path = {}
+            for path, line in batch:
+                by_path.setdefault(path, []).append(line)
+            for path, lines in by_path.items():
+                try:
+                    with open(path, "a", encoding="utf-8") as f:
+                        f.write("".join(line + "\n" for line in lines))
+                    self.lines += len(lines)
+                except OSError as e:
+                    self.errors += 1
+                    print(f"[LatencyTrace] Failed to write trace: {e}")
+            for _ in batch:
+                self._queue.task_done()
+
+
+# Shared by every session's tracer; queued lines are written out at exit
+trace_writer = TraceWriter()
+atexit.register(trace_writer.flush)
+
+
+class LatencyTracer:
+    """
+    Collects per-turn voice latency marks.
+
+    All timestamps come from time.monotonic() (the VAD's clock). Upstream
+    progress is tracked by PCM byte counts: audio_queued() when a chunk is put
+    on the outbound queue and audio_sent() once it has been sent, so the turn
+    knows when the bytes that contained the end of speech went out.
+    """
+
+    def __init__(self, trace_dir=None, window=500, recent_turns=20):
+        """
+        :param trace_dir: Directory for per-session JSONL traces (None disables the file).
+        :param window: Samples kept per histogram for percentiles.
+        """
+        self.trace_dir = trace_dir
+        self.trace_path = None
+        self.histograms = {name: LatencyHistogram(window) for name in MARKS}
+        self.recent = deque(maxlen=recent_turns)
+        self.turns = 0
+        self.interrupted_turns = 0
+        self._turn = None
+        self._queued_bytes = 0
+        self._sent_bytes = 0
+        self._queue_log = deque(maxlen=64)
+        self._send_log = deque(maxlen=64)
+
+    def start_session(self):
+        """New Live connection: fresh outbound queue, fresh trace file."""
+        self._finalize("session_end")
+        self._queued_bytes = 0
+        self._sent_bytes = 0
+        self._queue_log.clear()
+        self._send_log.clear()
+        if self.trace_dir:
+            try:
+                os.makedirs(self.trace_dir, exist_ok=True)
+                name = datetime.now().strftime("session_%Y%m%d_%H%M%S.jsonl")
+                self.trace_path = os.path.join(self.trace_dir, name)
+            except OSError as e:
+                print(f"[LatencyTrace] Could not create trace dir {self.trace_dir}: {e}")
+                self.trace_path = None
+
+    # --- Upstream audio accounting ---
+
+    def audio_queued(self, nbytes, now=None):
+        self._queued_bytes += nbytes
+        self._queue_log.append((time.monotonic() if now is None else now, self._queued_bytes))
+
+    def audio_sent(self, nbytes, now=None):
+        now = time.monotonic() if now is None else now
+        self._sent_bytes += nbytes
+        self._send_log.append((now, self._sent_bytes))
+        turn = self._turn
+        if turn and "speech_end_sent" not in turn["marks"] and self._sent_bytes >= turn["sent_target"]:
+            self._record(turn, "speech_end_sent", now)
+
+    def _bytes_queued_at(self, at):
+        """Byte count once the chunk captured at `at` had been queued."""
+        for ts, total in self._queue_log:
+            if ts >= at:
+                return total
+        return self._queued_bytes
+
+    # --- Turn lifecycle ---
+
+    def speech_end(self, at=None, now=None):
+        """
+        The VAD closed an utterance. `at` is when the voice actually stopped
+        (the VAD reports the event only after its hangover).
+        """
+        now = time.monotonic() if now is None else now
+        at = now if at is None else at
+        turn = self._turn
+        if turn and not self._has_response(turn) and not turn["complete"]:
+            # Mid-utterance pause: the model hasn't answered yet, so restart from the later end
+            self._turn = None
+        else:
+            self._finalize("barge_in" if turn and not turn["complete"] else "complete")
+
+        turn = {
+            "start": at,
+            "wall_time": time.time() - (now - at),
+            "marks": {},
+            "complete": False,
+            "sent_target": self._bytes_queued_at(at),
+        }
+        self._turn = turn
+        for ts, total in self._send_log:
+            if total >= turn["sent_target"]:
+                self._record(turn, "speech_end_sent", ts)
+                break
+
+    def mark(self, name, now=None):
+        """Record the first occurrence of `name` for the open turn (no-op otherwise)."""
+        turn = self._turn
+        if turn is None or name in turn["marks"]:
+            return
+        if name == "first_playback" and "first_audio" not in turn["marks"]:
+            # Still audio from an earlier response
+            return
+        self._record(turn, name, time.monotonic() if now is None else now)
+        if name == "first_playback" and turn["complete"]:
+            self._finalize("complete")
+
+    def turn_complete(self, now=None):
+        """The Live API finished a response turn."""
+        turn = self._turn
+        if turn is None or not self._has_response(turn):
+            return
+        self._record(turn, "turn_complete", time.monotonic() if now is None else now)
+        turn["complete"] = True
+        # Keep the turn open until its audio reaches the speaker
+        if "first_playback" in turn["marks"] or "first_audio" not in turn["marks"]:
+            self._finalize("complete")
+
+    @staticmethod
+    def _has_response(turn):
+        return any(name in turn["marks"] for name in RESPONSE_MARKS)
+
+    def _record(self, turn, name, ts):
+        turn["marks"][name] = max(0.0, (ts - turn["start"]) * 1000.0)
+
+    def _finalize(self, reason):
+        turn = self._turn
+        self._turn = None
+        if turn is None or not turn["marks"]:
+            return
+        self.turns += 1
+        if reason == "barge_in":
+            self.interrupted_turns += 1
+        row = {
+            "turn": self.turns,
+            "time": round(turn["wall_time"], 3),
+            "end": reason,
+        }
+        for name in MARKS:
+            if name in turn["marks"]:
+                ms = round(turn["marks"][name], 1)
+                row[f"{name}_ms"] = ms
+                self.histograms[name].add(ms)
+        self.recent.append(row)
+        if self.trace_path:
+            trace_writer.write(self.trace_path, json.dumps(row))
+
+    def flush(self):
+        """Block until finished turns are on disk (tests, shutdown). Don't call on the event loop."""
+        trace_writer.flush()
+
+    def summary(self, recent=10):
+        return {
+            "turns": self.turns,
+            "interrupted_turns": self.interrupted_turns,
+            "trace_file": self.trace_path,
+            "latency_ms": {name: hist.to_dict() for name, hist in self.histograms.items()},
+            "recent": list(self.recent)[-recent:],
+        }
@@ -0,0 +1,112 @@
+"""
+Confirmation-gated tool calls.
+
+A call that needs the user's OK is parked here and the receive loop moves on
+straight away; audio, transcription and other tool calls keep flowing while
+the popup is open. When the user answers (or the timeout passes, which counts
+as a denial) the call's `on_resolved(confirmed, reason)` callback is scheduled
+as a task, which runs the tool or reports the denial to the model.
+"""
+
+import asyncio
+import time
+import uuid
+
+
+class PendingCall:
+    def __init__(self, request_id, name, args, on_resolved, timeout):
+        self.id = request_id
+        self.name = name
+        self.args = args
+        self.on_resolved = on_resolved
+        self.timeout = timeout
+        self.created = time.monotonic()
+        self.timer = None
+
+
+class PendingCallManager:
+    def __init__(self, timeout=60.0, on_request=None, on_expired=None):
+        """
+        :param timeout: Seconds to wait for the user before auto-denying (None = wait indefinitely).
+        :param on_request: Callback({"id", "tool", "args", "timeout"}) that shows the confirmation to the user.
+        :param on_expired: Callback({"id", "tool", "reason"}) when a request ends without an answer.
+        """
+        self.timeout = timeout
+        self.on_request = on_request
+        self.on_expired = on_expired
+        self._pending = {}
+        self._tasks = set()
+
+        self.requested = 0
+        self.confirmed = 0
+        self.denied = 0
+        self.expired = 0
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, request_id):
+        return request_id in self._pending
+
+    def park(self, name, args, on_resolved, timeout=None):
+        """
+        Ask the user to confirm `name(args)` without waiting for the answer.
+        `on_resolved(confirmed, reason)` is an async callable; reason is
+        "user", "timeout" or the reason passed to cancel_all(). Returns the request id.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        call = PendingCall(str(uuid.uuid4()), name, args, on_resolved, timeout)
+        self._pending[call.id] = call
+        self.requested += 1
+        if timeout:
+            call.timer = asyncio.get_running_loop().call_later(timeout, self._expire, call.id)
+        print(f"[Jarvis DEBUG] [STOP] Requesting confirmation for '{name}' (ID: {call.id})")
+        if self.on_request:
+            self.on_request({"id": call.id, "tool": name, "args": args, "timeout": timeout})
+        return call.id
+
+    def resolve(self, request_id, confirmed, reason="user"):
+        """Answer a parked call. Returns False if it is unknown or already resolved."""
+        call = self._pending.pop(request_id, None)
+        if call is None:
+            return False
+        if call.timer:
+            call.timer.cancel()
+        if reason == "user":
+            if confirmed:
+                self.confirmed += 1
+            else:
+                self.denied += 1
+        else:
+            self.expired += 1
+            if self.on_expired:
+                self.on_expired({"id": call.id, "tool": call.name, "reason": reason})
+        print(f"[Jarvis DEBUG] [CONFIRM] Request {request_id} resolved. Confirmed: {confirmed} ({reason})")
+        task = asyncio.create_task(call.on_resolved(confirmed, reason))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return True
+
+    def _expire(self, request_id):
+        call = self._pending.get(request_id)
+        if call:
+            print(f"[Jarvis DEBUG] [DENY] No answer for '{call.name}' after {call.timeout:g}s, auto-denying.")
+            self.resolve(request_id, False, reason="timeout")
+
+    def cancel_all(self, reason="cancelled"):
+        """Deny everything still waiting (e.g. the session it belongs to has ended)."""
+        for request_id in list(self._pending):
+            self.resolve(request_id, False, reason=reason)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "pending": [
+                {"id": c.id, "tool": c.name, "waiting_s": round(now - c.created, 1)}
+                for c in self._pending.values()
+            ],
+            "requested": self.requested,
+            "confirmed": self.confirmed,
+            "denied": self.denied,
+            "expired": self.expired,
+        }
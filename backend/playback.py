@@ -0,0 +1,172 @@
+"""
+Callback-mode speaker output with a jitter buffer and instant barge-in.
+
+Model audio is written into a PcmRingBuffer from the event loop and pulled
+by the PortAudio callback one small buffer (20 ms by default) at a time.
+Playback (re)starts only once `jitter_target` seconds are buffered, so short
+network gaps don't turn into crackle. interrupt() marks everything written
+so far as stale; the callback drops it on its next run, so playback stops
+within one buffer period instead of after whatever PortAudio already had.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+import pyaudio
+
+from audio_capture import PcmRingBuffer
+from executors import AUDIO, run_in
+
+
+class PlaybackEngine:
+    """
+    Counters:
+      - underruns: buffer ran dry mid-turn (playback re-primes the jitter buffer)
+      - device_underflows: paOutputUnderflow flags reported by PortAudio
+      - interrupts / interrupt_to_silence_ms: barge-ins and time until silence was output
+    """
+
+    def __init__(self, pya, rate=24000, channels=1, format=pyaudio.paInt16,
+                 buffer_ms=20, jitter_target=0.08, max_buffer=30.0):
+        """
+        :param buffer_ms: PortAudio buffer period; bounds the barge-in latency.
+        :param jitter_target: Seconds of audio buffered before playback starts/resumes.
+        :param max_buffer: Ring capacity in seconds (model audio arrives faster than real time).
+        """
+        self.pya = pya
+        self.rate = rate
+        self.channels = channels
+        self.format = format
+        self.frame_bytes = channels * pyaudio.get_sample_size(format)
+        self.bytes_per_second = rate * self.frame_bytes
+        self.frames_per_buffer = int(rate * buffer_ms / 1000)
+        self.prebuffer_bytes = int(self.bytes_per_second * jitter_target) // self.frame_bytes * self.frame_bytes
+        self.ring = PcmRingBuffer(int(self.bytes_per_second * max_buffer) // self.frame_bytes * self.frame_bytes)
+        self._silence = b"\x00" * (self.frames_per_buffer * self.frame_bytes)
+
+        self.stream = None
+        self.output_latency = 0.0
+        self._playing = False
+        self._end_of_turn = False
+        self._flush_upto = None
+        self._interrupt_time = None
+
+        self.underruns = 0
+        self.device_underflows = 0
+        self.interrupts = 0
+        self.frames_played = 0
+        self.max_depth_bytes = 0
+        self._interrupt_latencies = deque(maxlen=64)
+
+    async def start(self, output_device_index=None):
+        self.stream = await run_in(
+            AUDIO,
+            self.pya.open,
+            format=self.format,
+            channels=self.channels,
+            rate=self.rate,
+            output=True,
+            output_device_index=output_device_index,
+            frames_per_buffer=self.frames_per_buffer,
+            stream_callback=self._callback,
+        )
+        try:
+            self.output_latency = self.stream.get_output_latency()
+        except Exception:
+            self.output_latency = 0.0
+        return self.stream
+
+    def _silence_for(self, nbytes):
+        return self._silence if nbytes == len(self._silence) else b"\x00" * nbytes
+
+    def _callback(self, in_data, frame_count, time_info, status_flags):
+        # Runs on the PortAudio thread
+        nbytes = frame_count * self.frame_bytes
+        if status_flags & pyaudio.paOutputUnderflow:
+            self.device_underflows += 1
+
+        flush_upto = self._flush_upto
+        if flush_upto is not None:
+            self._flush_upto = None
+            self.ring.discard(flush_upto)
+            self._playing = False
+            if self._interrupt_time is not None:
+                self._interrupt_latencies.append(time.monotonic() - self._interrupt_time + self.output_latency)
+                self._interrupt_time = None
+            return (self._silence_for(nbytes), pyaudio.paContinue)
+
+        available = self.ring.available()
+        if not self._playing:
+            if available >= self.prebuffer_bytes or (self._end_of_turn and available > 0):
+                self._playing = True
+            else:
+                return (self._silence_for(nbytes), pyaudio.paContinue)
+
+        data = self.ring.read(nbytes)
+        if data is None:
+            partial = self.ring.read(available) if available else b""
+            if not self._end_of_turn:
+                self.underruns += 1
+            self._playing = False
+            data = partial + self._silence_for(nbytes - len(partial))
+        self.frames_played += frame_count
+        return (data, pyaudio.paContinue)
+
+    async def write(self, data: bytes):
+        """Queue model audio, waiting (not dropping) if the ring is full."""
+        self._end_of_turn = False
+        period = self.frames_per_buffer / float(self.rate)
+        view = memoryview(data)
+        while view:
+            block = view[:self.ring.capacity]
+            while self.ring.free() < len(block):
+                await asyncio.sleep(period)
+            self.ring.write(block)
+            view = view[len(block):]
+        self.max_depth_bytes = max(self.max_depth_bytes, self.ring.available())
+
+    def mark_end_of_turn(self):
+        """The model finished its turn: play out what is left without counting underruns."""
+        self._end_of_turn = True
+
+    def interrupt(self):
+        """Barge-in: discard everything written so far at the next callback."""
+        self.interrupts += 1
+        self._interrupt_time = time.monotonic()
+        self._flush_upto = self.ring.write_pos
+
+    def buffer_depth_ms(self) -> float:
+        return 1000.0 * self.ring.available() / self.bytes_per_second
+
+    def playout_delay_ms(self) -> float:
+        """Time a byte written now waits before it is audible (buffer + device latency)."""
+        return self.buffer_depth_ms() + 1000.0 * self.output_latency
+
+    def stats(self) -> dict:
+        lat = list(self._interrupt_latencies)
+        return {
+            "mode": "callback",
+            "playing": self._playing,
+            "buffer_depth_ms": round(self.buffer_depth_ms(), 1),
+            "max_buffer_depth_ms": round(1000.0 * self.max_depth_bytes / self.bytes_per_second, 1),
+            "playout_delay_ms": round(self.playout_delay_ms(), 1),
+            "jitter_target_ms": round(1000.0 * self.prebuffer_bytes / self.bytes_per_second, 1),
+            "underruns": self.underruns,
+            "device_underflows": self.device_underflows,
+            "interrupts": self.interrupts,
+            "interrupt_to_silence_ms": {
+                "last": round(lat[-1] * 1000, 1) if lat else None,
+                "max": round(max(lat) * 1000, 1) if lat else None,
+            },
+            "seconds_played": round(self.frames_played / float(self.rate), 2),
+        }
+
+    def close(self):
+        if self.stream:
+            try:
+                self.stream.stop_stream()
+                self.stream.close()
+            except Exception:
+                pass
+            self.stream = None
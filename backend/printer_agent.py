@@ -19,6 +19,8 @@ from enum import Enum
 import aiohttp
 from zeroconf import Zeroconf, ServiceBrowser, ServiceListener
 
+from executors import TOOLS, run_in
+
 
 class PrinterType(Enum):
     OCTOPRINT = "octoprint"
@@ -671,7 +673,7 @@ class PrinterAgent:
             if progress_callback:
                 await progress_callback(5, "Starting slicer...")
             
-            # Use asyncio.to_thread for Windows compatibility (asyncio.create_subprocess_exec
+            # Use a worker thread (tools executor) for Windows compatibility (asyncio.create_subprocess_exec
             # throws NotImplementedError on Windows with certain event loop policies)
             import subprocess
             
@@ -679,7 +681,8 @@ class PrinterAgent:
                 await progress_callback(10, "Running slicer...")
             
             try:
-                result = await asyncio.to_thread(
+                result = await run_in(
+                    TOOLS,
                     subprocess.run,
                     cmd,
                     capture_output=True,
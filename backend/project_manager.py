@@ -1,9 +1,14 @@
 import os
+import copy
 import json
 import shutil
 import time
 from pathlib import Path
 
+# Per-session scratch projects live under projects/.sessions/<id>; project names are
+# sanitized to letters, digits, spaces, '-' and '_', so no user project can land there
+SCRATCH_DIR = ".sessions"
+
 class ProjectManager:
     def __init__(self, workspace_root: str):
         self.workspace_root = Path(workspace_root)
@@ -14,11 +19,11 @@ class ProjectManager:
         if not self.projects_dir.exists():
             self.projects_dir.mkdir(parents=True)
             
-        # Clear temp project on startup if it exists
-        temp_path = self.projects_dir / "temp"
-        if temp_path.exists():
-            print("[ProjectManager] Clearing temp project...")
-            shutil.rmtree(temp_path)
+        # Clear temp project and leftover session scratch projects on startup if they exist
+        for temp_path in (self.projects_dir / "temp", self.projects_dir / SCRATCH_DIR):
+            if temp_path.is_dir():
+                print(f"[ProjectManager] Clearing {temp_path.name} project...")
+                shutil.rmtree(temp_path)
             
         # Ensure temp project receives fresh creation
         self.create_project("temp")
@@ -48,9 +53,34 @@ class ProjectManager:
             return True, f"Switched to project '{safe_name}'."
         return False, f"Project '{safe_name}' does not exist."
 
+    def view(self, project: str = "temp"):
+        """
+        Another handle on the same workspace with its own current project
+        (one per session). Unlike a new ProjectManager it doesn't reset temp.
+        """
+        view = copy.copy(self)
+        view.current_project = project
+        return view
+
+    def scratch_view(self, session_id: str):
+        """
+        A view starting in the session's own scratch project, so concurrent
+        sessions don't share temp. Cleared like temp on the next startup.
+        """
+        safe_id = "".join([c for c in str(session_id) if c.isalnum() or c in ('-', '_')]) or "session"
+        project = f"{SCRATCH_DIR}/{safe_id}"
+        project_path = self.projects_dir / project
+        (project_path / "cad").mkdir(parents=True, exist_ok=True)
+        (project_path / "browser").mkdir(exist_ok=True)
+        return self.view(project)
+
+    def is_scratch(self):
+        """True while working in temp or a session scratch project (work there isn't kept)."""
+        return self.current_project == "temp" or self.current_project.startswith(SCRATCH_DIR + "/")
+
     def list_projects(self):
         """Returns a list of available projects."""
-        return [d.name for d in self.projects_dir.iterdir() if d.is_dir()]
+        return [d.name for d in self.projects_dir.iterdir() if d.is_dir() and d.name != SCRATCH_DIR]
 
     def get_current_project_path(self):
         return self.projects_dir / self.current_project
@@ -0,0 +1,272 @@
+"""
+Outbound realtime sender for the Gemini Live session.
+
+Instead of one session.send per 64 ms mic chunk, the sender drains whatever
+is already queued and merges adjacent audio/pcm chunks into one payload,
+capped at a latency budget worth of audio. When the network keeps up the
+queue holds a single item and nothing is delayed; when it stalls, the
+backlog is flushed in a few larger sends instead of many small ones.
+
+OutboundScheduler is the queue the sender drains: mic audio has its own
+lane and always goes first, while images sit in a latest-only slot so a new
+camera/VAD frame replaces a stale one instead of queueing behind it.
+"""
+
+import asyncio
+import time
+from collections import deque
+
+PCM_MIME = "audio/pcm"
+AUDIO_LANE = "audio"
+IMAGE_LANE = "image"
+
+
+def coalesce_pcm(items, max_pcm_bytes):
+    """
+    Merge runs of adjacent audio/pcm messages, preserving overall order.
+
+    Non-PCM messages (images, text) are passed through untouched and break a
+    run. A merged payload never exceeds max_pcm_bytes unless a single chunk is
+    already larger. Returns a list of (message, chunk_count) tuples.
+    """
+    out = []
+    run = []
+    run_bytes = 0
+
+    def flush():
+        nonlocal run, run_bytes
+        if run:
+            data = run[0] if len(run) == 1 else b"".join(run)
+            out.append(({"data": data, "mime_type": PCM_MIME}, len(run)))
+            run = []
+            run_bytes = 0
+
+    for msg in items:
+        if isinstance(msg, dict) and msg.get("mime_type") == PCM_MIME:
+            data = msg["data"]
+            if run and run_bytes + len(data) > max_pcm_bytes:
+                flush()
+            run.append(data)
+            run_bytes += len(data)
+        else:
+            flush()
+            out.append((msg, 1))
+    flush()
+    return out
+
+
+class SendStats:
+    """Counters for batch sizes and send latency (recent window for percentiles)."""
+
+    def __init__(self, window=256):
+        self.messages_in = 0
+        self.sends = 0
+        self.pcm_chunks_merged = 0
+        self.bytes_sent = 0
+        self.max_drain = 0
+        self.max_batch_chunks = 0
+        self.send_errors = 0
+        self._latencies = deque(maxlen=window)
+        self._drains = deque(maxlen=window)
+
+    def record_drain(self, count):
+        self.messages_in += count
+        self.max_drain = max(self.max_drain, count)
+        self._drains.append(count)
+
+    def record_send(self, chunk_count, nbytes, latency):
+        self.sends += 1
+        if chunk_count > 1:
+            self.pcm_chunks_merged += chunk_count - 1
+        self.max_batch_chunks = max(self.max_batch_chunks, chunk_count)
+        self.bytes_sent += nbytes
+        self._latencies.append(latency)
+
+    @staticmethod
+    def _percentile(values, pct):
+        if not values:
+            return None
+        ordered = sorted(values)
+        idx = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+        return ordered[idx]
+
+    def to_dict(self):
+        lat = list(self._latencies)
+        drains = list(self._drains)
+        return {
+            "messages_in": self.messages_in,
+            "sends": self.sends,
+            "pcm_chunks_merged": self.pcm_chunks_merged,
+            "bytes_sent": self.bytes_sent,
+            "avg_drain": round(sum(drains) / len(drains), 2) if drains else 0,
+            "max_drain": self.max_drain,
+            "max_batch_chunks": self.max_batch_chunks,
+            "send_errors": self.send_errors,
+            "send_latency_ms": {
+                "p50": _ms(self._percentile(lat, 50)),
+                "p95": _ms(self._percentile(lat, 95)),
+                "max": _ms(max(lat) if lat else None),
+            },
+        }
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 2)
+
+
+class RealtimeSender:
+    """Drains an asyncio.Queue of realtime messages and sends them coalesced."""
+
+    def __init__(self, sample_rate=16000, sample_width=2, channels=1, latency_budget=0.2):
+        """
+        :param latency_budget: Max seconds of audio merged into one payload.
+        """
+        self.latency_budget = latency_budget
+        self.max_pcm_bytes = int(sample_rate * sample_width * channels * latency_budget)
+        self.stats = SendStats()
+
+    def drain(self, queue, first):
+        items = [first]
+        while True:
+            try:
+                items.append(queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        self.stats.record_drain(len(items))
+        return items
+
+    async def run(self, queue, send):
+        """
+        Loop forever: wait for one message, drain the rest, send merged payloads.
+        `send` is an async callable taking the message dict/str.
+        """
+        while True:
+            first = await queue.get()
+            for msg, chunk_count in coalesce_pcm(self.drain(queue, first), self.max_pcm_bytes):
+                start = time.monotonic()
+                try:
+                    await send(msg)
+                except Exception:
+                    self.stats.send_errors += 1
+                    raise
+                nbytes = len(msg["data"]) if isinstance(msg, dict) and isinstance(msg.get("data"), (bytes, str)) else 0
+                self.stats.record_send(chunk_count, nbytes, time.monotonic() - start)
+
+
+class LaneStats:
+    """Depth, drop and queue-wait counters for one scheduler lane."""
+
+    def __init__(self, window=256):
+        self.enqueued = 0
+        self.dequeued = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._waits = deque(maxlen=window)
+
+    def record_dequeue(self, wait):
+        self.dequeued += 1
+        self._waits.append(wait)
+
+    def to_dict(self, depth, oldest_age):
+        waits = list(self._waits)
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "oldest_age_ms": _ms(oldest_age),
+            "enqueued": self.enqueued,
+            "dequeued": self.dequeued,
+            "dropped": self.dropped,
+            "wait_ms": {
+                "p50": _ms(SendStats._percentile(waits, 50)),
+                "p95": _ms(SendStats._percentile(waits, 95)),
+                "max": _ms(max(waits) if waits else None),
+            },
+        }
+
+
+class OutboundScheduler:
+    """
+    Two-lane replacement for the single outbound asyncio.Queue.
+
+    - audio lane: FIFO, bounded (put() waits when full, like the old queue),
+      always dequeued first. Non-image messages also ride this lane so their
+      order relative to audio is kept.
+    - image lane: a single latest-only slot; putting a frame while another is
+      waiting replaces it and counts a drop.
+
+    Implements the subset of the asyncio.Queue API the sender uses
+    (put/put_nowait/get/get_nowait/empty/qsize).
+    """
+
+    def __init__(self, audio_maxsize=10):
+        self.audio_maxsize = audio_maxsize
+        self._audio = deque()
+        self._image = None
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self.lanes = {AUDIO_LANE: LaneStats(), IMAGE_LANE: LaneStats()}
+
+    @staticmethod
+    def lane_of(msg):
+        mime = msg.get("mime_type", "") if isinstance(msg, dict) else ""
+        return IMAGE_LANE if mime.startswith("image/") else AUDIO_LANE
+
+    def qsize(self):
+        return len(self._audio) + (1 if self._image is not None else 0)
+
+    def empty(self):
+        return self.qsize() == 0
+
+    async def put(self, msg):
+        if self.lane_of(msg) == AUDIO_LANE:
+            while len(self._audio) >= self.audio_maxsize:
+                self._space.clear()
+                await self._space.wait()
+        self.put_nowait(msg)
+
+    def put_nowait(self, msg):
+        now = time.monotonic()
+        if self.lane_of(msg) == IMAGE_LANE:
+            stats = self.lanes[IMAGE_LANE]
+            if self._image is not None:
+                stats.dropped += 1
+            self._image = (now, msg)
+            depth = 1
+        else:
+            if len(self._audio) >= self.audio_maxsize:
+                raise asyncio.QueueFull
+            stats = self.lanes[AUDIO_LANE]
+            self._audio.append((now, msg))
+            depth = len(self._audio)
+        stats.enqueued += 1
+        stats.max_depth = max(stats.max_depth, depth)
+        self._ready.set()
+
+    def get_nowait(self):
+        if self._audio:
+            enqueued_at, msg = self._audio.popleft()
+            stats = self.lanes[AUDIO_LANE]
+            self._space.set()
+        elif self._image is not None:
+            enqueued_at, msg = self._image
+            self._image = None
+            stats = self.lanes[IMAGE_LANE]
+        else:
+            raise asyncio.QueueEmpty
+        stats.record_dequeue(time.monotonic() - enqueued_at)
+        return msg
+
+    async def get(self):
+        while self.empty():
+            self._ready.clear()
+            await self._ready.wait()
+        return self.get_nowait()
+
+    def stats(self):
+        now = time.monotonic()
+        audio_age = now - self._audio[0][0] if self._audio else None
+        image_age = now - self._image[0] if self._image is not None else None
+        return {
+            AUDIO_LANE: self.lanes[AUDIO_LANE].to_dict(len(self._audio), audio_age),
+            IMAGE_LANE: self.lanes[IMAGE_LANE].to_dict(1 if self._image is not None else 0, image_age),
+        }
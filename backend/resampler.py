@@ -0,0 +1,91 @@
+"""
+Streaming downmix + polyphase resampler for 16-bit PCM.
+
+Lets the microphone be opened at the device's native rate/channel count
+(commonly 44.1/48 kHz stereo) and converts each chunk to the 16 kHz mono the
+Live API expects. The whole chunk is filtered in one vectorized gather + dot
+per output sample block, so cost is bounded and independent of Python loops.
+"""
+
+from fractions import Fraction
+
+import numpy as np
+
+
+def design_lowpass(num_taps: int, cutoff: float) -> np.ndarray:
+    """Windowed-sinc FIR; cutoff in cycles/sample (0 < cutoff < 0.5)."""
+    n = np.arange(num_taps) - (num_taps - 1) / 2.0
+    h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(num_taps, 8.0)
+    return h / h.sum()
+
+
+class PolyphaseResampler:
+    """
+    Converts interleaved int16 PCM at (in_rate, in_channels) to mono int16 at out_rate.
+
+    State (filter history and fractional phase) is carried between calls, so
+    feeding a stream chunk by chunk gives the same result as one big call.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int = 16000, in_channels: int = 1, taps_per_phase: int = 24):
+        self.in_rate = int(in_rate)
+        self.out_rate = int(out_rate)
+        self.in_channels = int(in_channels)
+
+        ratio = Fraction(self.out_rate, self.in_rate)
+        self.up = ratio.numerator
+        self.down = ratio.denominator
+        self.passthrough = self.up == 1 and self.down == 1
+
+        self.taps_per_phase = taps_per_phase
+        if not self.passthrough:
+            # Filter runs at in_rate * up; cut off just below the lower Nyquist
+            cutoff = 0.5 / max(self.up, self.down) * 0.9
+            h = design_lowpass(taps_per_phase * self.up, cutoff) * self.up
+            # phases[p, j] = h[p + j * up]
+            self._phases = h.reshape(taps_per_phase, self.up).T.astype(np.float32).copy()
+            self._taps = np.arange(taps_per_phase)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        # Upsampled-domain position of the next output, relative to the current chunk start
+        self._pos = 0
+
+    def downmix(self, data: bytes) -> np.ndarray:
+        frames = len(data) // (2 * self.in_channels)
+        samples = np.frombuffer(data, dtype="<i2", count=frames * self.in_channels)
+        if self.in_channels == 1:
+            return samples.astype(np.float32)
+        # Strided sum avoids the reshape + mean temporaries on small chunks
+        mono = samples[0::self.in_channels].astype(np.float32)
+        for ch in range(1, self.in_channels):
+            mono += samples[ch::self.in_channels]
+        mono *= 1.0 / self.in_channels
+        return mono
+
+    def process(self, data: bytes) -> bytes:
+        """Convert one chunk; returns mono int16 bytes at out_rate."""
+        if self.passthrough and self.in_channels == 1:
+            return data
+        mono = self.downmix(data)
+        if self.passthrough:
+            return np.clip(np.rint(mono), -32768, 32767).astype("<i2").tobytes()
+
+        m = len(mono)
+        x = np.concatenate((self._history, mono))
+        limit = m * self.up
+        if self._pos < limit:
+            u = np.arange(self._pos, limit, self.down)
+            base = (u // self.up) + (self.taps_per_phase - 1)
+            phase = u % self.up
+            windows = x[base[:, None] - self._taps[None, :]]
+            y = np.einsum("ij,ij->i", self._phases[phase], windows)
+            self._pos = int(u[-1]) + self.down - limit
+        else:
+            y = np.zeros(0, dtype=np.float32)
+            self._pos -= limit
+        if self.taps_per_phase > 1:
+            self._history = x[-(self.taps_per_phase - 1):]
+        return np.clip(np.rint(y), -32768, 32767).astype("<i2").tobytes()
+
+    def reset(self):
+        self._history[:] = 0
+        self._pos = 0
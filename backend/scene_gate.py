@@ -0,0 +1,85 @@
+"""
+Scene-change gate for vision frames sent to the Live API.
+
+Each frame is reduced to a tiny grayscale thumbnail (16x16, area-averaged,
+mean-removed so auto-exposure drift doesn't count as change). A frame is only
+forwarded if its mean absolute difference from the last frame the model
+actually received exceeds `threshold` (fraction of full scale). Frames that
+arrive as JPEG are decoded at 1/8 scale, which is much cheaper than a full
+decode.
+"""
+
+import cv2
+import numpy as np
+
+
+def frame_signature(frame, size=16) -> np.ndarray:
+    """Zero-mean size x size grayscale thumbnail of a BGR (or gray) frame."""
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32)
+    return small - small.mean()
+
+
+def jpeg_signature(data: bytes, size=16):
+    """Signature of an encoded JPEG, or None if it can't be decoded."""
+    gray = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if gray is None:
+        return None
+    return frame_signature(gray, size)
+
+
+def signature_distance(a, b) -> float:
+    """Mean absolute difference as a fraction of full scale (0 = identical)."""
+    return float(np.mean(np.abs(a - b))) / 255.0
+
+
+class SceneGate:
+    def __init__(self, threshold=0.03, size=16):
+        """
+        :param threshold: Minimum change vs. the last sent frame (0-1) for a frame to be sent.
+        :param size: Thumbnail edge length used for comparison.
+        """
+        self.threshold = threshold
+        self.size = size
+        self._last_sent = None
+        self.last_distance = None
+        self.counts = {}
+
+    def signature(self, frame):
+        return frame_signature(frame, self.size)
+
+    def jpeg_signature(self, data: bytes):
+        return jpeg_signature(data, self.size)
+
+    def changed(self, signature) -> bool:
+        """True if the scene differs enough from what the model last saw (or nothing was sent yet)."""
+        if signature is None or self._last_sent is None:
+            return True
+        self.last_distance = signature_distance(signature, self._last_sent)
+        return self.last_distance >= self.threshold
+
+    def record(self, source, sent):
+        counts = self.counts.setdefault(source, {"sent": 0, "suppressed": 0})
+        counts["sent" if sent else "suppressed"] += 1
+
+    def mark_sent(self, signature, source):
+        """
+        A frame reached the model: later frames are compared against it. Call
+        only once the send succeeded; a failed send must not suppress the scene.
+        """
+        if signature is not None:
+            self._last_sent = signature
+        self.record(source, True)
+
+    def reset(self):
+        """New Live session: the model has seen nothing yet."""
+        self._last_sent = None
+
+    def stats(self) -> dict:
+        return {
+            "threshold": self.threshold,
+            "sent": sum(c["sent"] for c in self.counts.values()),
+            "suppressed": sum(c["suppressed"] for c in self.counts.values()),
+            "by_source": {k: dict(v) for k, v in self.counts.items()},
+            "last_distance": round(self.last_distance, 4) if self.last_distance is not None else None,
+        }
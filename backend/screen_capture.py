@@ -0,0 +1,140 @@
+"""
+Screen-share capture for video_mode="screen".
+
+Every tick the primary monitor is grabbed with mss and compared with the
+previous grab tile by tile (on a 1/4-scale grayscale copy). A frame is only
+downscaled, JPEG-encoded and handed to the Live API when enough of the screen
+changed. The grab/diff/encode work runs on one dedicated worker thread (mss
+handles are per-thread on some platforms), and its measured cost drives the
+capture rate and output resolution: if a tick costs more than `cpu_budget`
+of the interval, fps drops first, then resolution; when there is headroom,
+resolution recovers first, then fps.
+"""
+
+import base64
+import time
+
+import cv2
+import mss
+import numpy as np
+
+from frame_encoder import encode_jpeg
+
+
+class ScreenCapturer:
+    def __init__(self, monitor=1, fps=1.0, min_fps=0.2, max_fps=2.0, max_size=1024, min_size=512,
+                 tile=64, tile_threshold=8.0, change_threshold=0.005, quality=70, cpu_budget=0.15, grab=None):
+        """
+        :param monitor: mss monitor index (1 = primary).
+        :param tile: Tile edge in screen pixels for change detection.
+        :param tile_threshold: Mean gray-level difference (0-255) for a tile to count as changed.
+        :param change_threshold: Fraction of changed tiles needed to send a frame.
+        :param cpu_budget: Share of each capture interval the worker may spend.
+        :param grab: Optional callable returning a BGR(A) ndarray (tests / other sources).
+        """
+        self.monitor = monitor
+        self.fps = fps
+        self.min_fps = min_fps
+        self.max_fps = max_fps
+        self.size = max_size
+        self.max_size = max_size
+        self.min_size = min_size
+        self.tile = tile
+        self.tile_threshold = tile_threshold
+        self.change_threshold = change_threshold
+        self.quality = quality
+        self.cpu_budget = cpu_budget
+        self._grab = grab
+        self._sct = None
+        self._prev = None
+        self._cost = None
+
+        self.frames_grabbed = 0
+        self.frames_sent = 0
+        self.frames_skipped = 0
+        self.last_change = None
+
+    @property
+    def interval(self):
+        return 1.0 / self.fps
+
+    def grab(self):
+        if self._grab is not None:
+            return self._grab()
+        if self._sct is None:
+            # Created lazily so it lives on the worker thread that uses it
+            self._sct = mss.mss()
+        shot = self._sct.grab(self._sct.monitors[self.monitor])
+        return np.asarray(shot)
+
+    def changed_fraction(self, frame):
+        """Fraction of tiles that differ from the previous grab (1.0 for the first grab)."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY if frame.shape[2] == 4 else cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape
+        small = cv2.resize(gray, (max(1, w // 4), max(1, h // 4)), interpolation=cv2.INTER_AREA)
+        prev = self._prev
+        self._prev = small
+        if prev is None or prev.shape != small.shape:
+            return 1.0
+        diff = cv2.absdiff(small, prev)
+        rows = max(1, h // self.tile)
+        cols = max(1, w // self.tile)
+        per_tile = cv2.resize(diff, (cols, rows), interpolation=cv2.INTER_AREA)
+        return float(np.count_nonzero(per_tile > self.tile_threshold)) / per_tile.size
+
+    def process(self, frame):
+        """Diff one grabbed frame and encode it if it changed enough. Returns (payload, bgr) or None."""
+        self.frames_grabbed += 1
+        self.last_change = self.changed_fraction(frame)
+        if self.last_change < self.change_threshold:
+            self.frames_skipped += 1
+            return None
+        bgr = frame[:, :, :3] if frame.shape[2] == 4 else frame
+        jpeg = encode_jpeg(np.ascontiguousarray(bgr), self.size, self.quality)
+        self.frames_sent += 1
+        return {"mime_type": "image/jpeg", "data": base64.b64encode(jpeg).decode()}, bgr
+
+    def capture(self):
+        """One tick on the worker thread: grab, diff, maybe encode, then adapt rate/size."""
+        start = time.perf_counter()
+        result = self.process(self.grab())
+        self.adapt(time.perf_counter() - start)
+        return result
+
+    def adapt(self, cost):
+        # EMA of per-tick cost so one slow encode doesn't swing the settings
+        self._cost = cost if self._cost is None else 0.8 * self._cost + 0.2 * cost
+        budget = self.cpu_budget * self.interval
+        if self._cost > budget:
+            if self.fps > self.min_fps:
+                self.fps = max(self.min_fps, self.fps / 1.25)
+            elif self.size > self.min_size:
+                self.size = max(self.min_size, int(self.size * 0.8))
+        elif self._cost < 0.5 * budget:
+            if self.size < self.max_size:
+                self.size = min(self.max_size, int(self.size * 1.25))
+            elif self.fps < self.max_fps:
+                self.fps = min(self.max_fps, self.fps * 1.25)
+
+    def reset(self):
+        """Forget the previous grab so the next one counts as fully changed."""
+        self._prev = None
+
+    def close(self):
+        if self._sct is not None:
+            try:
+                self._sct.close()
+            except Exception:
+                pass
+            self._sct = None
+
+    def stats(self) -> dict:
+        return {
+            "fps": round(self.fps, 2),
+            "max_size": self.size,
+            "tick_cost_ms": round(self._cost * 1000, 1) if self._cost is not None else None,
+            "frames_grabbed": self.frames_grabbed,
+            "frames_sent": self.frames_sent,
+            "frames_skipped": self.frames_skipped,
+            "last_change": round(self.last_change, 4) if self.last_change is not None else None,
+        }
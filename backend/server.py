@@ -8,14 +8,15 @@ if sys.platform == 'win32':
 
 import socketio
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
 import asyncio
 import threading
 import sys
 import os
-import json
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import parse_qs
 
 
 
@@ -23,12 +24,22 @@ from pathlib import Path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 import jarvis
+from artifact_server import ArtifactStore, URL_PREFIX
+from audio_fanout import AudioFanout, FANOUT_MODES
+from event_bus import EVENT_TOPICS, EventBus, merge_browser_frame, merge_text, parse_topics
+from executors import executor_stats
 from authenticator import FaceAuthenticator
 from kasa_agent import KasaAgent
+from printer_agent import PrinterAgent
+from project_manager import ProjectManager
+from session_manager import SessionLimitError, SessionManager
+from settings_store import SettingsStore
 
 # Create a Socket.IO server
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
 app = FastAPI()
+# The frontend (Vite dev server / Electron) fetches artifacts cross-origin
+app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["GET", "HEAD"], expose_headers=["ETag", "Content-Range", "Accept-Ranges"])
 app_socketio = socketio.ASGIApp(sio, app)
 
 import signal
@@ -36,11 +47,13 @@ import signal
 # --- SHUTDOWN HANDLER ---
 def signal_handler(sig, frame):
     print(f"\n[SERVER] Caught signal {sig}. Exiting gracefully...")
-    # Clean up audio loop
-    if audio_loop:
+    # Don't lose a debounced settings write
+    settings.flush_sync()
+    # Clean up audio loops
+    for session in sessions:
         try:
-            print("[SERVER] Stopping Audio Loop...")
-            audio_loop.stop() 
+            print(f"[SERVER] Stopping Audio Loop for session '{session.id}'...")
+            session.loop.stop() 
         except:
             pass
     # Force kill
@@ -50,12 +63,15 @@ def signal_handler(sig, frame):
 signal.signal(signal.SIGINT, signal_handler)
 signal.signal(signal.SIGTERM, signal_handler)
 
-# Global state
-audio_loop = None
-loop_task = None
+# Global state (per-session AudioLoops live in `sessions`, created below)
 authenticator = None
 kasa_agent = KasaAgent()
+printer_agent = PrinterAgent() # Shared by every session
+project_root_manager = None # Created on first start; sessions get views of it
+printer_monitor_task = None
+artifacts = ArtifactStore()
 SETTINGS_FILE = "settings.json"
+LATENCY_TRACE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs", "latency")
 
 DEFAULT_SETTINGS = {
     "face_auth_enabled": False, # Default OFF as requested
@@ -78,41 +94,78 @@ DEFAULT_SETTINGS = {
     },
     "printers": [], # List of {host, port, name, type}
     "kasa_devices": [], # List of {ip, alias, model}
-    "camera_flipped": False # Invert cursor horizontal direction
+    "camera_flipped": False, # Invert cursor horizontal direction
+    "mic_capture_mode": "blocking", # "blocking" (stream.read) or "callback" (PortAudio callback + ring buffer)
+    "mic_native_rate": True, # Capture at the device's native rate and resample to 16 kHz in-process
+    "upstream_silence_gate": False, # Stop sending mic audio after a silence window
+    "gate_silence_window": 3.0, # Seconds of silence before gating kicks in
+    "playback_mode": "blocking", # "blocking" (stream.write) or "callback" (jitter buffer + instant barge-in)
+    "latency_trace_log": True, # Write per-turn voice latency to logs/latency/session_*.jsonl
+    "audio_fanout_mode": "binary", # "binary" (raw PCM attachment) or "envelope" (visualizer levels only)
+    "audio_fanout_interval_ms": 50, # Model audio is batched and emitted to the frontend at this cadence
+    "scene_change_gate": True, # Skip vision frames that barely differ from the last one sent
+    "scene_change_threshold": 0.03, # Mean pixel change (0-1) needed for a frame to count as new
+    "frontend_video_fps": 1.0, # Webcam frames per second the frontend is asked to send while Jarvis runs
+    "tool_confirmation_timeout": 60, # Seconds to wait for a tool confirmation before auto-denying (0 = wait forever)
+    "event_coalesce_interval_ms": 50, # Transcription deltas / CAD thoughts are merged and emitted at this cadence
+    "event_queue_limit": 500, # Outbound events queued per client before the oldest lossy one is dropped
+    "max_sessions": 4 # Concurrent Jarvis sessions (only one of them can use the local mic/speaker)
 }
 
-SETTINGS = DEFAULT_SETTINGS.copy()
-
-def load_settings():
-    global SETTINGS
-    if os.path.exists(SETTINGS_FILE):
-        try:
-            with open(SETTINGS_FILE, 'r') as f:
-                loaded = json.load(f)
-                # Merge with defaults to ensure new keys exist
-                # Deep merge for tool_permissions would be better but shallow merge of top keys + tool_permissions check is okay for now
-                for k, v in loaded.items():
-                    if k == "tool_permissions" and isinstance(v, dict):
-                         SETTINGS["tool_permissions"].update(v)
-                    else:
-                        SETTINGS[k] = v
-            print(f"Loaded settings: {SETTINGS}")
-        except Exception as e:
-            print(f"Error loading settings: {e}")
-
-def save_settings():
-    try:
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(SETTINGS, f, indent=4)
-        print("Settings saved.")
-    except Exception as e:
-        print(f"Error saving settings: {e}")
+# Authoritative in-memory settings; written to SETTINGS_FILE in the background
+settings = SettingsStore(SETTINGS_FILE, DEFAULT_SETTINGS, debounce=0.5)
 
 # Load on startup
-load_settings()
+settings.load()
+# Read-only view for the rest of the server: change settings through settings.update()
+SETTINGS = settings.data
 
 authenticator = None
 kasa_agent = KasaAgent(known_devices=SETTINGS.get("kasa_devices"))
+
+# One AudioLoop per session; genai client, printer/kasa agents and thread pools are shared
+sessions = SessionManager(max_sessions=SETTINGS.get("max_sessions", 4))
+DEFAULT_SESSION = "local" # start_audio without a session id (the desktop app)
+
+def loop_for(sid):
+    """AudioLoop a client's requests go to (its session, else the primary one), or None."""
+    session = sessions.for_client(sid)
+    return session.loop if session else None
+
+def load_saved_printers():
+    saved_printers = SETTINGS.get("printers", [])
+    if saved_printers:
+        print(f"[SERVER] Loading {len(saved_printers)} saved printers...")
+    for p in saved_printers:
+        printer_agent.add_printer_manually(
+            name=p.get("name", p["host"]),
+            host=p["host"],
+            port=p.get("port", 80),
+            printer_type=p.get("type", "moonraker"),
+            camera_url=p.get("camera_url")
+        )
+
+load_saved_printers()
+
+# Outbound events from AudioLoop callbacks: one ordered queue per client
+async def emit_to_client(event, data, sid):
+    await sio.emit(event, data, room=sid)
+
+event_bus = EventBus(
+    emit_to_client,
+    interval=SETTINGS.get("event_coalesce_interval_ms", 50) / 1000.0,
+    max_queue=SETTINGS.get("event_queue_limit", 500),
+    routes=EVENT_TOPICS, # Large / topic-specific payloads only go to subscribed clients
+    disconnect=sio.disconnect, # A client too far behind on ordered events reconnects for fresh state
+)
+event_bus.register('transcription', "coalesce", merge_text)
+event_bus.register('cad_thought', "coalesce", merge_text)
+event_bus.register('browser_frame', "latest", merge_browser_frame)
+event_bus.register('jobs', "latest") # Full table every time, only the newest matters
+
+def audio_data_policy(mode):
+    # An envelope only drives the visualizer, so a stale one is worthless; raw PCM stays ordered
+    return "latest" if mode == "envelope" else "ordered"
 # tool_permissions is now SETTINGS["tool_permissions"]
 
 @app.on_event("startup")
@@ -135,10 +188,84 @@ async def startup_event():
 async def status():
     return {"status": "running", "service": "Jarvis Backend"}
 
+def metrics_session(session_id):
+    # Per-session metrics: ?session=<id>, default the primary session
+    return sessions.get(session_id) if session_id else sessions.primary
+
+@app.get("/metrics/audio")
+async def audio_metrics(session: str = None):
+    current = metrics_session(session)
+    if not current:
+        return {"running": False}
+    audio_loop = current.loop
+    return {
+        "running": True,
+        "session": current.id,
+        "capture": audio_loop.get_capture_stats(),
+        "send": audio_loop.get_send_stats(),
+        "gate": audio_loop.get_gate_stats(),
+        "playback": audio_loop.get_playback_stats(),
+        "fanout": current.fanout.stats() if current.fanout else None,
+        "video": audio_loop.get_video_stats(),
+    }
+
+@app.get("/metrics/tools")
+async def tool_metrics(session: str = None):
+    current = metrics_session(session)
+    if not current:
+        return {"running": False}
+    return {"running": True, "session": current.id, **current.loop.get_tool_stats()}
+
+@app.get("/metrics/jobs")
+async def job_metrics(session: str = None):
+    current = metrics_session(session)
+    if not current:
+        return {"running": False}
+    return {"running": True, "session": current.id, **current.loop.get_job_stats()}
+
+@app.get("/metrics/sessions")
+async def session_metrics():
+    # Admission counters and per-session resource usage
+    return sessions.stats()
+
+@app.get("/metrics/executors")
+async def executor_metrics():
+    # Thread pools are process-wide, so these are available without a running loop
+    return executor_stats()
+
+@app.get("/metrics/events")
+async def event_metrics():
+    # Per-client outbound queues exist whether or not the audio loop runs
+    return event_bus.stats()
+
+@app.get(URL_PREFIX + "/{digest}")
+async def get_artifact(digest: str, request: Request):
+    return artifacts.response(digest, request.headers.get("if-none-match"))
+
+@app.get("/metrics/artifacts")
+async def artifact_metrics():
+    return artifacts.stats()
+
+@app.get("/metrics/settings")
+async def settings_metrics():
+    return settings.stats()
+
+@app.get("/metrics/latency")
+async def latency_metrics(session: str = None):
+    current = metrics_session(session)
+    if not current:
+        return {"running": False}
+    return {"running": True, "session": current.id, **current.loop.get_latency_stats()}
+
 @sio.event
 async def connect(sid, environ):
     print(f"Client connected: {sid}")
+    # Clients may pick their topics up front: io(url, {query: {topics: "cad,kasa"}})
+    query = parse_qs(environ.get("QUERY_STRING", ""))
+    topics = parse_topics(query["topics"][0]) if "topics" in query else None
+    event_bus.add_client(sid, topics)
     await sio.emit('status', {'msg': 'Connected to Jarvis Backend'}, room=sid)
+    await emit_video_config(room=sid)
 
     global authenticator
     
@@ -161,11 +288,11 @@ async def connect(sid, environ):
     
     # Check if already authenticated or needs to start
     if authenticator.authenticated:
-        await sio.emit('auth_status', {'authenticated': True})
+        await sio.emit('auth_status', {'authenticated': True}, room=sid)
     else:
         # Check Settings for Auth
         if SETTINGS.get("face_auth_enabled", False):
-            await sio.emit('auth_status', {'authenticated': False})
+            await sio.emit('auth_status', {'authenticated': False}, room=sid)
             # Start the auth loop in background
             asyncio.create_task(authenticator.start_authentication_loop())
         else:
@@ -173,22 +300,63 @@ async def connect(sid, environ):
             print("Face Auth Disabled. Auto-authenticating.")
             # We don't change authenticator state to true to avoid confusion if re-enabled? 
             # Or we should just tell client it's auth'd.
-            await sio.emit('auth_status', {'authenticated': True})
+            await sio.emit('auth_status', {'authenticated': True}, room=sid)
 
 @sio.event
 async def disconnect(sid):
     print(f"Client disconnected: {sid}")
+    event_bus.remove_client(sid)
+    session = sessions.detach(sid)
+    # A session without local audio only exists for its clients
+    if session and not session.audio_io and not session.clients:
+        print(f"[SERVER] Last client left session '{session.id}', stopping it")
+        sessions.stop(session.id)
+
+@sio.event
+async def subscribe(sid, data=None):
+    # data: { topics: ["cad", "kasa"] } ; null / missing topics = everything
+    requested = (data or {}).get('topics')
+    topics = parse_topics(requested) if requested is not None else None
+    event_bus.subscribe(sid, topics)
+    print(f"Client {sid} subscribed to: {sorted(topics) if topics is not None else 'all topics'}")
+    await sio.emit('subscribed', {'topics': sorted(topics) if topics is not None else None}, room=sid)
+
+def publish_to_session(session_id, sid):
+    """publish(event, data) for one session's AudioLoop callbacks: only that session's clients get its events."""
+    def publish(event, data):
+        session = sessions.get(session_id)
+        # Not registered yet (constructor callbacks) or already stopped: just the client that started it
+        clients = sessions.audience(session, event_bus.clients) if session else [sid]
+        event_bus.publish(event, data, clients=clients)
+    return publish
+
+async def emit_session_status(session, msg):
+    for client in sessions.audience(session, event_bus.clients):
+        await sio.emit('status', {'msg': msg, 'session': session.id}, room=client)
+
+def session_project_manager(session_id):
+    """
+    A view of the shared project workspace (created on first use; that resets temp once).
+    Each session starts in its own scratch project so CAD builds and chat logs don't mix;
+    the desktop app's default session keeps the plain temp project.
+    """
+    global project_root_manager
+    if project_root_manager is None:
+        project_root_manager = ProjectManager(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    if session_id == DEFAULT_SESSION:
+        return project_root_manager.view()
+    return project_root_manager.scratch_view(session_id)
 
 @sio.event
 async def start_audio(sid, data=None):
-    global audio_loop, loop_task
+    global printer_monitor_task
     
     # Optional: Block if not authenticated
     # Only block if auth is ENABLED and not authenticated
     if SETTINGS.get("face_auth_enabled", False):
         if authenticator and not authenticator.authenticated:
             print("Blocked start_audio: Not authenticated.")
-            await sio.emit('error', {'msg': 'Authentication Required'})
+            await sio.emit('error', {'msg': 'Authentication Required'}, room=sid)
             return
 
     print("Starting Audio Loop...")
@@ -202,45 +370,74 @@ async def start_audio(sid, data=None):
             device_name = data['device_name']
             
     print(f"Using input device: Name='{device_name}', Index={device_index}")
-    
-    if audio_loop:
-        if loop_task and (loop_task.done() or loop_task.cancelled()):
-             print("Audio loop task appeared finished/cancelled. Clearing and restarting...")
-             audio_loop = None
-             loop_task = None
-        else:
-             print("Audio loop already running. Re-connecting client to session.")
-             await sio.emit('status', {'msg': 'Jarvis Already Running'})
-             return
 
+    # Sessions: the desktop app uses the default one; other clients pass their own id
+    # and audio=False (the local mic/speaker belongs to one session at a time)
+    session_id = str((data or {}).get('session') or DEFAULT_SESSION)
+    wants_audio = bool((data or {}).get('audio', True))
+    # Per-session permission overrides can only make a tool stricter (True = ask for
+    # confirmation); auto-allowing is a server-side setting (tool_permissions)
+    requested_perms = (data or {}).get('permissions')
+    session_perms = {k: True for k, v in requested_perms.items() if v is True and k in SETTINGS["tool_permissions"]} if isinstance(requested_perms, dict) else {}
+
+    if session_id in sessions:
+        print(f"Audio loop already running. Re-connecting client to session '{session_id}'.")
+        sessions.attach(sid, session_id)
+        await sio.emit('status', {'msg': 'Jarvis Already Running', 'session': session_id}, room=sid)
+        return
+
+    reason = sessions.admit(session_id, wants_audio)
+    if reason:
+        await sio.emit('error', {'msg': f"Cannot start Jarvis: {reason}"}, room=sid)
+        return
+
+    publish = publish_to_session(session_id, sid)
+
+    # Callback to send audio data to frontend (batched, binary)
+    async def emit_audio(payload):
+        publish('audio_data', payload)
+
+    audio_fanout = AudioFanout(
+        emit_audio,
+        interval=SETTINGS.get("audio_fanout_interval_ms", 50) / 1000.0,
+        mode=SETTINGS.get("audio_fanout_mode", "binary"),
+        sample_rate=jarvis.RECEIVE_SAMPLE_RATE,
+    )
+    event_bus.register('audio_data', audio_data_policy(audio_fanout.mode))
 
-    # Callback to send audio data to frontend
     def on_audio_data(data_bytes):
-        # We need to schedule this on the event loop
-        # This is high frequency, so we might want to downsample or batch if it's too much
-        asyncio.create_task(sio.emit('audio_data', {'data': list(data_bytes)}))
+        audio_fanout.push(data_bytes)
 
     # Callback to send CAL data to frontend
     def on_cad_data(data):
-        info = f"{len(data.get('vertices', []))} vertices" if 'vertices' in data else f"{len(data.get('data', ''))} bytes (STL)"
-        print(f"Sending CAD data to frontend: {info}")
-        asyncio.create_task(sio.emit('cad_data', data))
+        asyncio.create_task(publish_cad_result(data, publish))
 
     # Callback to send Browser data to frontend
     def on_web_data(data):
         print(f"Sending Browser data to frontend: {len(data.get('log', ''))} chars logs")
-        asyncio.create_task(sio.emit('browser_frame', data))
+        publish('browser_frame', data)
         
     # Callback to send Transcription data to frontend
     def on_transcription(data):
         # data = {"sender": "User"|"Jarvis", "text": "..."}
-        asyncio.create_task(sio.emit('transcription', data))
+        publish('transcription', data)
 
     # Callback to send Confirmation Request to frontend
     def on_tool_confirmation(data):
         # data = {"id": "uuid", "tool": "tool_name", "args": {...}}
         print(f"Requesting confirmation for tool: {data.get('tool')}")
-        asyncio.create_task(sio.emit('tool_confirmation_request', data))
+        publish('tool_confirmation_request', data)
+
+    # Callback when a confirmation request is auto-denied (timeout / session ended)
+    def on_tool_confirmation_expired(data):
+        # data = {"id": "uuid", "tool": "tool_name", "reason": "timeout"|"session_ended"}
+        print(f"Confirmation for tool {data.get('tool')} expired ({data.get('reason')})")
+        publish('tool_confirmation_expired', data)
+
+    # Callback to send the background job table to frontend
+    def on_job_update(jobs):
+        # jobs = [{"id", "kind", "label", "state", "queued_s", "duration_s", "error"}, ...]
+        publish('jobs', jobs)
 
     # Callback to send CAD status to frontend
     def on_cad_status(status):
@@ -249,31 +446,31 @@ async def start_audio(sid, data=None):
         # - a dict with {status, attempt, max_attempts, error} (from CadAgent)
         if isinstance(status, dict):
             print(f"Sending CAD Status: {status.get('status')} (attempt {status.get('attempt')}/{status.get('max_attempts')})")
-            asyncio.create_task(sio.emit('cad_status', status))
+            publish('cad_status', status)
         else:
             # Legacy: simple string
             print(f"Sending CAD Status: {status}")
-            asyncio.create_task(sio.emit('cad_status', {'status': status}))
+            publish('cad_status', {'status': status})
 
     # Callback to send CAD thoughts to frontend (streaming)
     def on_cad_thought(thought_text):
-        asyncio.create_task(sio.emit('cad_thought', {'text': thought_text}))
+        publish('cad_thought', {'text': thought_text})
 
     # Callback to send Project Update to frontend
     def on_project_update(project_name):
         print(f"Sending Project Update: {project_name}")
-        asyncio.create_task(sio.emit('project_update', {'project': project_name}))
+        publish('project_update', {'project': project_name})
 
     # Callback to send Device Update to frontend
     def on_device_update(devices):
         # devices is a list of dicts
         print(f"Sending Kasa Device Update: {len(devices)} devices")
-        asyncio.create_task(sio.emit('kasa_devices', devices))
+        publish('kasa_devices', devices)
 
     # Callback to send Error to frontend
     def on_error(msg):
         print(f"Sending Error to frontend: {msg}")
-        asyncio.create_task(sio.emit('error', {'msg': msg}))
+        publish('error', {'msg': msg})
 
     # Initialize Jarvis
     try:
@@ -285,6 +482,8 @@ async def start_audio(sid, data=None):
             on_web_data=on_web_data,
             on_transcription=on_transcription,
             on_tool_confirmation=on_tool_confirmation,
+            on_tool_confirmation_expired=on_tool_confirmation_expired,
+            on_job_update=on_job_update,
             on_cad_status=on_cad_status,
             on_cad_thought=on_cad_thought,
             on_project_update=on_project_update,
@@ -293,66 +492,63 @@ async def start_audio(sid, data=None):
 
             input_device_index=device_index,
             input_device_name=device_name,
-            kasa_agent=kasa_agent
+            kasa_agent=kasa_agent,
+            genai_client=jarvis.client,
+            printer_agent=printer_agent,
+            project_manager=session_project_manager(session_id),
+            audio_io=wants_audio,
+            capture_mode=SETTINGS.get("mic_capture_mode", "blocking"),
+            native_capture=SETTINGS.get("mic_native_rate", True),
+            silence_gate=SETTINGS.get("upstream_silence_gate", False),
+            gate_silence_window=SETTINGS.get("gate_silence_window", 3.0),
+            playback_mode=SETTINGS.get("playback_mode", "blocking"),
+            latency_trace_dir=LATENCY_TRACE_DIR if SETTINGS.get("latency_trace_log", True) else None,
+            scene_gate=SETTINGS.get("scene_change_gate", True),
+            scene_threshold=SETTINGS.get("scene_change_threshold", 0.03),
+            frontend_fps=SETTINGS.get("frontend_video_fps", 1.0),
+            confirmation_timeout=SETTINGS.get("tool_confirmation_timeout", 60) or None
         )
         print("AudioLoop initialized successfully.")
 
-        # Apply current permissions
-        audio_loop.update_permissions(SETTINGS["tool_permissions"])
+        # Apply current permissions (plus this session's overrides)
+        audio_loop.update_permissions({**SETTINGS["tool_permissions"], **session_perms})
         
         # Check initial mute state
         if data and data.get('muted', False):
             print("Starting with Audio Paused")
             audio_loop.set_paused(True)
 
+        # Runs AudioLoop.run(); a crashed or finished loop releases its session
         print("Creating asyncio task for AudioLoop.run()")
-        loop_task = asyncio.create_task(audio_loop.run())
-        
-        # Add a done callback to catch silent failures in the loop
-        def handle_loop_exit(task):
-            try:
-                task.result()
-            except asyncio.CancelledError:
-                print("Audio Loop Cancelled")
-            except Exception as e:
-                print(f"Audio Loop Crashed: {e}")
-                # You could emit 'error' here if you have context
-        
-        loop_task.add_done_callback(handle_loop_exit)
+        session = sessions.start(session_id, audio_loop, audio_io=wants_audio, fanout=audio_fanout, permissions=session_perms)
+        sessions.attach(sid, session_id)
         
         print("Emitting 'Jarvis Started'")
-        await sio.emit('status', {'msg': 'Jarvis Started'})
-
-        # Load saved printers
-        saved_printers = SETTINGS.get("printers", [])
-        if saved_printers and audio_loop.printer_agent:
-            print(f"[SERVER] Loading {len(saved_printers)} saved printers...")
-            for p in saved_printers:
-                audio_loop.printer_agent.add_printer_manually(
-                    name=p.get("name", p["host"]),
-                    host=p["host"],
-                    port=p.get("port", 80),
-                    printer_type=p.get("type", "moonraker"),
-                    camera_url=p.get("camera_url")
-                )
-        
-        # Start Printer Monitor
-        asyncio.create_task(monitor_printers_loop())
+        await emit_session_status(session, 'Jarvis Started')
+        await emit_video_config()
         
+        # Start Printer Monitor (one for all sessions)
+        if printer_monitor_task is None or printer_monitor_task.done():
+            printer_monitor_task = asyncio.create_task(monitor_printers_loop())
+        
+    except SessionLimitError as e:
+        # Another start took the slot (or local audio) while this one was being built
+        audio_fanout.close()
+        await sio.emit('error', {'msg': f"Cannot start Jarvis: {e}"}, room=sid)
     except Exception as e:
         print(f"CRITICAL ERROR STARTING Jarvis: {e}")
         import traceback
         traceback.print_exc()
-        await sio.emit('error', {'msg': f"Failed to start: {str(e)}"})
-        audio_loop = None # Ensure we can try again
+        audio_fanout.close()
+        await sio.emit('error', {'msg': f"Failed to start: {str(e)}"}, room=sid)
 
 
 async def monitor_printers_loop():
-    """Background task to query printer status periodically."""
+    """Background task to query printer status periodically (while any session runs)."""
     print("[SERVER] Starting Printer Monitor Loop")
-    while audio_loop and audio_loop.printer_agent:
+    while len(sessions):
         try:
-            agent = audio_loop.printer_agent
+            agent = printer_agent
             if not agent.printers:
                 await asyncio.sleep(5)
                 continue
@@ -369,7 +565,7 @@ async def monitor_printers_loop():
                         pass # Ignore errors for now
                     elif res:
                         # res is PrintStatus object
-                        await sio.emit('print_status_update', res.to_dict())
+                        event_bus.publish('print_status_update', res.to_dict())
                         
         except asyncio.CancelledError:
             print("[SERVER] Printer Monitor Cancelled")
@@ -381,28 +577,31 @@ async def monitor_printers_loop():
 
 @sio.event
 async def stop_audio(sid):
-    global audio_loop
-    if audio_loop:
-        audio_loop.stop() 
-        print("Stopping Audio Loop")
-        audio_loop = None
-        await sio.emit('status', {'msg': 'Jarvis Stopped'})
+    session = sessions.for_client(sid)
+    if session:
+        # Tell its clients before the session (and its audience) is released
+        audience = sessions.audience(session, event_bus.clients)
+        sessions.stop(session.id)
+        print(f"Stopping Audio Loop for session '{session.id}'")
+        for client in audience:
+            await sio.emit('status', {'msg': 'Jarvis Stopped', 'session': session.id}, room=client)
+        await emit_video_config()
 
 @sio.event
 async def pause_audio(sid):
-    global audio_loop
+    audio_loop = loop_for(sid)
     if audio_loop:
         audio_loop.set_paused(True)
         print("Pausing Audio")
-        await sio.emit('status', {'msg': 'Audio Paused'})
+        await sio.emit('status', {'msg': 'Audio Paused'}, room=sid)
 
 @sio.event
 async def resume_audio(sid):
-    global audio_loop
+    audio_loop = loop_for(sid)
     if audio_loop:
         audio_loop.set_paused(False)
         print("Resuming Audio")
-        await sio.emit('status', {'msg': 'Audio Resumed'})
+        await sio.emit('status', {'msg': 'Audio Resumed'}, room=sid)
 
 @sio.event
 async def confirm_tool(sid, data):
@@ -412,36 +611,43 @@ async def confirm_tool(sid, data):
     
     print(f"[SERVER DEBUG] Received confirmation response for {request_id}: {confirmed}")
     
+    audio_loop = loop_for(sid)
     if audio_loop:
         audio_loop.resolve_tool_confirmation(request_id, confirmed)
     else:
         print("Audio loop not active, cannot resolve confirmation.")
 
+@sio.event
+async def cancel_job(sid, data):
+    # data: { "id": "job id" }
+    job_id = data.get('id')
+    audio_loop = loop_for(sid)
+    if audio_loop and audio_loop.cancel_job(job_id):
+        print(f"[SERVER] Cancelled job {job_id}")
+    else:
+        print(f"[SERVER] Job {job_id} not running, nothing to cancel.")
+
 @sio.event
 async def shutdown(sid, data=None):
     """Gracefully shutdown the server when the application closes."""
-    global audio_loop, loop_task, authenticator
+    global authenticator
     
     print("[SERVER] ========================================")
     print("[SERVER] SHUTDOWN SIGNAL RECEIVED FROM FRONTEND")
     print("[SERVER] ========================================")
     
-    # Stop audio loop
-    if audio_loop:
-        print("[SERVER] Stopping Audio Loop...")
-        audio_loop.stop()
-        audio_loop = None
-    
-    # Cancel the loop task if running
-    if loop_task and not loop_task.done():
-        print("[SERVER] Cancelling loop task...")
-        loop_task.cancel()
-        loop_task = None
+    # Stop every session's audio loop (loops still running after the timeout are cancelled)
+    if len(sessions):
+        print(f"[SERVER] Stopping {len(sessions)} Audio Loop(s)...")
+        await sessions.stop_all(timeout=2.0)
     
     # Stop authenticator if running
     if authenticator:
         print("[SERVER] Stopping Authenticator...")
         authenticator.stop()
+
+    # Write any settings change still waiting for its debounce
+    await settings.flush()
     
     print("[SERVER] Graceful shutdown complete. Terminating process...")
     
@@ -453,6 +659,7 @@ async def user_input(sid, data):
     text = data.get('text')
     print(f"[SERVER DEBUG] User input received: '{text}'")
     
+    audio_loop = loop_for(sid)
     if not audio_loop:
         print("[SERVER DEBUG] [Error] Audio loop is None. Cannot send text.")
         return
@@ -470,31 +677,39 @@ async def user_input(sid, data):
             
         # Use the same 'send' method that worked for audio, as 'send_realtime_input' and 'send_client_content' seem unstable in this env
         # INJECT VIDEO FRAME IF AVAILABLE (VAD-style logic for Text Input)
-        if audio_loop and audio_loop._latest_image_payload:
+        image_payload = await audio_loop.get_image_payload("user_input") if audio_loop else None
+        if image_payload:
             print(f"[SERVER DEBUG] Piggybacking video frame with text input.")
             try:
                 # Send frame first
-                await audio_loop.session.send(input=audio_loop._latest_image_payload, end_of_turn=False)
+                await audio_loop.session.send(input=image_payload, end_of_turn=False)
+                audio_loop.frame_sent(image_payload)
             except Exception as e:
                 print(f"[SERVER DEBUG] Failed to send piggyback frame: {e}")
                 
         await audio_loop.session.send(input=text, end_of_turn=True)
         print(f"[SERVER DEBUG] Message sent to model successfully.")
 
-import json
-from datetime import datetime
-from pathlib import Path
+def desired_video_fps(sid):
+    """Webcam frame rate worth sending: frames are only used while the client's session runs."""
+    session = sessions.for_client(sid)
+    if session and session.running:
+        return session.loop.frame_ingest.target_fps
+    return 0
 
-# ... (imports)
+async def emit_video_config(room=None):
+    # Each client is asked for its own session's rate
+    for client in ([room] if room else event_bus.clients):
+        await sio.emit('video_config', {'fps': desired_video_fps(client)}, room=client)
 
 @sio.event
 async def video_frame(sid, data):
     # data should contain 'image' which is binary (blob) or base64 encoded
     image_data = data.get('image')
+    audio_loop = loop_for(sid)
     if image_data and audio_loop:
-        # We don't await this because we don't want to block the socket handler
-        # But send_frame is async, so we create a task
-        asyncio.create_task(audio_loop.send_frame(image_data))
+        # Latest-only slot: no task per frame, base64 happens only if the frame is sent
+        audio_loop.push_frame(image_data)
 
 @sio.event
 async def save_memory(sid, data):
@@ -528,11 +743,11 @@ async def save_memory(sid, data):
                 sender = msg.get('sender', 'Unknown')
                 text = msg.get('text', '')
         print(f"Conversation saved to {filename}")
-        await sio.emit('status', {'msg': 'Memory Saved Successfully'})
+        await sio.emit('status', {'msg': 'Memory Saved Successfully'}, room=sid)
 
     except Exception as e:
         print(f"Error saving memory: {e}")
-        await sio.emit('error', {'msg': f"Failed to save memory: {str(e)}"})
+        await sio.emit('error', {'msg': f"Failed to save memory: {str(e)}"}, room=sid)
 
 @sio.event
 async def upload_memory(sid, data):
@@ -543,14 +758,15 @@ async def upload_memory(sid, data):
             print("No memory data provided.")
             return
 
+        audio_loop = loop_for(sid)
         if not audio_loop:
              print("[SERVER DEBUG] [Error] Audio loop is None. Cannot load memory.")
-             await sio.emit('error', {'msg': "System not ready (Audio Loop inactive)"})
+             await sio.emit('error', {'msg': "System not ready (Audio Loop inactive)"}, room=sid)
              return
         
         if not audio_loop.session:
              print("[SERVER DEBUG] [Error] Session is None. Cannot load memory.")
-             await sio.emit('error', {'msg': "System not ready (No active session)"})
+             await sio.emit('error', {'msg': "System not ready (No active session)"}, room=sid)
              return
 
         # Send to model
@@ -559,19 +775,35 @@ async def upload_memory(sid, data):
         
         await audio_loop.session.send(input=context_msg, end_of_turn=True)
         print("Memory context sent successfully.")
-        await sio.emit('status', {'msg': 'Memory Loaded into Context'})
+        await sio.emit('status', {'msg': 'Memory Loaded into Context'}, room=sid)
 
     except Exception as e:
         print(f"Error uploading memory: {e}")
-        await sio.emit('error', {'msg': f"Failed to upload memory: {str(e)}"})
+        await sio.emit('error', {'msg': f"Failed to upload memory: {str(e)}"}, room=sid)
+
+async def publish_cad_result(result, publish=event_bus.publish):
+    """
+    Register a CadAgent result's STL as an artifact and send clients its URL instead of the file.
+    :param publish: publish(event, data), e.g. one session's publish_to_session().
+    """
+    path = result.get('file_path')
+    if path and os.path.exists(path):
+        try:
+            artifact = await artifacts.add(path)
+            print(f"Sending CAD artifact to frontend: {artifact.name} ({artifact.size} bytes, {artifact.digest[:12]})")
+            publish('cad_data', artifact.to_payload())
+            return
+        except Exception as e:
+            print(f"[SERVER] Failed to register CAD artifact {path}: {e}")
+    publish('cad_data', {k: v for k, v in result.items() if k != 'file_path'})
 
 @sio.event
 async def discover_kasa(sid):
     print(f"Received discover_kasa request")
     try:
         devices = await kasa_agent.discover_devices()
-        await sio.emit('kasa_devices', devices)
-        await sio.emit('status', {'msg': f"Found {len(devices)} Kasa devices"})
+        event_bus.publish('kasa_devices', devices)
+        await sio.emit('status', {'msg': f"Found {len(devices)} Kasa devices"}, room=sid)
         
         # Save to settings
         # devices is a list of full device info dicts. minimizing for storage.
@@ -587,13 +819,12 @@ async def discover_kasa(sid):
         # For now, just overwrite with latest scan result + previously known if we want to be fancy,
         # but user asked for "Any new devices that are scanned are added there".
         # A simple full persistence of current state is safest.
-        SETTINGS["kasa_devices"] = saved_devices
-        save_settings()
+        settings.update({"kasa_devices": saved_devices})
         print(f"[SERVER] Saved {len(saved_devices)} Kasa devices to settings.")
         
     except Exception as e:
         print(f"Error discovering kasa: {e}")
-        await sio.emit('error', {'msg': f"Kasa Discovery Failed: {str(e)}"})
+        await sio.emit('error', {'msg': f"Kasa Discovery Failed: {str(e)}"}, room=sid)
 
 @sio.event
 async def iterate_cad(sid, data):
@@ -601,36 +832,37 @@ async def iterate_cad(sid, data):
     prompt = data.get('prompt')
     print(f"Received iterate_cad request: '{prompt}'")
     
+    session = sessions.for_client(sid)
+    audio_loop = session.loop if session else None
     if not audio_loop or not audio_loop.cad_agent:
-        await sio.emit('error', {'msg': "CAD Agent not available"})
+        event_bus.publish('error', {'msg': "CAD Agent not available"}, to=sid)
         return
 
     try:
-        # Notify user work has started
-        await sio.emit('status', {'msg': 'Iterating design...'})
-        await sio.emit('cad_status', {'status': 'generating'})
+        # Notify the session's clients work has started
+        publish = publish_to_session(session.id, sid)
+        publish('status', {'msg': 'Iterating design...'})
+        publish('cad_status', {'status': 'generating'})
         
         # Call the agent with project path
         cad_output_dir = str(audio_loop.project_manager.get_current_project_path() / "cad")
         result = await audio_loop.cad_agent.iterate_prototype(prompt, output_dir=cad_output_dir)
         
         if result:
-            info = f"{len(result.get('data', ''))} bytes (STL)"
-            print(f"Sending updated CAD data: {info}")
-            await sio.emit('cad_data', result)
+            await publish_cad_result(result, publish)
             # Save to Project
             if 'file_path' in result:
                 saved_path = audio_loop.project_manager.save_cad_artifact(result['file_path'], prompt)
                 if saved_path:
                     print(f"[SERVER] Saved iterated CAD to {saved_path}")
 
-            await sio.emit('status', {'msg': 'Design updated'})
+            publish('status', {'msg': 'Design updated'})
         else:
-            await sio.emit('error', {'msg': 'Failed to update design'})
+            publish('error', {'msg': 'Failed to update design'})
             
     except Exception as e:
         print(f"Error iterating CAD: {e}")
-        await sio.emit('error', {'msg': f"Iteration Error: {str(e)}"})
+        publish('error', {'msg': f"Iteration Error: {str(e)}"})
 
 @sio.event
 async def generate_cad(sid, data):
@@ -638,22 +870,23 @@ async def generate_cad(sid, data):
     prompt = data.get('prompt')
     print(f"Received generate_cad request: '{prompt}'")
     
+    session = sessions.for_client(sid)
+    audio_loop = session.loop if session else None
     if not audio_loop or not audio_loop.cad_agent:
-        await sio.emit('error', {'msg': "CAD Agent not available"})
+        event_bus.publish('error', {'msg': "CAD Agent not available"}, to=sid)
         return
 
     try:
-        await sio.emit('status', {'msg': 'Generating new design...'})
-        await sio.emit('cad_status', {'status': 'generating'})
+        publish = publish_to_session(session.id, sid)
+        publish('status', {'msg': 'Generating new design...'})
+        publish('cad_status', {'status': 'generating'})
         
         # Use generate_prototype based on prompt with project path
         cad_output_dir = str(audio_loop.project_manager.get_current_project_path() / "cad")
         result = await audio_loop.cad_agent.generate_prototype(prompt, output_dir=cad_output_dir)
         
         if result:
-            info = f"{len(result.get('data', ''))} bytes (STL)"
-            print(f"Sending newly generated CAD data: {info}")
-            await sio.emit('cad_data', result)
+            await publish_cad_result(result, publish)
 
 
             # Save to Project
@@ -662,13 +895,13 @@ async def generate_cad(sid, data):
                 if saved_path:
                     print(f"[SERVER] Saved generated CAD to {saved_path}")
 
-            await sio.emit('status', {'msg': 'Design generated'})
+            publish('status', {'msg': 'Design generated'})
         else:
-            await sio.emit('error', {'msg': 'Failed to generate design'})
+            publish('error', {'msg': 'Failed to generate design'})
             
     except Exception as e:
         print(f"Error generating CAD: {e}")
-        await sio.emit('error', {'msg': f"Generation Error: {str(e)}"})
+        publish('error', {'msg': f"Generation Error: {str(e)}"})
 
 @sio.event
 async def prompt_web_agent(sid, data):
@@ -676,57 +909,37 @@ async def prompt_web_agent(sid, data):
     prompt = data.get('prompt')
     print(f"Received web agent prompt: '{prompt}'")
     
+    audio_loop = loop_for(sid)
     if not audio_loop or not audio_loop.web_agent:
-        await sio.emit('error', {'msg': "Web Agent not available"})
+        await sio.emit('error', {'msg': "Web Agent not available"}, room=sid)
         return
 
     try:
-        await sio.emit('status', {'msg': 'Web Agent running...'})
+        await sio.emit('status', {'msg': 'Web Agent running...'}, room=sid)
 
         async def update_frontend(image_b64, log_text):
             await sio.emit('browser_frame', {'image': image_b64, 'log': log_text}, to=sid)
 
         await audio_loop.web_agent.run_task(prompt, update_callback=update_frontend)
 
-        await sio.emit('status', {'msg': 'Web Agent finished'})
+        await sio.emit('status', {'msg': 'Web Agent finished'}, room=sid)
         
     except Exception as e:
         print(f"Error running Web Agent: {e}")
-        await sio.emit('error', {'msg': f"Web Agent Error: {str(e)}"})
+        await sio.emit('error', {'msg': f"Web Agent Error: {str(e)}"}, room=sid)
 
 @sio.event
 async def discover_printers(sid):
     print("Received discover_printers request")
     
-    # If audio_loop isn't ready yet, return saved printers from settings
-    if not audio_loop or not audio_loop.printer_agent:
-        saved_printers = SETTINGS.get("printers", [])
-        if saved_printers:
-            # Convert saved printers to the expected format
-            printer_list = []
-            for p in saved_printers:
-                printer_list.append({
-                    "name": p.get("name", p["host"]),
-                    "host": p["host"],
-                    "port": p.get("port", 80),
-                    "printer_type": p.get("type", "unknown"),
-                    "camera_url": p.get("camera_url")
-                })
-            print(f"[SERVER] Returning {len(printer_list)} saved printers (audio_loop not ready)")
-            await sio.emit('printer_list', printer_list)
-            return
-        else:
-            await sio.emit('printer_list', [])
-            await sio.emit('status', {'msg': "Connect to Jarvis to enable printer discovery"})
-            return
-        
+    # The printer agent is shared and always available (saved printers are loaded at startup)
     try:
-        printers = await audio_loop.printer_agent.discover_printers()
-        await sio.emit('printer_list', printers)
-        await sio.emit('status', {'msg': f"Found {len(printers)} printers"})
+        printers = await printer_agent.discover_printers()
+        event_bus.publish('printer_list', printers)
+        await sio.emit('status', {'msg': f"Found {len(printers)} printers"}, room=sid)
     except Exception as e:
         print(f"Error discovering printers: {e}")
-        await sio.emit('error', {'msg': f"Printer Discovery Failed: {str(e)}"})
+        await sio.emit('error', {'msg': f"Printer Discovery Failed: {str(e)}"}, room=sid)
 
 @sio.event
 async def add_printer(sid, data):
@@ -744,15 +957,11 @@ async def add_printer(sid, data):
         port = 80
     
     print(f"Received add_printer request: {host}:{port} ({ptype})")
-    
-    if not audio_loop or not audio_loop.printer_agent:
-        await sio.emit('error', {'msg': "Printer Agent not available"})
-        return
         
     try:
         # Add manually
         camera_url = data.get('camera_url')
-        printer = audio_loop.printer_agent.add_printer_manually(name, host, port=port, printer_type=ptype, camera_url=camera_url)
+        printer = printer_agent.add_printer_manually(name, host, port=port, printer_type=ptype, camera_url=camera_url)
         
         # Save to settings
         new_printer_config = {
@@ -771,10 +980,7 @@ async def add_printer(sid, data):
                 break
         
         if not exists:
-            if "printers" not in SETTINGS:
-                SETTINGS["printers"] = []
-            SETTINGS["printers"].append(new_printer_config)
-            save_settings()
+            settings.update({"printers": SETTINGS.get("printers", []) + [new_printer_config]})
             print(f"[SERVER] Saved printer {name} to settings.")
         
         # Probe to confirm/correct type
@@ -784,7 +990,7 @@ async def add_printer(sid, data):
         
         actual_type = "unknown"
         for port in ports_to_try:
-             found_type = await audio_loop.printer_agent._probe_printer_type(host, port)
+             found_type = await printer_agent._probe_printer_type(host, port)
              if found_type.value != "unknown":
                  actual_type = found_type
                  # Update port if different
@@ -797,22 +1003,26 @@ async def add_printer(sid, data):
              print(f"Corrected type to {actual_type.value} on port {printer.port}")
              
         # Refresh list for everyone
-        printers = [p.to_dict() for p in audio_loop.printer_agent.printers.values()]
-        await sio.emit('printer_list', printers)
-        await sio.emit('status', {'msg': f"Added printer: {name}"})
+        printers = [p.to_dict() for p in printer_agent.printers.values()]
+        event_bus.publish('printer_list', printers)
+        await sio.emit('status', {'msg': f"Added printer: {name}"}, room=sid)
         
     except Exception as e:
         print(f"Error adding printer: {e}")
-        await sio.emit('error', {'msg': f"Failed to add printer: {str(e)}"})
+        await sio.emit('error', {'msg': f"Failed to add printer: {str(e)}"}, room=sid)
 
 @sio.event
 async def print_stl(sid, data):
     print(f"Received print_stl request: {data}")
     # data: { stl_path: "path/to.stl" | "current", printer: "name_or_ip", profile: "optional" }
-    
-    if not audio_loop or not audio_loop.printer_agent:
-        await sio.emit('error', {'msg': "Printer Agent not available"})
-        return
+    session = sessions.for_client(sid)
+    audio_loop = session.loop if session else None
+    # Preview, progress and result go to the session's clients (just the requester without one)
+    if session:
+        publish = publish_to_session(session.id, sid)
+    else:
+        def publish(event, data):
+            event_bus.publish(event, data, to=sid)
         
     try:
         stl_path = data.get('stl_path', 'current')
@@ -820,10 +1030,10 @@ async def print_stl(sid, data):
         profile = data.get('profile')
         
         if not printer_name:
-             await sio.emit('error', {'msg': "No printer specified"})
+             event_bus.publish('error', {'msg': "No printer specified"}, to=sid)
              return
              
-        await sio.emit('status', {'msg': f"Preparing print for {printer_name}..."})
+        publish('status', {'msg': f"Preparing print for {printer_name}..."})
         
         # Get current project path for resolution
         current_project_path = None
@@ -832,37 +1042,28 @@ async def print_stl(sid, data):
             print(f"[SERVER DEBUG] Using project path: {current_project_path}")
 
         # Resolve STL path before slicing so we can preview it
-        resolved_stl = audio_loop.printer_agent._resolve_file_path(stl_path, current_project_path)
+        resolved_stl = printer_agent._resolve_file_path(stl_path, current_project_path)
         
         if resolved_stl and os.path.exists(resolved_stl):
             # Open the STL in the CAD module for preview
             try:
-                import base64
-                with open(resolved_stl, 'rb') as f:
-                    stl_data = f.read()
-                stl_b64 = base64.b64encode(stl_data).decode('utf-8')
-                stl_filename = os.path.basename(resolved_stl)
-                
-                print(f"[SERVER] Opening STL in CAD module: {stl_filename}")
-                await sio.emit('cad_data', {
-                    'format': 'stl',
-                    'data': stl_b64,
-                    'filename': stl_filename
-                })
+                artifact = await artifacts.add(resolved_stl)
+                print(f"[SERVER] Opening STL in CAD module: {artifact.name}")
+                publish('cad_data', artifact.to_payload())
             except Exception as e:
                 print(f"[SERVER] Warning: Could not preview STL: {e}")
         
         # Progress Callback
         async def on_slicing_progress(percent, message):
-            await sio.emit('slicing_progress', {
+            publish('slicing_progress', {
                 'printer': printer_name,
                 'percent': percent,
                 'message': message
             })
             if percent < 100:
-                 await sio.emit('status', {'msg': f"Slicing: {percent}%"})
+                 publish('status', {'msg': f"Slicing: {percent}%"})
 
-        result = await audio_loop.printer_agent.print_stl(
+        result = await printer_agent.print_stl(
             stl_path, 
             printer_name, 
             profile,
@@ -870,27 +1071,24 @@ async def print_stl(sid, data):
             root_path=current_project_path
         )
         
-        await sio.emit('print_result', result)
-        await sio.emit('status', {'msg': f"Print Job: {result.get('status', 'unknown')}"})
+        publish('print_result', result)
+        publish('status', {'msg': f"Print Job: {result.get('status', 'unknown')}"})
         
     except Exception as e:
         print(f"Error printing STL: {e}")
-        await sio.emit('error', {'msg': f"Print Failed: {str(e)}"})
+        publish('error', {'msg': f"Print Failed: {str(e)}"})
 
 @sio.event
 async def get_slicer_profiles(sid):
     """Get available OrcaSlicer profiles for manual selection."""
     print("Received get_slicer_profiles request")
-    if not audio_loop or not audio_loop.printer_agent:
-        await sio.emit('error', {'msg': "Printer Agent not available"})
-        return
     
     try:
-        profiles = audio_loop.printer_agent.get_available_profiles()
-        await sio.emit('slicer_profiles', profiles)
+        profiles = printer_agent.get_available_profiles()
+        await sio.emit('slicer_profiles', profiles, room=sid)
     except Exception as e:
         print(f"Error getting slicer profiles: {e}")
-        await sio.emit('error', {'msg': f"Failed to get profiles: {str(e)}"})
+        await sio.emit('error', {'msg': f"Failed to get profiles: {str(e)}"}, room=sid)
 
 @sio.event
 async def control_kasa(sid, data):
@@ -916,36 +1114,35 @@ async def control_kasa(sid, data):
             success = await kasa_agent.set_color(ip, (h, s, v))
         
         if success:
-            await sio.emit('kasa_update', {
+            event_bus.publish('kasa_update', {
                 'ip': ip,
                 'is_on': True if action == "on" else (False if action == "off" else None),
                 'brightness': data.get('value') if action == "brightness" else None,
             })
  
         else:
-             await sio.emit('error', {'msg': f"Failed to control device {ip}"})
+             await sio.emit('error', {'msg': f"Failed to control device {ip}"}, room=sid)
 
     except Exception as e:
          print(f"Error controlling kasa: {e}")
-         await sio.emit('error', {'msg': f"Kasa Control Error: {str(e)}"})
+         await sio.emit('error', {'msg': f"Kasa Control Error: {str(e)}"}, room=sid)
 
 @sio.event
 async def get_settings(sid):
-    await sio.emit('settings', SETTINGS)
+    await sio.emit('settings', SETTINGS, room=sid)
 
 @sio.event
 async def update_settings(sid, data):
     # Generic update
     print(f"Updating settings: {data}")
     
-    # Handle specific keys if needed
-    if "tool_permissions" in data:
-        SETTINGS["tool_permissions"].update(data["tool_permissions"])
-        if audio_loop:
-            audio_loop.update_permissions(SETTINGS["tool_permissions"])
+    # Handle specific keys if needed (running components follow via settings subscribers)
+    changes = {}
+    if isinstance(data.get("tool_permissions"), dict):
+        changes["tool_permissions"] = data["tool_permissions"]
             
     if "face_auth_enabled" in data:
-        SETTINGS["face_auth_enabled"] = data["face_auth_enabled"]
+        changes["face_auth_enabled"] = data["face_auth_enabled"]
         # If turned OFF, maybe emit auth status true?
         if not data["face_auth_enabled"]:
              await sio.emit('auth_status', {'authenticated': True})
@@ -954,27 +1151,80 @@ async def update_settings(sid, data):
                  authenticator.stop() 
 
     if "camera_flipped" in data:
-        SETTINGS["camera_flipped"] = data["camera_flipped"]
+        changes["camera_flipped"] = data["camera_flipped"]
         print(f"[SERVER] Camera flip set to: {data['camera_flipped']}")
 
-    save_settings()
+    # Audio engine modes take effect the next time the audio loop is started
+    for mode_key in ("mic_capture_mode", "playback_mode"):
+        if data.get(mode_key) in ("blocking", "callback"):
+            changes[mode_key] = data[mode_key]
+            print(f"[SERVER] {mode_key} set to: {data[mode_key]}")
+
+    # Visualizer fan-out mode can be switched on a running loop
+    if data.get("audio_fanout_mode") in FANOUT_MODES:
+        changes["audio_fanout_mode"] = data["audio_fanout_mode"]
+
+    # Webcam upload rate the frontend is asked for; applies to a running loop immediately
+    if "frontend_video_fps" in data:
+        try:
+            fps = max(0.0, float(data["frontend_video_fps"]))
+        except (TypeError, ValueError):
+            fps = None
+        if fps is not None:
+            changes["frontend_video_fps"] = fps
+
+    # Concurrent session limit (admission control for start_audio)
+    if "max_sessions" in data:
+        try:
+            changes["max_sessions"] = max(1, int(data["max_sessions"]))
+        except (TypeError, ValueError):
+            pass
+
+    changed = settings.update(changes)
+    if "frontend_video_fps" in changed:
+        await emit_video_config()
     # Broadcast new full settings
     await sio.emit('settings', SETTINGS)
 
 
+# Settings that apply to running components as soon as they change
+def apply_tool_permissions(changes):
+    # Session overrides stay on top of the global permissions
+    for session in sessions:
+        session.loop.update_permissions({**changes["tool_permissions"], **session.permissions})
+
+def apply_audio_fanout_mode(changes):
+    # Visualizer fan-out mode can be switched on a running loop
+    mode = changes["audio_fanout_mode"]
+    for session in sessions:
+        if session.fanout:
+            session.fanout.mode = mode
+    event_bus.register('audio_data', audio_data_policy(mode))
+
+def apply_frontend_video_fps(changes):
+    # Webcam upload rate the frontend is asked for; applies to a running loop immediately
+    for session in sessions:
+        session.loop.frame_ingest.target_fps = changes["frontend_video_fps"]
+
+def apply_max_sessions(changes):
+    # Running sessions are never evicted; a lower limit only affects new starts
+    sessions.max_sessions = changes["max_sessions"]
+
+settings.subscribe(apply_tool_permissions, keys=("tool_permissions",))
+settings.subscribe(apply_audio_fanout_mode, keys=("audio_fanout_mode",))
+settings.subscribe(apply_frontend_video_fps, keys=("frontend_video_fps",))
+settings.subscribe(apply_max_sessions, keys=("max_sessions",))
+
+
 # Deprecated/Mapped for compatibility if frontend still uses specific events
 @sio.event
 async def get_tool_permissions(sid):
-    await sio.emit('tool_permissions', SETTINGS["tool_permissions"])
+    await sio.emit('tool_permissions', SETTINGS["tool_permissions"], room=sid)
 
 @sio.event
 async def update_tool_permissions(sid, data):
     print(f"Updating permissions (legacy event): {data}")
-    SETTINGS["tool_permissions"].update(data)
-    save_settings()
-    
-    if audio_loop:
-        audio_loop.update_permissions(SETTINGS["tool_permissions"])
+    settings.update({"tool_permissions": data})
     # Broadcast update to all
     await sio.emit('tool_permissions', SETTINGS["tool_permissions"])
 
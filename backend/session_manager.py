@@ -0,0 +1,218 @@
+"""
+Concurrent AudioLoop sessions keyed by session id.
+
+The server used to hold one global audio_loop and refused a second
+start_audio. Each session now has its own AudioLoop (Live connection, tool
+registry, job supervisor, confirmations, project view, permission overrides)
+while process-wide resources are shared: the genai client, PrinterAgent,
+KasaAgent and the thread pools in executors (CAD builds included).
+
+Admission control: at most `max_sessions` sessions run at once, and the
+machine's mic/speaker can only belong to one of them; further sessions must
+start without local audio (their model audio still reaches their clients).
+A rejected start raises SessionLimitError with the reason for the client.
+
+Socket.IO clients attach to a session; a client that hasn't attached to one
+follows the primary session (the one owning local audio, else the oldest),
+which keeps the single-window desktop app working as before.
+"""
+
+import asyncio
+import time
+
+
+class SessionLimitError(Exception):
+    """A session could not be admitted."""
+
+
+class Session:
+    def __init__(self, session_id, loop, audio_io=True, fanout=None, permissions=None):
+        self.id = session_id
+        self.loop = loop
+        self.audio_io = audio_io
+        self.fanout = fanout
+        self.permissions = dict(permissions or {}) # Confirmation-only (True) overrides on top of the global tool permissions
+        self.clients = set()
+        self.created = time.monotonic()
+        self.task = None
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+    def usage(self) -> dict:
+        """Per-session resource accounting."""
+        usage = {
+            "uptime_s": round(time.monotonic() - self.created, 1),
+            "clients": len(self.clients),
+            "audio_io": self.audio_io,
+            "running": self.running,
+        }
+        if hasattr(self.loop, "get_usage"):
+            usage.update(self.loop.get_usage())
+        if self.fanout is not None:
+            fanout = self.fanout.stats()
+            usage["model_audio_bytes"] = fanout["bytes_in"]
+            usage["audio_bytes_emitted"] = fanout["bytes_out"]
+        return usage
+
+
+class SessionManager:
+    def __init__(self, max_sessions=4, on_change=None):
+        """
+        :param max_sessions: Sessions allowed to run at the same time.
+        :param on_change: Callback() when a session starts or ends.
+        """
+        self.max_sessions = max_sessions
+        self.on_change = on_change
+        self._sessions = {}
+        self._client_session = {} # sid -> session id
+        self.audio_owner = None
+
+        self.admitted = 0
+        self.rejected = 0
+        self.crashed = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, session_id):
+        return session_id in self._sessions
+
+    def __iter__(self):
+        return iter(list(self._sessions.values()))
+
+    def get(self, session_id):
+        return self._sessions.get(session_id)
+
+    @property
+    def primary(self):
+        """The session unattached clients follow: the local-audio owner, else the oldest."""
+        if self.audio_owner in self._sessions:
+            return self._sessions[self.audio_owner]
+        return min(self._sessions.values(), key=lambda s: s.created, default=None)
+
+    def admit(self, session_id, audio_io=True):
+        """
+        Admission check: None if the session may start, else the reason it
+        can't (counted as a rejection). Check before building an AudioLoop.
+        """
+        reason = None
+        if session_id in self._sessions:
+            reason = f"Session '{session_id}' is already running"
+        elif len(self._sessions) >= self.max_sessions:
+            reason = f"Session limit reached ({self.max_sessions} running)"
+        elif audio_io and self.audio_owner is not None:
+            reason = f"Local audio is in use by session '{self.audio_owner}'; start without audio"
+        if reason:
+            self.rejected += 1
+            print(f"[Sessions] Rejected session '{session_id}': {reason}")
+        return reason
+
+    def start(self, session_id, loop, audio_io=True, fanout=None, permissions=None) -> Session:
+        """Admit and run `loop.run()` as session `session_id`. Raises SessionLimitError."""
+        reason = self.admit(session_id, audio_io)
+        if reason:
+            raise SessionLimitError(reason)
+        session = Session(session_id, loop, audio_io, fanout, permissions)
+        self._sessions[session_id] = session
+        if audio_io:
+            self.audio_owner = session_id
+        self.admitted += 1
+        session.task = asyncio.create_task(loop.run(), name=f"session-{session_id}")
+        session.task.add_done_callback(lambda task: self._finished(session, task))
+        print(f"[Sessions] Started session '{session_id}' ({len(self._sessions)}/{self.max_sessions}, audio={audio_io})")
+        self._changed()
+        return session
+
+    def _finished(self, session, task):
+        if task.cancelled():
+            print(f"[Sessions] Session '{session.id}' cancelled")
+        elif task.exception() is not None:
+            self.crashed += 1
+            print(f"[Sessions] Session '{session.id}' crashed: {task.exception()}")
+        else:
+            print(f"[Sessions] Session '{session.id}' finished")
+        self._remove(session)
+
+    def _remove(self, session):
+        if self._sessions.get(session.id) is not session:
+            return
+        del self._sessions[session.id]
+        if self.audio_owner == session.id:
+            self.audio_owner = None
+        for sid in session.clients:
+            self._client_session.pop(sid, None)
+        if session.fanout is not None:
+            session.fanout.close()
+        self._changed()
+
+    def stop(self, session_id):
+        """Ask a session to stop; it is released straight away. Returns the Session or None."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        session.loop.stop()
+        self._remove(session)
+        return session
+
+    async def stop_all(self, timeout=5.0):
+        """Stop every session and wait (up to `timeout`) for their loops to unwind."""
+        sessions = list(self._sessions.values())
+        for session in sessions:
+            self.stop(session.id)
+        tasks = [s.task for s in sessions if s.task is not None and not s.task.done()]
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+
+    def attach(self, sid, session_id):
+        """Route a client's requests and the session's events to each other."""
+        self.detach(sid)
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        session.clients.add(sid)
+        self._client_session[sid] = session_id
+        return session
+
+    def detach(self, sid):
+        """Forget a client (e.g. on disconnect). Returns the session it was attached to, if any."""
+        session = self._sessions.get(self._client_session.pop(sid, None))
+        if session is not None:
+            session.clients.discard(sid)
+        return session
+
+    def session_of(self, sid):
+        """The session a client attached to (None if it follows the primary)."""
+        return self._sessions.get(self._client_session.get(sid))
+
+    def for_client(self, sid):
+        """The session a client's requests go to: its own, else the primary one."""
+        return self.session_of(sid) or self.primary
+
+    def audience(self, session, clients):
+        """Which of the connected `clients` receive `session`'s events."""
+        if session is self.primary:
+            return [sid for sid in clients if self._client_session.get(sid) in (None, session.id)]
+        return [sid for sid in clients if sid in session.clients]
+
+    def _changed(self):
+        if self.on_change:
+            try:
+                self.on_change()
+            except Exception as e:
+                print(f"[Sessions] Change callback failed: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "max_sessions": self.max_sessions,
+            "running": len(self._sessions),
+            "audio_owner": self.audio_owner,
+            "primary": self.primary.id if self.primary else None,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "crashed": self.crashed,
+            "sessions": {s.id: s.usage() for s in self._sessions.values()},
+        }
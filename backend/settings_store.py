@@ -0,0 +1,213 @@
+"""
+In-memory settings with debounced, atomic write-behind to settings.json.
+
+save_settings() used to rewrite settings.json (indent=4) on the event loop
+after every change, so dragging a slider in the settings window meant dozens
+of synchronous rewrites a second. The store keeps the authoritative copy in
+memory (`data`); update() applies a change, bumps `version` and notifies
+subscribers straight away, and the file is written at most once per
+`debounce` seconds from a worker thread.
+
+Writes go to a temp file in the same directory which is fsynced and then
+renamed over settings.json, so a crash mid-write leaves the previous file
+intact. Each write carries the version it was serialized at and a write of
+an older version than the one already on disk is skipped. The temp file is
+created like open() would (0666 minus the umask) and gets settings.json's
+permissions before the rename when that file already exists.
+A failed write leaves the store dirty and is retried, backing off from
+`debounce` up to RETRY_MAX seconds; without an event loop the next update
+or flush retries it.
+"""
+
+import asyncio
+import copy
+import json
+import os
+import secrets
+import stat
+import threading
+import time
+
+from executors import TOOLS, run_in
+
+RETRY_MAX = 30.0 # Longest wait (seconds) before retrying a failed write
+
+
+def _create_temp(directory):
+    """Create a new temp file next to settings.json. Returns (fd, path)."""
+    while True:
+        path = os.path.join(directory, f".settings-{secrets.token_hex(8)}.tmp")
+        try:
+            # Explicit 0666 so the umask applies as for open() (mkstemp would make it 0600)
+            return os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666), path
+        except FileExistsError:
+            continue
+
+
+def _merge(old, new):
+    """Dict settings (e.g. tool_permissions) are merged key by key, everything else replaced."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        return {**old, **new}
+    return new
+
+
+class SettingsStore:
+    def __init__(self, path, defaults, debounce=0.5):
+        """
+        :param path: JSON file the settings are persisted to.
+        :param defaults: Settings used for keys missing from the file (deep-copied).
+        :param debounce: Max seconds between a change and its write; changes within it share one write.
+        """
+        self.path = os.path.abspath(path)
+        self.debounce = debounce
+        self.data = copy.deepcopy(defaults)
+        self.version = 0
+        self.saved_version = 0
+        self._subscribers = []
+        self._timer = None
+        self._write_lock = threading.Lock()
+        self._tasks = set()
+        self._failed_writes = 0 # Consecutive, for the retry backoff
+
+        self.updates = 0
+        self.writes = 0
+        self.write_errors = 0
+        self.last_write_ms = None
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def load(self):
+        """Merge settings.json over the defaults (missing or unreadable file = defaults)."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                loaded = json.load(f)
+            for key, value in loaded.items():
+                self.data[key] = _merge(self.data.get(key), value)
+            print(f"Loaded settings: {self.data}")
+        except Exception as e:
+            print(f"Error loading settings: {e}")
+
+    def subscribe(self, callback, keys=None):
+        """
+        Call `callback(changes)` after every update that changes any of `keys`
+        (None = any key). `changes` is {key: new value} for the changed keys.
+        """
+        self._subscribers.append((callback, set(keys) if keys is not None else None))
+
+    def update(self, changes) -> dict:
+        """Apply {key: value} changes. Returns the keys that actually changed (with their new values)."""
+        changed = {}
+        for key, value in changes.items():
+            merged = _merge(self.data.get(key), value)
+            if key not in self.data or self.data[key] != merged:
+                self.data[key] = merged
+                changed[key] = merged
+        if not changed:
+            return changed
+        self.version += 1
+        self.updates += 1
+        for callback, keys in self._subscribers:
+            if keys is None or keys.intersection(changed):
+                try:
+                    callback(changed)
+                except Exception as e:
+                    print(f"[Settings] Subscriber failed: {e}")
+        self._schedule_save()
+        return changed
+
+    def _schedule_save(self, delay=None):
+        if self._timer is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (scripts / shutdown): write now
+            self.flush_sync()
+            return
+        self._timer = loop.call_later(self.debounce if delay is None else delay, self._start_flush)
+
+    def _start_flush(self):
+        self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _snapshot(self):
+        return json.dumps(self.data, indent=4), self.version
+
+    async def flush(self):
+        """Write the current settings now (off the event loop)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.saved_version == self.version:
+            return
+        text, version = self._snapshot()
+        if not await run_in(TOOLS, self._write, text, version):
+            # Still dirty: try again later instead of waiting for the next change
+            delay = min(max(self.debounce, 0.1) * 2 ** (self._failed_writes - 1), RETRY_MAX)
+            print(f"[Settings] Retrying save in {delay:.1f}s")
+            self._schedule_save(delay)
+
+    def flush_sync(self):
+        """Write the current settings now on the calling thread (signal handlers, shutdown)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.saved_version == self.version:
+            return
+        self._write(*self._snapshot())
+
+    def _write(self, text, version) -> bool:
+        """Write `text` (serialized at `version`) atomically. False if the write failed."""
+        with self._write_lock:
+            if version <= self.saved_version:
+                return True
+            start = time.perf_counter()
+            directory = os.path.dirname(self.path)
+            try:
+                fd, tmp_path = _create_temp(directory)
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        f.write(text)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    if os.path.exists(self.path):
+                        os.chmod(tmp_path, stat.S_IMODE(os.stat(self.path).st_mode))
+                    os.replace(tmp_path, self.path)
+                except BaseException:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                    raise
+            except Exception as e:
+                self.write_errors += 1
+                self._failed_writes += 1
+                print(f"Error saving settings: {e}")
+                return False
+            self.saved_version = version
+            self._failed_writes = 0
+            self.writes += 1
+            self.last_write_ms = round((time.perf_counter() - start) * 1000.0, 2)
+            print(f"Settings saved (v{version}).")
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "saved_version": self.saved_version,
+            "dirty": self.saved_version != self.version,
+            "debounce_ms": round(self.debounce * 1000, 1),
+            "updates": self.updates,
+            "writes": self.writes,
+            "write_errors": self.write_errors,
+            "last_write_ms": self.last_write_ms,
+        }
@@ -0,0 +1,118 @@
+"""
+Silence gate for upstream microphone audio.
+
+While the user is quiet for longer than `silence_window` seconds the gate
+stops forwarding PCM to the Live API. Chunks seen while gated go into a short
+pre-roll ring; when the VAD reports speech again the ring is flushed ahead of
+the live chunk so the start of the utterance is not clipped. A small block of
+digital silence is sent every `keepalive_interval` seconds while gated so the
+session never looks idle.
+"""
+
+import math
+import time
+from collections import deque
+from typing import List, Optional
+
+
+class SilenceGate:
+    def __init__(self, silence_window=3.0, pre_roll=0.5, keepalive_interval=5.0,
+                 sample_rate=16000, sample_width=2, chunk_size=1024, keepalive_ms=20):
+        """
+        :param silence_window: Seconds of silence after speech before forwarding stops.
+                               Keep this above the server's own end-of-turn detection.
+        :param pre_roll: Seconds of gated audio replayed when speech resumes.
+        :param keepalive_interval: Seconds between keepalive frames while gated (0 disables).
+        """
+        self.silence_window = silence_window
+        self.keepalive_interval = keepalive_interval
+        self.keepalive_frame = b"\x00" * int(sample_rate * sample_width * keepalive_ms / 1000)
+
+        chunk_seconds = chunk_size / float(sample_rate)
+        self._pre_roll = deque(maxlen=max(1, math.ceil(pre_roll / chunk_seconds)))
+
+        self.reset()
+
+    def reset(self):
+        """Start of a new Live session: reopen the gate and zero the per-session counters."""
+        self.is_open = True
+        self._last_voice_time = None
+        self._last_keepalive_time = None
+        self._pre_roll.clear()
+        self.bytes_captured = 0
+        self.bytes_forwarded = 0
+        self.bytes_saved = 0
+        self.pre_roll_bytes = 0
+        self.keepalive_bytes = 0
+        self.keepalives_sent = 0
+        self.gate_closes = 0
+        self.gate_opens = 0
+
+    def process(self, data: bytes, is_speaking: bool, silence_start_time: Optional[float],
+                now: Optional[float] = None) -> List[bytes]:
+        """
+        Decide what to forward for one mic chunk.
+
+        `is_speaking` / `silence_start_time` are the VAD state after this chunk
+        (same clock as `now`). Returns the PCM blocks to send, possibly empty.
+        """
+        if now is None:
+            now = time.monotonic()
+        self.bytes_captured += len(data)
+
+        if is_speaking:
+            # During hangover the voice ended when silence started, not now
+            self._last_voice_time = silence_start_time if silence_start_time is not None else now
+        elif self._last_voice_time is None:
+            self._last_voice_time = now
+
+        if self.is_open:
+            if not is_speaking and now - self._last_voice_time > self.silence_window:
+                self.is_open = False
+                self.gate_closes += 1
+                self._last_keepalive_time = now
+                self._pre_roll.clear()
+                self._pre_roll.append(data)
+                self.bytes_saved += len(data)
+                return []
+            self.bytes_forwarded += len(data)
+            return [data]
+
+        if is_speaking:
+            self.is_open = True
+            self.gate_opens += 1
+            out = list(self._pre_roll)
+            self._pre_roll.clear()
+            replayed = sum(len(c) for c in out)
+            self.pre_roll_bytes += replayed
+            # Replayed chunks were counted as saved when they were gated
+            self.bytes_saved -= replayed
+            self.bytes_forwarded += replayed + len(data)
+            out.append(data)
+            return out
+
+        # Once the ring is full the oldest gated chunk falls out and is never sent
+        self._pre_roll.append(data)
+        self.bytes_saved += len(data)
+
+        if self.keepalive_interval and now - self._last_keepalive_time >= self.keepalive_interval:
+            self._last_keepalive_time = now
+            self.keepalives_sent += 1
+            self.keepalive_bytes += len(self.keepalive_frame)
+            return [self.keepalive_frame]
+        return []
+
+    def stats(self) -> dict:
+        saved_pct = round(100.0 * self.bytes_saved / self.bytes_captured, 1) if self.bytes_captured else 0.0
+        return {
+            "open": self.is_open,
+            "bytes_captured": self.bytes_captured,
+            "bytes_forwarded": self.bytes_forwarded,
+            "bytes_saved": self.bytes_saved,
+            "saved_percent": saved_pct,
+            "pre_roll_bytes": self.pre_roll_bytes,
+            "keepalives_sent": self.keepalives_sent,
+            "keepalive_bytes": self.keepalive_bytes,
+            "gate_closes": self.gate_closes,
+            "gate_opens": self.gate_opens,
+        }
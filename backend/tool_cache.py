@@ -0,0 +1,91 @@
+"""
+TTL + LRU cache for results of idempotent tools.
+
+Entries are keyed by tool name and a normalized form of the arguments (keys
+sorted, None values dropped, strings stripped, whitespace-collapsed and
+case-folded), so "Weather in  Paris" and "weather in paris" share an entry.
+Each tool chooses its own TTL when it stores a result; the least recently
+used entry is evicted once `max_entries` is reached. Tools with side effects
+invalidate the entries they make stale (see ToolSpec.invalidates).
+"""
+
+import json
+import time
+from collections import OrderedDict
+
+
+def normalize_args(args) -> str:
+    """Canonical JSON for a tool's arguments."""
+    def norm(value):
+        if isinstance(value, str):
+            return " ".join(value.split()).casefold()
+        if isinstance(value, dict):
+            return {str(k): norm(v) for k, v in value.items() if v is not None}
+        if isinstance(value, (list, tuple)):
+            return [norm(v) for v in value]
+        return value
+
+    return json.dumps(norm(dict(args or {})), sort_keys=True, default=str)
+
+
+class ToolCache:
+    def __init__(self, max_entries=256, clock=time.monotonic):
+        """
+        :param max_entries: Entries kept before the least recently used one is evicted.
+        :param clock: Time source (tests).
+        """
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = OrderedDict() # (name, args_key) -> (expires_at, value)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, name, args):
+        """(True, value) for a live entry, else (False, None)."""
+        key = (name, normalize_args(args))
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            del self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, name, args, value, ttl):
+        key = (name, normalize_args(args))
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *names) -> int:
+        """Drop every entry of the given tools; returns how many were removed."""
+        stale = [key for key in self._entries if key[0] in names]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
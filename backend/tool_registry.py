@@ -0,0 +1,212 @@
+"""
+Dispatch of Live API function calls.
+
+Each tool is registered once as a ToolSpec: its handler, whether it runs in
+the background (the model is answered right away with an acknowledgement and
+the handler keeps running) or in the foreground (the model waits for the
+handler's result), a timeout and a concurrency limit. dispatch() runs all
+function calls of one tool_call message concurrently and hands each response
+on as soon as it is ready, so one slow tool doesn't hold back the others.
+
+Idempotent tools can set `cache_ttl` to have their successful results served
+from a ToolCache for that long; tools with side effects list the tools whose
+cached results they make stale in `invalidates`. A handler that reports a
+failure as text returns it wrapped in ToolFailure, so the model still gets
+the message but it counts as an error and is never cached.
+"""
+
+import asyncio
+import contextlib
+import inspect
+import time
+
+from executors import TOOLS, run_in
+from latency_trace import LatencyHistogram
+
+
+def describe_args(args, limit=60) -> str:
+    """Short human-readable summary of a call's arguments (for job tables)."""
+    text = ", ".join(f"{k}={v}" for k, v in (args or {}).items() if isinstance(v, (str, int, float)))
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class ToolFailure(str):
+    """Result text describing a failure (e.g. "Web search not available."): sent as-is, never cached."""
+
+
+class ToolSpec:
+    def __init__(self, name, handler, background=False, ack=None, timeout=30.0, concurrency=None,
+                 cache_ttl=None, invalidates=()):
+        """
+        :param handler: callable(args) -> result text, or None for no function response.
+                        Plain (non-async) handlers run in a worker thread.
+        :param background: Start the handler as a task and answer right away with `ack`.
+        :param ack: Result sent for a background call (None = no function response).
+        :param timeout: Seconds before a call is abandoned and reported as timed out (None = no limit).
+        :param concurrency: Max simultaneous runs of this tool (None = unlimited); extra calls wait.
+        :param cache_ttl: Seconds a successful result may be reused for the same arguments (None = never cached).
+        :param invalidates: Tool names whose cached results are dropped after this tool succeeds.
+        """
+        self.name = name
+        self.handler = handler
+        self.background = background
+        self.ack = ack
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.cache_ttl = cache_ttl
+        self.invalidates = tuple(invalidates)
+        self._semaphore = asyncio.Semaphore(concurrency) if concurrency else None
+
+    def slot(self):
+        return self._semaphore if self._semaphore is not None else contextlib.nullcontext()
+
+
+class ToolStats:
+    """Per-tool counters plus run time and time spent waiting for a concurrency slot."""
+
+    def __init__(self, window=200):
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.denied = 0
+        self.cache_hits = 0
+        self.inflight = 0
+        self.latency = LatencyHistogram(window)
+        self.wait = LatencyHistogram(window)
+
+    def to_dict(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "denied": self.denied,
+            "cache_hits": self.cache_hits,
+            "inflight": self.inflight,
+            "latency_ms": self.latency.to_dict(),
+            "wait_ms": self.wait.to_dict(),
+        }
+
+
+class ToolRegistry:
+    def __init__(self, cache=None, supervisor=None):
+        """
+        :param cache: Optional ToolCache used by tools registered with a cache_ttl.
+        :param supervisor: Optional JobSupervisor that runs background tools as tracked jobs.
+        """
+        self.cache = cache
+        self.supervisor = supervisor
+        self._specs = {}
+        self._stats = {}
+        self._background = set()
+
+    def register(self, name, handler, **options) -> ToolSpec:
+        """Register (or replace) a tool; options are passed to ToolSpec."""
+        spec = ToolSpec(name, handler, **options)
+        self._specs[name] = spec
+        self._stats.setdefault(name, ToolStats())
+        return spec
+
+    def __contains__(self, name):
+        return name in self._specs
+
+    def get(self, name):
+        return self._specs.get(name)
+
+    @property
+    def names(self):
+        return list(self._specs)
+
+    def record_denied(self, name):
+        if name in self._stats:
+            self._stats[name].denied += 1
+
+    async def call(self, name, args):
+        """
+        Run one registered tool. Returns the result text for the model (the
+        ack for background tools), or None if no response should be sent.
+        Errors and timeouts are returned as result text rather than raised.
+        """
+        spec = self._specs[name]
+        if spec.cache_ttl and self.cache is not None:
+            hit, value = self.cache.get(name, args)
+            if hit:
+                self._stats[name].cache_hits += 1
+                print(f"[Jarvis DEBUG] [TOOL] '{name}' served from cache")
+                return value
+        if spec.background:
+            if self.supervisor is not None:
+                self.supervisor.submit(name, lambda: self._run(spec, args, background=True), label=describe_args(args))
+                return spec.ack
+            task = asyncio.create_task(self._run(spec, args))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+            return spec.ack
+        return await self._run(spec, args)
+
+    async def _invoke(self, spec, args):
+        if inspect.iscoroutinefunction(spec.handler):
+            return await spec.handler(args)
+        result = await run_in(TOOLS, spec.handler, args)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+
+    async def _run(self, spec, args, background=False):
+        stats = self._stats[spec.name]
+        queued = time.monotonic()
+        async with spec.slot():
+            start = time.monotonic()
+            stats.wait.add((start - queued) * 1000.0)
+            stats.inflight += 1
+            try:
+                result = await asyncio.wait_for(self._invoke(spec, args), spec.timeout)
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                print(f"[Jarvis DEBUG] [TOOL] '{spec.name}' timed out after {spec.timeout:g}s")
+                if background:
+                    raise
+                return f"The '{spec.name}' tool timed out after {spec.timeout:g} seconds."
+            except Exception as e:
+                stats.errors += 1
+                print(f"[Jarvis DEBUG] [ERR] Tool '{spec.name}' failed: {e}")
+                if background:
+                    # Let the supervisor record the job as failed
+                    raise
+                return f"The '{spec.name}' tool failed: {e}"
+            finally:
+                stats.inflight -= 1
+                stats.calls += 1
+                stats.latency.add((time.monotonic() - start) * 1000.0)
+                if self.cache is not None and spec.invalidates:
+                    # Even a failed call may have changed something
+                    self.cache.invalidate(*spec.invalidates)
+        if isinstance(result, ToolFailure):
+            stats.errors += 1
+            return result
+        # Errors and timeouts (returned above or as ToolFailure) are never cached
+        if self.cache is not None and spec.cache_ttl and result is not None:
+            self.cache.put(spec.name, args, result, spec.cache_ttl)
+        return result
+
+    async def dispatch(self, calls, execute, respond):
+        """
+        Run `execute(call)` for every call concurrently and `respond(result)`
+        for each non-None result as soon as that call finishes.
+        """
+        async def one(call):
+            result = await execute(call)
+            if result is not None:
+                await respond(result)
+
+        calls = list(calls)
+        results = await asyncio.gather(*(one(call) for call in calls), return_exceptions=True)
+        for call, result in zip(calls, results):
+            if isinstance(result, Exception):
+                print(f"[Jarvis DEBUG] [ERR] Tool call '{getattr(call, 'name', call)}' failed: {result}")
+
+    def stats(self) -> dict:
+        return {
+            "background_running": len(self._background),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "tools": {name: s.to_dict() for name, s in self._stats.items() if s.calls or s.denied or s.inflight},
+        }
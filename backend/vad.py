@@ -0,0 +1,128 @@
+"""
+Voice Activity Detection for the microphone path.
+
+Energy is computed with NumPy straight from the PCM buffer instead of
+struct.unpack + a per-sample Python loop. The speech threshold follows an
+adaptive noise floor rather than a fixed RMS constant, and the detector keeps
+hangover and pre-roll state so callers get clean utterance boundaries.
+"""
+
+import math
+import time
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+
+SPEECH_START = "speech_start"
+SPEECH_END = "speech_end"
+
+
+def pcm16_rms(data: bytes) -> float:
+    """RMS of a little-endian signed 16-bit PCM buffer (audioop.rms(data, 2) equivalent)."""
+    count = len(data) // 2
+    if count == 0:
+        return 0.0
+    samples = np.frombuffer(data, dtype="<i2", count=count).astype(np.float32)
+    return math.sqrt(float(np.dot(samples, samples)) / count)
+
+
+class VoiceActivityDetector:
+    """
+    Energy-based VAD with an adaptive noise floor.
+
+    Feed every mic chunk to process(); it returns SPEECH_START on the chunk
+    that opens an utterance, SPEECH_END once silence has lasted `hangover`
+    seconds, and None otherwise. The last `pre_roll` seconds of audio seen
+    before an onset are kept so onsets can be replayed without clipping.
+    """
+
+    def __init__(self, sample_rate=16000, chunk_size=1024, hangover=0.5, pre_roll=0.3,
+                 noise_multiplier=3.0, min_threshold=300.0, max_threshold=4000.0,
+                 initial_noise_floor=150.0, noise_window=2.0, floor_rise_rate=0.05,
+                 floor_fall_rate=0.5, onset_chunks=1):
+        """
+        :param hangover: Seconds of continuous silence before speech is considered over.
+        :param pre_roll: Seconds of audio retained before the onset chunk.
+        :param noise_multiplier: Threshold = noise floor * multiplier (clamped to min/max).
+        :param noise_window: Seconds of history for the minimum-statistics noise estimate.
+        :param floor_rise_rate: EMA rate when the floor moves up.
+        :param floor_fall_rate: EMA rate when the floor moves down.
+        :param onset_chunks: Consecutive loud chunks needed to declare speech.
+        """
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.hangover = hangover
+        self.noise_multiplier = noise_multiplier
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.floor_rise_rate = floor_rise_rate
+        self.floor_fall_rate = floor_fall_rate
+        self.onset_chunks = max(1, onset_chunks)
+
+        self.noise_floor = float(initial_noise_floor)
+        self.last_rms = 0.0
+        self.is_speaking = False
+        self.silence_start_time = None
+        self._loud_run = 0
+
+        chunk_seconds = chunk_size / float(sample_rate)
+        self._recent_rms = deque(maxlen=max(1, math.ceil(noise_window / chunk_seconds)))
+        self._pre_roll = deque(maxlen=max(1, math.ceil(pre_roll / chunk_seconds)))
+
+    @property
+    def threshold(self) -> float:
+        return min(self.max_threshold, max(self.min_threshold, self.noise_floor * self.noise_multiplier))
+
+    def _update_noise_floor(self, rms):
+        # Minimum statistics: the quietest chunk in the window approximates the
+        # background, even while someone is talking (speech has gaps).
+        self._recent_rms.append(rms)
+        target = min(self._recent_rms)
+        rate = self.floor_fall_rate if target < self.noise_floor else self.floor_rise_rate
+        self.noise_floor += rate * (target - self.noise_floor)
+
+    def process(self, data: bytes, now: Optional[float] = None) -> Optional[str]:
+        """Classify one PCM chunk and return SPEECH_START, SPEECH_END or None."""
+        if now is None:
+            now = time.monotonic()
+
+        rms = pcm16_rms(data)
+        self.last_rms = rms
+        is_loud = rms > self.threshold
+        self._update_noise_floor(rms)
+        event = None
+
+        if is_loud:
+            self.silence_start_time = None
+            self._loud_run += 1
+            if not self.is_speaking and self._loud_run >= self.onset_chunks:
+                self.is_speaking = True
+                event = SPEECH_START
+        else:
+            self._loud_run = 0
+            if self.is_speaking:
+                if self.silence_start_time is None:
+                    self.silence_start_time = now
+                elif now - self.silence_start_time > self.hangover:
+                    self.is_speaking = False
+                    self.silence_start_time = None
+                    event = SPEECH_END
+
+        if not self.is_speaking or event == SPEECH_START:
+            self._pre_roll.append(data)
+        return event
+
+    def pre_roll_chunks(self) -> List[bytes]:
+        """Audio captured up to and including the most recent onset chunk."""
+        return list(self._pre_roll)
+
+    def clear_pre_roll(self):
+        self._pre_roll.clear()
+
+    def reset(self):
+        """Forget utterance state (e.g. when the mic is paused); the noise floor is kept."""
+        self.is_speaking = False
+        self.silence_start_time = None
+        self._loud_run = 0
+        self._pre_roll.clear()
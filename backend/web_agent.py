@@ -22,8 +22,8 @@ SCREEN_HEIGHT = 900
 MODEL_ID = "gemini-2.5-computer-use-preview-10-2025"
 
 class WebAgent:
-    def __init__(self):
-        self.client = genai.Client(api_key=API_KEY)
+    def __init__(self, client=None):
+        self.client = client or genai.Client(api_key=API_KEY)
         self.browser = None
         self.context = None
         self.page = None
@@ -0,0 +1,79 @@
+"""
+Benchmark: audio_data fan-out to the frontend, bytes/sec and emit CPU.
+
+Encodes the same stream of 24 kHz model audio the way each strategy would
+put it on the Socket.IO wire (python-socketio's own packet encoder):
+
+  - before:   one emit per chunk, {'data': list(chunk)} as a JSON int array
+  - binary:   chunks batched per interval, raw PCM as a binary attachment
+  - envelope: chunks batched per interval, 64 peak levels as an attachment
+
+Usage:
+    python benchmarks/bench_audio_fanout.py [--seconds 60] [--chunk-ms 20] [--interval-ms 50]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from socketio import packet
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from audio_fanout import pcm16_envelope
+
+RATE = 24000
+
+
+def wire_bytes(data):
+    encoded = packet.Packet(packet.EVENT, data=["audio_data", data], namespace="/").encode()
+    parts = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(p) for p in parts)
+
+
+def make_chunks(seconds, chunk_ms):
+    frames = int(RATE * chunk_ms / 1000)
+    rng = np.random.default_rng(0)
+    n = int(seconds * 1000 / chunk_ms)
+    return [rng.normal(0, 4000, frames).clip(-32768, 32767).astype("<i2").tobytes() for _ in range(n)]
+
+
+def batches(chunks, chunk_ms, interval_ms):
+    per_batch = max(1, int(round(interval_ms / chunk_ms)))
+    for i in range(0, len(chunks), per_batch):
+        yield b"".join(chunks[i:i + per_batch])
+
+
+def run(label, payloads, seconds):
+    start = time.process_time()
+    total = 0
+    emits = 0
+    for payload in payloads:
+        total += wire_bytes(payload())
+        emits += 1
+    cpu = time.process_time() - start
+    print(f"{label:<10} {emits / seconds:7.1f} emits/s  {total / seconds / 1024:9.1f} KiB/s  "
+          f"{cpu / seconds * 100:6.2f}% CPU ({cpu * 1000 / emits:.3f} ms/emit)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--chunk-ms", type=float, default=20.0)
+    parser.add_argument("--interval-ms", type=float, default=50.0)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.seconds, args.chunk_ms)
+    print(f"{args.seconds:.0f} s of {RATE} Hz audio in {args.chunk_ms:.0f} ms chunks "
+          f"(raw PCM {RATE * 2 / 1024:.1f} KiB/s)")
+
+    run("before", (lambda c=c: {"data": list(c)} for c in chunks), args.seconds)
+    run("binary", (lambda b=b, i=i: {"pcm": b, "rate": RATE, "seq": i}
+                   for i, b in enumerate(batches(chunks, args.chunk_ms, args.interval_ms))), args.seconds)
+    run("envelope", (lambda b=b, i=i: {"envelope": pcm16_envelope(b), "seq": i}
+                     for i, b in enumerate(batches(chunks, args.chunk_ms, args.interval_ms))), args.seconds)
+
+
+if __name__ == "__main__":
+    main()
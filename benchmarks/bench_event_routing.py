@@ -0,0 +1,108 @@
+"""
+Load test: outbound events to N clients, broadcast vs topic routing.
+
+Replays a session's worth of server events (multi-MB cad_data STLs, streaming
+transcription, Kasa and printer updates, status messages) through the
+EventBus to N fake clients. Every delivered event is encoded with
+python-socketio's own packet encoder, as the server does per client, and its
+size is counted as egress. CPU is the process time spent publishing, queueing
+and encoding.
+
+  - broadcast: every client gets every event (the old sio.emit behaviour)
+  - routed:    clients subscribe to the topics they display
+
+The client mix is one desktop window (all topics) plus dashboards that cycle
+through lights-only, printers-only and transcripts-only subscriptions.
+
+Usage:
+    python benchmarks/bench_event_routing.py [--clients 8] [--minutes 10] [--stl-mb 4] [--cad-every 60]
+"""
+import argparse
+import asyncio
+import base64
+import os
+import sys
+import time
+from pathlib import Path
+
+from socketio import packet
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from event_bus import EVENT_TOPICS, EventBus, merge_text
+
+DASHBOARDS = [{"kasa"}, {"printers"}, {"transcripts"}]
+
+
+def wire_bytes(event, data):
+    encoded = packet.Packet(packet.EVENT, data=[event, data], namespace="/").encode()
+    parts = encoded if isinstance(encoded, list) else [encoded]
+    return sum(len(p) for p in parts)
+
+
+def workload(minutes, stl_mb, cad_every):
+    """(second, event, data) for a session: one STL per `cad_every` s, speech, device and printer polls."""
+    stl = base64.b64encode(os.urandom(int(stl_mb * 1024 * 1024))).decode()
+    events = []
+    for second in range(int(minutes * 60)):
+        for i in range(10):
+            events.append((second, "transcription", {"sender": "Jarvis", "text": f"word{i} "}))
+        if second % 2 == 0:
+            events.append((second, "print_status_update", {"printer": "voron", "progress": second % 100, "state": "printing"}))
+        if second % 10 == 0:
+            events.append((second, "kasa_devices", [{"ip": f"10.0.0.{n}", "alias": f"Lamp {n}", "is_on": True} for n in range(6)]))
+            events.append((second, "status", {"msg": "Jarvis Started"}))
+        if second % cad_every == cad_every - 1:
+            events.append((second, "cad_status", {"status": "generating"}))
+            events.append((second, "cad_data", {"format": "stl", "data": stl}))
+    return events
+
+
+async def run(label, events, clients, routed):
+    egress = {}
+
+    async def emit(event, data, sid):
+        egress[sid] = egress.get(sid, 0) + wire_bytes(event, data)
+
+    bus = EventBus(emit, interval=0.001, max_queue=100000, routes=EVENT_TOPICS if routed else None)
+    bus.register("transcription", "coalesce", merge_text)
+    for n in range(clients):
+        bus.add_client(f"client{n}", None if n == 0 or not routed else DASHBOARDS[(n - 1) % len(DASHBOARDS)])
+
+    start = time.process_time()
+    last_second = 0
+    for second, event, data in events:
+        if second != last_second:
+            # Let the coalescing timer fire and the senders drain, as a second of real time would
+            await asyncio.sleep(0.002)
+            last_second = second
+        bus.publish(event, data)
+    while any(c["depth"] or c["pending_frame"] for c in bus.stats()["clients"].values()):
+        await asyncio.sleep(0.002)
+    cpu = time.process_time() - start
+    bus.close()
+
+    total = sum(egress.values())
+    desktop = egress.get("client0", 0)
+    print(f"{label:<10} {total / 1024 / 1024:9.1f} MiB egress  "
+          f"(desktop {desktop / 1024 / 1024:.1f} MiB, per dashboard {(total - desktop) / max(1, clients - 1) / 1024 / 1024:.1f} MiB)  "
+          f"{cpu:6.2f} s CPU")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--stl-mb", type=float, default=4.0)
+    parser.add_argument("--cad-every", type=int, default=60, help="Seconds between generated STLs")
+    args = parser.parse_args()
+
+    events = workload(args.minutes, args.stl_mb, args.cad_every)
+    print(f"{len(events)} events over {args.minutes:g} min to {args.clients} clients "
+          f"({args.stl_mb:g} MiB STL every {args.cad_every} s)")
+    await run("broadcast", events, args.clients, routed=False)
+    await run("routed", events, args.clients, routed=True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark: camera frame encoding CPU per minute, idle vs. speaking.
+
+before: get_frames encoded every frame (BGR->RGB, PIL thumbnail, PIL JPEG,
+        base64) once per second whether or not it was used.
+lazy:   only the latest raw frame is kept; it is encoded with cv2.resize +
+        cv2.imencode when a VAD onset or text input asks for a frame, at most
+        once per captured frame.
+
+Frame capture itself (cap.read) is the same in both and is not measured.
+
+Usage:
+    python benchmarks/bench_frame_encoding.py [--width 1280 --height 720] [--utterances 12] [--quality 80]
+"""
+import argparse
+import base64
+import io
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+import PIL.Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from frame_encoder import encode_frame_payload
+
+
+def make_frame(width, height, seed):
+    """Smooth gradient with sensor-like noise (closer to a webcam than pure noise)."""
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([(x + y) / 2, np.broadcast_to(x, (height, width)), np.broadcast_to(y, (height, width))], axis=-1)
+    noisy = base + rng.normal(0, 6, base.shape)
+    return np.clip(noisy, 0, 255).astype(np.uint8)
+
+
+def encode_pil(frame):
+    """The previous AudioLoop._get_frame path."""
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    img = PIL.Image.fromarray(frame_rgb)
+    img.thumbnail([1024, 1024])
+    image_io = io.BytesIO()
+    img.save(image_io, format="jpeg")
+    return {"mime_type": "image/jpeg", "data": base64.b64encode(image_io.getvalue()).decode()}
+
+
+def cpu_per_encode(fn, frames, repeat):
+    start = time.process_time()
+    for i in range(repeat):
+        fn(frames[i % len(frames)])
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--utterances", type=int, default=12, help="VAD onsets per minute while speaking")
+    parser.add_argument("--quality", type=int, default=80)
+    parser.add_argument("--repeat", type=int, default=100)
+    args = parser.parse_args()
+
+    frames = [make_frame(args.width, args.height, seed) for seed in range(4)]
+    pil_cost = cpu_per_encode(encode_pil, frames, args.repeat)
+    cv_cost = cpu_per_encode(lambda f: encode_frame_payload(f, 1024, args.quality), frames, args.repeat)
+
+    print(f"{args.width}x{args.height} frames, per encode: PIL {pil_cost * 1000:.2f} ms, "
+          f"cv2 (q={args.quality}) {cv_cost * 1000:.2f} ms")
+    print(f"{'scenario':<10} {'before':>18} {'lazy':>18}")
+    # before: one encode per second regardless of activity
+    before = 60 * pil_cost
+    for label, encodes in (("idle", 0), ("speaking", args.utterances)):
+        lazy = encodes * cv_cost
+        print(f"{label:<10} {before * 1000:12.1f} ms/min {lazy * 1000:12.1f} ms/min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark: per-chunk cost of native-rate capture + resampling.
+
+The previous path opened the mic at 16 kHz mono and only paid for the VAD
+energy step per chunk. The native path adds downmix + polyphase resampling
+of a ~64 ms chunk from the device rate. This prints both so the extra cost
+can be compared against the chunk's real-time budget.
+
+Usage:
+    python benchmarks/bench_resample.py [--chunks 2000]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from resampler import PolyphaseResampler
+from vad import VoiceActivityDetector
+
+OUT_RATE = 16000
+CHUNK_SIZE = 1024
+CHUNK_MS = CHUNK_SIZE / OUT_RATE * 1000
+
+
+def make_chunks(rate, channels, n):
+    frames = int(round(CHUNK_SIZE * rate / OUT_RATE))
+    rng = np.random.default_rng(0)
+    return [rng.normal(0, 2000, frames * channels).clip(-32768, 32767).astype("<i2").tobytes() for _ in range(n)]
+
+
+def bench(label, fn, chunks):
+    start = time.perf_counter()
+    for c in chunks:
+        fn(c)
+    per_chunk_us = (time.perf_counter() - start) / len(chunks) * 1e6
+    print(f"{label:<36} {per_chunk_us:9.1f} us/chunk   {per_chunk_us / (CHUNK_MS * 10):6.3f}% of real time")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=2000)
+    args = parser.parse_args()
+
+    vad = VoiceActivityDetector()
+    bench("current: 16 kHz mono, VAD only", vad.process, make_chunks(OUT_RATE, 1, args.chunks))
+
+    for rate, channels in [(48000, 2), (48000, 1), (44100, 2), (44100, 1)]:
+        resampler = PolyphaseResampler(rate, OUT_RATE, channels)
+        chunks = make_chunks(rate, channels, args.chunks)
+        bench(f"resample {rate} Hz x{channels}", resampler.process, chunks)
+        resampler.reset()
+        native_vad = VoiceActivityDetector()
+        bench(f"resample {rate} Hz x{channels} + VAD", lambda c: native_vad.process(resampler.process(c)), chunks)
+
+
+if __name__ == "__main__":
+    main()
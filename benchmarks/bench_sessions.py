@@ -0,0 +1,158 @@
+"""
+Load test: N concurrent Jarvis sessions against a local Live API stand-in.
+
+Starts sessions through the SessionManager exactly as start_audio does: one
+AudioLoop per session (no local mic/speaker, audio_io=False) with its own
+scratch project and tool permissions, sharing one genai client (here a
+FakeLiveClient from fake_live.py), PrinterAgent, KasaAgent and the executor
+pools. Each session then sends text turns; the fake model answers with a
+tool call (list_projects, auto-allowed by the session's permissions) and a
+stream of PCM.
+
+Reported per run:
+  - admitted / rejected sessions (admission control at --max-sessions)
+  - time to first audio chunk per turn (p50 / p95)
+  - event-loop lag (how late a 10 ms ticker wakes up; p95 / max)
+  - process CPU time and RSS growth per admitted session
+
+Usage:
+    python benchmarks/bench_sessions.py [--sessions 1,2,4,8] [--max-sessions 8] [--turns 5] [--reply-ms 1000] [--pace 4]
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import psutil
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import jarvis
+from fake_live import FakeLiveClient
+from kasa_agent import KasaAgent
+from printer_agent import PrinterAgent
+from project_manager import ProjectManager
+from session_manager import SessionManager
+
+
+def pct(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))]
+
+
+async def loop_lag(samples, stop, interval=0.01):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append(time.perf_counter() - start - interval)
+
+
+async def drive(loop, turns, first_audio, ttfa):
+    """Send `turns` text turns and record the time to each turn's first audio chunk."""
+    await asyncio.wait_for(loop.session_ready.wait(), timeout=10)
+    for i in range(turns):
+        session = loop.session
+        done = session.turns
+        first_audio.clear()
+        sent = time.perf_counter()
+        await session.send(input=f"Turn {i}: what projects do I have?", end_of_turn=True)
+        await asyncio.wait_for(first_audio.wait(), timeout=10)
+        ttfa.append(time.perf_counter() - sent)
+        while session.turns == done:
+            await asyncio.sleep(0.005)
+
+
+async def run(n, args, workspace):
+    client = FakeLiveClient(reply_ms=args.reply_ms, first_chunk_ms=args.first_chunk_ms, pace=args.pace, tool_call="list_projects")
+    printer_agent = PrinterAgent()
+    kasa_agent = KasaAgent()
+    projects = ProjectManager(workspace)
+    manager = SessionManager(max_sessions=args.max_sessions)
+    process = psutil.Process()
+
+    lag, stop = [], asyncio.Event()
+    ticker = asyncio.create_task(loop_lag(lag, stop))
+    rss_before = process.memory_info().rss
+    cpu_before = time.process_time()
+
+    ttfa, drivers = [], []
+    for i in range(n):
+        session_id = f"bench-{i}"
+        if manager.admit(session_id, audio_io=False):
+            continue
+        first_audio = asyncio.Event()
+        loop = jarvis.AudioLoop(
+            video_mode="none",
+            on_audio_data=lambda data, event=first_audio: event.set(),
+            kasa_agent=kasa_agent,
+            genai_client=client,
+            printer_agent=printer_agent,
+            project_manager=projects.scratch_view(session_id),
+            audio_io=False,
+            latency_trace_dir=None,
+        )
+        loop.update_permissions({"list_projects": False})
+        manager.start(session_id, loop, audio_io=False)
+        drivers.append(drive(loop, args.turns, first_audio, ttfa))
+
+    results = await asyncio.gather(*drivers, return_exceptions=True)
+    failed = [r for r in results if isinstance(r, Exception)]
+    cpu = time.process_time() - cpu_before
+    rss = process.memory_info().rss - rss_before
+    usage = manager.stats()
+
+    await manager.stop_all(timeout=5)
+    stop.set()
+    await ticker
+
+    admitted = usage["admitted"]
+    return {
+        "sessions": n,
+        "admitted": admitted,
+        "rejected": usage["rejected"],
+        "failed": len(failed),
+        "turns": client.turns,
+        "tool_calls": sum(s.get("tool_calls", 0) for s in usage["sessions"].values()),
+        "ttfa_p50": pct(ttfa, 50),
+        "ttfa_p95": pct(ttfa, 95),
+        "lag_p95": pct(lag, 95),
+        "lag_max": max(lag) if lag else None,
+        "cpu_per_session": cpu / admitted if admitted else 0.0,
+        "rss_per_session": rss / admitted if admitted else 0.0,
+    }
+
+
+def ms(value):
+    return "-" if value is None else f"{value * 1000:.1f}"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,2,4,8", help="Comma-separated session counts to run")
+    parser.add_argument("--max-sessions", type=int, default=8, help="SessionManager admission limit")
+    parser.add_argument("--turns", type=int, default=5, help="Text turns per session")
+    parser.add_argument("--reply-ms", type=int, default=1000, help="Audio per model reply")
+    parser.add_argument("--first-chunk-ms", type=int, default=150, help="Fake model latency before a reply")
+    parser.add_argument("--pace", type=float, default=4.0, help="Reply stream speed (x real time)")
+    args = parser.parse_args()
+
+    counts = [int(n) for n in args.sessions.split(",") if n.strip()]
+    print(f"turns/session={args.turns} reply={args.reply_ms} ms first_chunk={args.first_chunk_ms} ms pace={args.pace}x max_sessions={args.max_sessions}")
+    print(f"{'sessions':>8} {'admit':>5} {'reject':>6} {'fail':>4} {'turns':>5} {'tools':>5} {'ttfa p50':>9} {'ttfa p95':>9} {'lag p95':>8} {'lag max':>8} {'cpu/sess':>9} {'rss/sess':>9}")
+    with tempfile.TemporaryDirectory() as workspace:
+        for n in counts:
+            r = await run(n, args, workspace)
+            print(
+                f"{r['sessions']:>8} {r['admitted']:>5} {r['rejected']:>6} {r['failed']:>4} {r['turns']:>5} {r['tool_calls']:>5} "
+                f"{ms(r['ttfa_p50']):>9} {ms(r['ttfa_p95']):>9} {ms(r['lag_p95']):>8} {ms(r['lag_max']):>8} "
+                f"{r['cpu_per_session'] * 1000:>7.1f}ms {r['rss_per_session'] / 1024 / 1024:>7.2f}MB"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,73 @@
+"""
+Micro-benchmark: per-chunk cost of the microphone VAD energy path.
+
+Compares the old struct.unpack + Python sum-of-squares RMS with the NumPy
+path in backend/vad.py, plus the full VoiceActivityDetector.process() call.
+
+Usage:
+    python benchmarks/bench_vad.py [--chunks 5000]
+"""
+import argparse
+import math
+import struct
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from vad import VoiceActivityDetector, pcm16_rms
+
+CHUNK_SIZE = 1024
+SAMPLE_RATE = 16000
+
+
+def legacy_rms(data):
+    count = len(data) // 2
+    if count == 0:
+        return 0
+    shorts = struct.unpack(f"<{count}h", data)
+    sum_squares = sum(s**2 for s in shorts)
+    return int(math.sqrt(sum_squares / count))
+
+
+def make_chunks(n):
+    rng = np.random.default_rng(0)
+    chunks = []
+    for i in range(n):
+        # Alternate ~1 s of noise and ~1 s of "speech"
+        amplitude = 3000 if (i // 16) % 2 else 100
+        samples = rng.normal(0, amplitude, CHUNK_SIZE).clip(-32768, 32767).astype("<i2")
+        chunks.append(samples.tobytes())
+    return chunks
+
+
+def bench(label, fn, chunks):
+    start = time.perf_counter()
+    for c in chunks:
+        fn(c)
+    elapsed = time.perf_counter() - start
+    per_chunk_us = elapsed / len(chunks) * 1e6
+    chunk_ms = CHUNK_SIZE / SAMPLE_RATE * 1000
+    print(f"{label:<28} {per_chunk_us:9.1f} us/chunk   {per_chunk_us / (chunk_ms * 10):6.3f}% of real time")
+    return per_chunk_us
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=5000)
+    args = parser.parse_args()
+
+    chunks = make_chunks(args.chunks)
+    print(f"{args.chunks} chunks of {CHUNK_SIZE} frames @ {SAMPLE_RATE} Hz")
+    legacy = bench("struct + python sum", legacy_rms, chunks)
+    fast = bench("numpy frombuffer rms", pcm16_rms, chunks)
+    vad = VoiceActivityDetector(sample_rate=SAMPLE_RATE, chunk_size=CHUNK_SIZE)
+    bench("VoiceActivityDetector.process", vad.process, chunks)
+    print(f"speedup (rms only): {legacy / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
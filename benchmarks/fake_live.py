@@ -0,0 +1,116 @@
+"""
+Local stand-in for the Gemini Live API, for load tests.
+
+FakeLiveClient has the shape AudioLoop uses from genai.Client:
+`client.aio.live.connect(model=..., config=...)` is an async context manager
+yielding a session with send(), send_tool_response() and receive(). Each text
+message sent with end_of_turn=True is answered with one model turn: an output
+transcription, `reply_ms` of 24 kHz 16-bit PCM in `chunk_ms` chunks (paced
+at `pace` x real time, after `first_chunk_ms` of "thinking"), and optionally a
+tool call that has to be answered before the turn ends. Mic audio
+(end_of_turn=False) is counted and otherwise ignored.
+"""
+import asyncio
+import itertools
+import time
+from types import SimpleNamespace
+
+RECEIVE_SAMPLE_RATE = 24000
+
+
+def _response(data=None, text=None, tool_call=None):
+    server_content = None
+    if text is not None:
+        server_content = SimpleNamespace(input_transcription=None, output_transcription=SimpleNamespace(text=text))
+    return SimpleNamespace(data=data, server_content=server_content, tool_call=tool_call)
+
+
+class FakeLiveSession:
+    _call_ids = itertools.count(1)
+
+    def __init__(self, client):
+        self.client = client
+        self._turns = asyncio.Queue()
+        self._tool_responses = asyncio.Queue()
+        self.closed = False
+        self.turns = 0
+
+    async def send(self, input=None, end_of_turn=False):
+        self.client.messages += 1
+        if isinstance(input, dict) and isinstance(input.get("data"), (bytes, bytearray)):
+            self.client.bytes_in += len(input["data"])
+        if end_of_turn and isinstance(input, str):
+            self._turns.put_nowait((input, time.perf_counter()))
+
+    async def send_tool_response(self, function_responses=None):
+        for response in function_responses or []:
+            self._tool_responses.put_nowait(response)
+
+    async def receive(self):
+        """One model turn per call, like the real session."""
+        text, _ = await self._turns.get()
+        client = self.client
+        await asyncio.sleep(client.first_chunk_ms / 1000.0)
+        if client.tool_call:
+            call = SimpleNamespace(id=f"call-{next(self._call_ids)}", name=client.tool_call, args={})
+            yield _response(tool_call=SimpleNamespace(function_calls=[call]))
+            await asyncio.wait_for(self._tool_responses.get(), timeout=10)
+            client.tool_responses += 1
+        yield _response(text=f"Reply to: {text[:40]}")
+        chunk = bytes(int(RECEIVE_SAMPLE_RATE * 2 * client.chunk_ms / 1000))
+        for _ in range(max(1, int(client.reply_ms / client.chunk_ms))):
+            yield _response(data=chunk)
+            client.bytes_out += len(chunk)
+            await asyncio.sleep(client.chunk_ms / 1000.0 / client.pace)
+        self.turns += 1
+        client.turns += 1
+
+
+class _FakeLive:
+    def __init__(self, client):
+        self.client = client
+
+    def connect(self, model=None, config=None):
+        return _FakeConnection(self.client)
+
+
+class _FakeConnection:
+    def __init__(self, client):
+        self.client = client
+        self.session = None
+
+    async def __aenter__(self):
+        self.client.connects += 1
+        self.client.open_sessions += 1
+        self.session = FakeLiveSession(self.client)
+        return self.session
+
+    async def __aexit__(self, *exc):
+        self.session.closed = True
+        self.client.open_sessions -= 1
+        return False
+
+
+class FakeLiveClient:
+    def __init__(self, reply_ms=1000, chunk_ms=40, first_chunk_ms=150, pace=1.0, tool_call=None):
+        """
+        :param reply_ms: Audio per model turn.
+        :param chunk_ms: Audio per response message.
+        :param first_chunk_ms: Delay before a turn's first message.
+        :param pace: Playback speed of the reply stream (2.0 = twice real time).
+        :param tool_call: Name of a tool the model calls at the start of every turn (None = no calls).
+        """
+        self.reply_ms = reply_ms
+        self.chunk_ms = chunk_ms
+        self.first_chunk_ms = first_chunk_ms
+        self.pace = pace
+        self.tool_call = tool_call
+        self.aio = SimpleNamespace(live=_FakeLive(self))
+
+        self.connects = 0
+        self.open_sessions = 0
+        self.messages = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.turns = 0
+        self.tool_responses = 0
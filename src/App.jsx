@@ -21,6 +21,20 @@ import SettingsWindow from './components/SettingsWindow';
 const socket = io('http://localhost:8000');
 const { ipcRenderer } = window.require('electron');
 
+// Peak level (0-255) of int16 PCM over `bins` slices, same scale as the backend envelope mode
+const pcmToLevels = (buffer, bins = 64) => {
+    const samples = new Int16Array(buffer, 0, Math.floor(buffer.byteLength / 2));
+    const levels = new Array(bins).fill(0);
+    if (samples.length === 0) return levels;
+    const perBin = Math.ceil(samples.length / bins);
+    for (let i = 0; i < samples.length; i++) {
+        const bin = Math.floor(i / perBin);
+        const v = Math.abs(samples[i]);
+        if (v > levels[bin]) levels[bin] = v;
+    }
+    return levels.map(v => Math.min(255, Math.floor(v * 255 / 32768)));
+};
+
 function App() {
     const [status, setStatus] = useState('Disconnected');
     const [socketConnected, setSocketConnected] = useState(socket.connected); // Track socket connection reactively
@@ -55,6 +69,7 @@ function App() {
     const [browserData, setBrowserData] = useState({ image: null, logs: [] });
     // showMemoryPrompt removed - memory is now actively saved to project
     const [confirmationRequest, setConfirmationRequest] = useState(null); // { id, tool, args }
+    const [jobs, setJobs] = useState([]); // Backend job table: [{ id, kind, label, state, queued_s, duration_s }]
     const [kasaDevices, setKasaDevices] = useState([]);
     const [showKasaWindow, setShowKasaWindow] = useState(false);
     const [showPrinterWindow, setShowPrinterWindow] = useState(false);
@@ -144,6 +159,8 @@ function App() {
     const lastFrameTimeRef = useRef(0);
     const frameCountRef = useRef(0);
     const lastVideoTimeRef = useRef(-1);
+    const videoSendFpsRef = useRef(0); // Frame rate the backend asked for via 'video_config' (0 = don't send)
+    const lastFrameSentRef = useRef(0);
 
     // Ref to track video state for the loop (avoids closure staleness)
     const isVideoOnRef = useRef(false);
@@ -322,9 +339,13 @@ function App() {
             setSocketConnected(true);
             socket.emit('get_settings');
         });
-        socket.on('disconnect', () => {
+        socket.on('disconnect', (reason) => {
             setStatus('Disconnected');
             setSocketConnected(false);
+            // The server drops clients that fall too far behind; come back with fresh state
+            if (reason === 'io server disconnect') {
+                socket.connect();
+            }
         });
         socket.on('status', (data) => {
             addMessage('System', data.msg);
@@ -336,7 +357,12 @@ function App() {
             }
         });
         socket.on('audio_data', (data) => {
-            setAiAudioData(data.data);
+            // Binary attachments arrive as ArrayBuffers
+            if (data.envelope) {
+                setAiAudioData(Array.from(new Uint8Array(data.envelope)));
+            } else if (data.pcm) {
+                setAiAudioData(pcmToLevels(data.pcm));
+            }
         });
         socket.on('auth_status', (data) => {
             console.log("Auth Status:", data);
@@ -368,6 +394,9 @@ function App() {
                 setIsCameraFlipped(settings.camera_flipped);
             }
         });
+        socket.on('video_config', (data) => {
+            videoSendFpsRef.current = data && data.fps > 0 ? data.fps : 0;
+        });
         socket.on('error', (data) => {
             console.error("Socket Error:", data);
             addMessage('System', `Error: ${data.msg}`);
@@ -470,6 +499,17 @@ function App() {
             setConfirmationRequest(data);
         });
 
+        // Background job table (CAD, web agent, file ops)
+        socket.on('jobs', (data) => {
+            setJobs(Array.isArray(data) ? data : []);
+        });
+
+        // Backend auto-denied a request (no answer in time, or the session ended)
+        socket.on('tool_confirmation_expired', (data) => {
+            console.log("Confirmation Request Expired:", data);
+            setConfirmationRequest((current) => (current && current.id === data.id ? null : current));
+        });
+
         // Handle Print Window Request (from CadWindow)
         socket.on('request_print_window', () => {
             setShowPrinterWindow(true);
@@ -628,10 +668,13 @@ function App() {
             socket.off('browser_frame');
             socket.off('transcription');
             socket.off('tool_confirmation_request');
+            socket.off('tool_confirmation_expired');
+            socket.off('jobs');
             socket.off('kasa_devices');
             socket.off('printer_list');
             socket.off('slicing_progress');
             socket.off('print_status_update');
+            socket.off('video_config');
             socket.off('error');
 
             stopMicVisualizer();
@@ -777,9 +820,11 @@ function App() {
 
         // 2. Send Frame to Backend (Throttled & Resized)
         // Only send if connected
-        if (isConnected) {
-            // Simple throttle: every 5th frame roughly
-            if (frameCountRef.current % 5 === 0) {
+        if (isConnected && videoSendFpsRef.current > 0) {
+            // Throttle to the rate the backend asked for; it only keeps the newest frame anyway
+            const sendNow = performance.now();
+            if (sendNow - lastFrameSentRef.current >= 1000 / videoSendFpsRef.current) {
+                lastFrameSentRef.current = sendNow;
 
                 // Use dedicated transmission canvas for resizing
                 const transCanvas = transmissionCanvasRef.current;
@@ -1645,6 +1690,8 @@ function App() {
                         onToggleBrowser={() => setShowBrowserWindow(!showBrowserWindow)}
                         showBrowserWindow={showBrowserWindow}
                         activeDragElement={activeDragElement}
+                        jobs={jobs}
+                        onCancelJob={(id) => socket.emit('cancel_job', { id })}
                         position={elementPositions.tools}
                         onMouseDown={(e) => handleMouseDown(e, 'tools')}
                     />
@@ -1,10 +1,20 @@
-import React, { useMemo, useState, useEffect, useRef } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { Canvas, useLoader, useFrame } from '@react-three/fiber';
 import { OrbitControls, Center, Stage } from '@react-three/drei';
 import * as THREE from 'three';
 import { STLLoader } from 'three/examples/jsm/loaders/STLLoader';
 import { Printer } from 'lucide-react';
 
+// Parsed geometry of recently viewed artifacts, keyed by content hash
+const geometryCache = new Map();
+const GEOMETRY_CACHE_SIZE = 8;
+
+const parseStl = (buffer) => {
+    const geom = new STLLoader().parse(buffer);
+    geom.center(); // Optional: Center the geometry
+    return geom;
+};
+
 const GeometryModel = ({ geometry }) => {
     return (
         <mesh geometry={geometry} castShadow receiveShadow>
@@ -28,7 +38,9 @@ const LoadingCube = () => {
 };
 
 const CadWindow = ({ data, thoughts, retryInfo = {}, onClose, socket }) => {
-    // data format: { format: "stl", data: "base64..." }
+    // data format: { format: "stl", url: "/artifacts/<sha256>", hash, filename, size }
+    // (legacy: { format: "stl", data: "base64..." })
+    const [geometry, setGeometry] = useState(null);
     const [isIterating, setIsIterating] = useState(false);
     const [prompt, setPrompt] = useState("");
     const [isSending, setIsSending] = useState(false);
@@ -46,28 +58,54 @@ const CadWindow = ({ data, thoughts, retryInfo = {}, onClose, socket }) => {
         }
     }, [thoughts]);
 
-    const geometry = useMemo(() => {
-        if (!data || data.format !== 'stl' || !data.data) return null;
+    useEffect(() => {
+        if (!data || data.format !== 'stl' || (!data.url && !data.data)) {
+            setGeometry(null);
+            return;
+        }
 
-        try {
-            // Convert Base64 to ArrayBuffer
-            const byteCharacters = atob(data.data);
-            const byteNumbers = new Array(byteCharacters.length);
-            for (let i = 0; i < byteCharacters.length; i++) {
-                byteNumbers[i] = byteCharacters.charCodeAt(i);
+        if (data.data) {
+            try {
+                // Convert Base64 to ArrayBuffer
+                const bytes = Uint8Array.from(atob(data.data), (c) => c.charCodeAt(0));
+                setGeometry(parseStl(bytes.buffer));
+            } catch (e) {
+                console.error("Failed to decode/parse STL:", e);
+                setGeometry(null);
             }
-            const byteArray = new Uint8Array(byteNumbers);
-
-            // Parse directly using THREE.STLLoader
-            const loader = new STLLoader();
-            const geom = loader.parse(byteArray.buffer);
-            geom.center(); // Optional: Center the geometry
-            return geom;
-        } catch (e) {
-            console.error("Failed to decode/parse STL:", e);
-            return null;
+            return;
         }
-    }, [data]);
+
+        // Same content hash = same model: reuse the parsed geometry
+        if (data.hash && geometryCache.has(data.hash)) {
+            setGeometry(geometryCache.get(data.hash));
+            return;
+        }
+
+        let cancelled = false;
+        const baseUrl = socket?.io?.uri || 'http://localhost:8000';
+        // Artifacts are immutable, so the browser's HTTP cache can answer repeat fetches
+        fetch(new URL(data.url, baseUrl))
+            .then((res) => {
+                if (!res.ok) throw new Error(`HTTP ${res.status}`);
+                return res.arrayBuffer();
+            })
+            .then((buffer) => {
+                const geom = parseStl(buffer);
+                if (data.hash) {
+                    geometryCache.set(data.hash, geom);
+                    if (geometryCache.size > GEOMETRY_CACHE_SIZE) {
+                        geometryCache.delete(geometryCache.keys().next().value);
+                    }
+                }
+                if (!cancelled) setGeometry(geom);
+            })
+            .catch((e) => {
+                console.error("Failed to fetch/parse STL:", e);
+                if (!cancelled) setGeometry(null);
+            });
+        return () => { cancelled = true; };
+    }, [data, socket]);
 
     const handleGenerate = () => {
         if (!prompt.trim()) return;
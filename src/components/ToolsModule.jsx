@@ -22,10 +22,15 @@ const ToolsModule = ({
     onToggleBrowser,
     showBrowserWindow,
     activeDragElement,
+    jobs = [],
+    onCancelJob,
 
     position,
     onMouseDown
 }) => {
+    // Background jobs (CAD, web agent, file ops) still queued or running on the backend
+    const activeJobs = jobs.filter((job) => job.state === 'queued' || job.state === 'running');
+
     return (
         <div
             id="tools"
@@ -142,6 +147,22 @@ const ToolsModule = ({
                     <Globe size={24} />
                 </button>
             </div>
+
+            {activeJobs.length > 0 && (
+                <div className="absolute bottom-full left-1/2 -translate-x-1/2 mb-3 flex flex-col items-center gap-1 text-xs font-mono">
+                    {activeJobs.map((job) => (
+                        <div key={job.id} className="flex items-center gap-2 px-3 py-1 rounded-full bg-black/60 border border-cyan-500/30 text-cyan-300 whitespace-nowrap">
+                            <span className={job.state === 'running' ? 'text-cyan-400 animate-pulse' : 'text-gray-500'}>●</span>
+                            <span>{job.kind}</span>
+                            {job.label && <span className="text-gray-500 max-w-[16rem] truncate">{job.label}</span>}
+                            <span className="text-gray-500">{job.state}</span>
+                            {onCancelJob && (
+                                <button onMouseDown={(e) => e.stopPropagation()} onClick={() => onCancelJob(job.id)} className="text-gray-500 hover:text-red-400" title="Cancel job">✕</button>
+                            )}
+                        </div>
+                    ))}
+                </div>
+            )}
         </div>
     );
 };
@@ -0,0 +1,120 @@
+"""
+Tests for content-addressed artifact serving.
+"""
+import hashlib
+import os
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from artifact_server import ArtifactStore, URL_PREFIX, file_digest
+
+
+@pytest.fixture
+def stl(tmp_path):
+    path = tmp_path / "output.stl"
+    path.write_bytes(b"solid cube\n" + bytes(range(256)) * 40)
+    return path
+
+
+def make_client(store):
+    app = FastAPI()
+
+    @app.get(URL_PREFIX + "/{digest}")
+    async def get_artifact(digest: str, request: Request):
+        return store.response(digest, request.headers.get("if-none-match"))
+
+    return TestClient(app)
+
+
+class TestArtifactStore:
+    """Test registration and lookup."""
+
+    def test_file_digest(self, stl):
+        assert file_digest(stl, chunk_size=100) == hashlib.sha256(stl.read_bytes()).hexdigest()
+
+    @pytest.mark.asyncio
+    async def test_add_and_payload(self, stl):
+        """The payload carries a URL and hash instead of the file."""
+        store = ArtifactStore()
+        artifact = await store.add(stl)
+        payload = artifact.to_payload()
+        assert payload == {
+            "format": "stl",
+            "url": f"{URL_PREFIX}/{artifact.digest}",
+            "hash": artifact.digest,
+            "filename": "output.stl",
+            "size": stl.stat().st_size,
+        }
+        assert "data" not in payload
+        assert store.resolve(artifact.digest) is artifact
+
+    @pytest.mark.asyncio
+    async def test_unchanged_file_not_rehashed(self, stl):
+        store = ArtifactStore()
+        first = await store.add(stl)
+        second = await store.add(stl)
+        assert first is second
+        assert store.stats()["added"] == 1
+
+    @pytest.mark.asyncio
+    async def test_changed_file_gets_new_digest(self, stl):
+        """Overwriting a file retires its old hash."""
+        store = ArtifactStore()
+        old = await store.add(stl)
+        stl.write_bytes(b"solid other\n")
+        os.utime(stl, ns=(old.stat_result.st_mtime_ns + 10**9,) * 2)
+        assert store.resolve(old.digest) is None
+        new = await store.add(stl)
+        assert new.digest != old.digest
+
+    @pytest.mark.asyncio
+    async def test_lru_limit(self, tmp_path):
+        store = ArtifactStore(max_entries=2)
+        digests = []
+        for i in range(3):
+            path = tmp_path / f"part{i}.stl"
+            path.write_bytes(f"solid {i}".encode())
+            digests.append((await store.add(path)).digest)
+        assert len(store) == 2
+        assert store.resolve(digests[0]) is None
+
+
+class TestArtifactResponses:
+    """Test the HTTP side: ETag, 304, Range, 404."""
+
+    @pytest.mark.asyncio
+    async def test_get_with_etag(self, stl):
+        store = ArtifactStore()
+        artifact = await store.add(stl)
+        res = make_client(store).get(artifact.url)
+        assert res.status_code == 200
+        assert res.content == stl.read_bytes()
+        assert res.headers["etag"] == f'"{artifact.digest}"'
+        assert "immutable" in res.headers["cache-control"]
+        assert res.headers["content-type"] == "model/stl"
+
+    @pytest.mark.asyncio
+    async def test_if_none_match(self, stl):
+        """A client that already has the content gets a 304 with no body."""
+        store = ArtifactStore()
+        artifact = await store.add(stl)
+        res = make_client(store).get(artifact.url, headers={"If-None-Match": f'"{artifact.digest}"'})
+        assert res.status_code == 304
+        assert res.content == b""
+        assert store.stats()["not_modified"] == 1
+
+    @pytest.mark.asyncio
+    async def test_range(self, stl):
+        store = ArtifactStore()
+        artifact = await store.add(stl)
+        res = make_client(store).get(artifact.url, headers={"Range": "bytes=0-9"})
+        assert res.status_code == 206
+        assert res.content == stl.read_bytes()[:10]
+        assert res.headers["content-range"] == f"bytes 0-9/{artifact.size}"
+
+    def test_unknown_digest(self):
+        store = ArtifactStore()
+        assert make_client(store).get(f"{URL_PREFIX}/{'0' * 64}").status_code == 404
+        assert store.stats()["missing"] == 1
@@ -0,0 +1,67 @@
+"""
+Tests for cached audio device lookup.
+"""
+from audio_devices import AudioDeviceManager
+
+
+class FakePyAudio:
+    """Counts enumeration calls so caching can be asserted."""
+
+    def __init__(self):
+        self.calls = 0
+        self.infos = [
+            {"index": 0, "name": "Built-in Output", "maxInputChannels": 0, "defaultSampleRate": 48000.0},
+            {"index": 1, "name": "USB Microphone", "maxInputChannels": 1, "defaultSampleRate": 44100.0},
+            {"index": 2, "name": "Audio Interface", "maxInputChannels": 8, "defaultSampleRate": 48000.0},
+        ]
+
+    def get_device_count(self):
+        self.calls += 1
+        return len(self.infos)
+
+    def get_device_info_by_index(self, i):
+        self.calls += 1
+        return self.infos[i]
+
+    def get_default_input_device_info(self):
+        self.calls += 1
+        return self.infos[2]
+
+
+class TestAudioDeviceManager:
+    """Test device resolution and caching."""
+
+    def test_resolves_name_once(self):
+        """Repeated lookups (reconnects) don't re-enumerate devices."""
+        pya = FakePyAudio()
+        devices = AudioDeviceManager(pya)
+        assert devices.resolve_input(name="usb") == 1
+        calls = pya.calls
+        assert devices.resolve_input(name="usb") == 1
+        assert devices.input_format(1) == (44100, 1)
+        assert devices.input_format(1) == (44100, 1)
+        assert pya.calls == calls
+        assert devices.enumerations == 1
+
+    def test_fallbacks(self):
+        """Unknown names fall back to the index, then to the default input."""
+        devices = AudioDeviceManager(FakePyAudio())
+        assert devices.resolve_input(name="missing", index="1") == 1
+        assert devices.resolve_input(name="missing") == 2
+        assert devices.resolve_input(index="bogus") == 2
+
+    def test_channels_capped_at_stereo(self):
+        """Multi-channel interfaces are opened as stereo."""
+        devices = AudioDeviceManager(FakePyAudio())
+        assert devices.input_format(2) == (48000, 2)
+
+    def test_refresh_reenumerates(self):
+        """refresh() drops the cache so new devices are seen."""
+        pya = FakePyAudio()
+        devices = AudioDeviceManager(pya)
+        devices.devices()
+        pya.infos.append({"index": 3, "name": "Headset", "maxInputChannels": 1, "defaultSampleRate": 16000.0})
+        assert devices.resolve_input(name="headset") == 2
+        devices.refresh()
+        assert devices.resolve_input(name="headset") == 3
+        assert devices.enumerations == 2
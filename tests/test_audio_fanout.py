@@ -0,0 +1,85 @@
+"""
+Tests for batched audio fan-out to the frontend.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from audio_fanout import AudioFanout, pcm16_envelope
+
+
+class TestEnvelope:
+    """Test the visualizer envelope."""
+
+    def test_peak_per_bin(self):
+        """Each bin reports the loudest sample in its slice, scaled to 0-255."""
+        samples = np.zeros(64 * 4, dtype="<i2")
+        samples[5] = -32768
+        samples[4 * 10] = 16384
+        env = pcm16_envelope(samples.tobytes(), bins=64)
+        assert len(env) == 64
+        assert env[1] == 255
+        assert env[10] == 127
+        assert env[0] == 0
+
+    def test_short_and_empty_input(self):
+        """Fewer samples than bins and empty input don't fail."""
+        assert len(pcm16_envelope(b"\x00\x10" * 3, bins=64)) == 64
+        assert pcm16_envelope(b"", bins=8) == b"\x00" * 8
+
+
+class TestAudioFanout:
+    """Test batching and payload shapes."""
+
+    @pytest.mark.asyncio
+    async def test_batches_chunks_per_interval(self):
+        """Chunks pushed within one interval go out as one binary payload."""
+        sent = []
+
+        async def emit(payload):
+            sent.append(payload)
+
+        fanout = AudioFanout(emit, interval=0.01)
+        for _ in range(3):
+            fanout.push(b"\x01\x00" * 10)
+        await asyncio.sleep(0.03)
+
+        assert len(sent) == 1
+        assert sent[0]["pcm"] == b"\x01\x00" * 30
+        assert sent[0]["seq"] == 1
+        assert fanout.stats()["emits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_envelope_mode(self):
+        """Envelope mode sends only the levels."""
+        sent = []
+
+        async def emit(payload):
+            sent.append(payload)
+
+        fanout = AudioFanout(emit, interval=0.01, mode="envelope", envelope_bins=16)
+        fanout.push(b"\x00\x40" * 100)
+        await asyncio.sleep(0.03)
+
+        assert "pcm" not in sent[0]
+        assert len(sent[0]["envelope"]) == 16
+
+    @pytest.mark.asyncio
+    async def test_close_drops_pending(self):
+        """Nothing is emitted after close()."""
+        sent = []
+
+        async def emit(payload):
+            sent.append(payload)
+
+        fanout = AudioFanout(emit, interval=0.01)
+        fanout.push(b"\x00\x00")
+        fanout.close()
+        await asyncio.sleep(0.03)
+        assert sent == []
+
+    def test_rejects_unknown_mode(self):
+        """A typo in the setting fails loudly."""
+        with pytest.raises(ValueError):
+            AudioFanout(None, mode="json")
@@ -0,0 +1,116 @@
+"""
+Tests for the shared camera broker.
+"""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+# Try to import the broker, skip all tests if OpenCV is missing
+try:
+    from camera_broker import CameraBroker
+    HAS_CV2 = True
+except ImportError as e:
+    HAS_CV2 = False
+    IMPORT_ERROR = str(e)
+
+pytestmark = pytest.mark.skipif(not HAS_CV2, reason=f"OpenCV not installed: {IMPORT_ERROR if not HAS_CV2 else ''}")
+
+
+class FakeCapture:
+    """Stands in for cv2.VideoCapture at ~100 fps."""
+
+    def __init__(self, opened=True):
+        self.opened = opened
+        self.reads = 0
+        self.released = False
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        time.sleep(0.01)
+        self.reads += 1
+        return True, np.full((4, 4, 3), self.reads % 255, dtype=np.uint8)
+
+    def release(self):
+        self.released = True
+
+
+class FakeOpener:
+    def __init__(self, working=(0,)):
+        self.working = working
+        self.opened = []
+        self.captures = []
+
+    def __call__(self, index):
+        self.opened.append(index)
+        cap = FakeCapture(opened=index in self.working)
+        self.captures.append(cap)
+        return cap
+
+
+class TestCameraBroker:
+    """Test device sharing between subscribers."""
+
+    def test_one_device_many_subscribers(self):
+        """Two subscribers share one open device and the same frame objects."""
+        opener = FakeOpener()
+        broker = CameraBroker(opener=opener, idle_timeout=0.1)
+        auth = broker.subscribe("auth")
+        vision = broker.subscribe("vision")
+        a = auth.wait_next(timeout=1.0)
+        latest = broker.latest()
+        b = vision.wait_next(timeout=1.0)
+        assert a is not None and b is not None
+        assert b is latest[2] or vision.frames_delivered == 1
+        auth.close()
+        vision.close()
+        assert opener.opened == [0]
+
+    def test_falls_back_to_next_index(self):
+        """Device 1 is used when device 0 can't be opened."""
+        opener = FakeOpener(working=(1,))
+        broker = CameraBroker(opener=opener, idle_timeout=0.1)
+        sub = broker.subscribe("auth")
+        assert sub.wait_next(timeout=1.0) is not None
+        assert broker.device_index == 1
+        sub.close()
+
+    def test_unavailable_camera(self):
+        """Subscribers get None once every index has failed."""
+        broker = CameraBroker(opener=FakeOpener(working=()), idle_timeout=0.1)
+        sub = broker.subscribe("auth")
+        assert sub.wait_next(timeout=1.0) is None
+        assert broker.open_failures == 1
+        assert not broker.running
+
+    def test_released_after_idle_and_kept_on_handoff(self):
+        """A quick re-subscribe reuses the device; it is released once idle."""
+        opener = FakeOpener()
+        broker = CameraBroker(opener=opener, idle_timeout=0.2)
+        broker.subscribe("auth").close()
+        sub = broker.subscribe("vision")
+        assert sub.wait_next(timeout=1.0) is not None
+        sub.close()
+        assert opener.opened == [0]
+        deadline = time.monotonic() + 2.0
+        while broker.running and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert not broker.running
+        assert opener.captures[0].released
+
+    @pytest.mark.asyncio
+    async def test_async_subscriber_rate(self):
+        """An async subscriber at 20 fps gets roughly that many frames, not the device rate."""
+        broker = CameraBroker(opener=FakeOpener(), idle_timeout=0.1)
+        sub = broker.subscribe("vision", fps=20)
+        start = time.monotonic()
+        frames = 0
+        while time.monotonic() - start < 0.5:
+            assert await asyncio.wait_for(sub.next_frame(), 1.0) is not None
+            frames += 1
+        sub.close()
+        assert 5 <= frames <= 13
+        assert broker.frames_read > frames
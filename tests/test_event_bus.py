@@ -0,0 +1,291 @@
+"""
+Tests for the outbound Socket.IO event bus.
+"""
+import asyncio
+
+import pytest
+
+from event_bus import EVENT_TOPICS, EventBus, merge_browser_frame, merge_text, parse_topics
+
+
+class Sink:
+    def __init__(self, delay=0.0):
+        self.sent = []
+        self.delay = delay
+        self.gate = None
+
+    async def __call__(self, event, data, sid):
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append((sid, event, data))
+
+
+async def settle(bus, rounds=20):
+    for _ in range(rounds):
+        await asyncio.sleep(bus.interval + 0.01)
+        if not any(c["depth"] or c["pending_frame"] for c in bus.stats()["clients"].values()):
+            return
+
+
+class TestMerges:
+    """Test the payload merge helpers."""
+
+    def test_merge_text_same_sender(self):
+        assert merge_text({"sender": "Jarvis", "text": "Hel"}, {"sender": "Jarvis", "text": "lo"}) == {"sender": "Jarvis", "text": "Hello"}
+
+    def test_merge_text_other_sender(self):
+        assert merge_text({"sender": "User", "text": "a"}, {"sender": "Jarvis", "text": "b"}) is None
+
+    def test_merge_browser_frame_keeps_logs(self):
+        merged = merge_browser_frame({"image": "old", "log": "step 1"}, {"image": "new", "log": "step 2"})
+        assert merged == {"image": "new", "log": "step 1\nstep 2"}
+
+
+class TestEventBus:
+    """Test ordering, coalescing, latest-wins and overflow."""
+
+    @pytest.mark.asyncio
+    async def test_ordered_per_client(self):
+        """Events reach every client in publish order."""
+        sink = Sink()
+        bus = EventBus(sink, interval=0.01)
+        bus.add_client("a")
+        bus.add_client("b")
+        for i in range(5):
+            bus.publish("status", {"i": i})
+        await settle(bus)
+        for sid in ("a", "b"):
+            assert [d["i"] for s, _, d in sink.sent if s == sid] == list(range(5))
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_targeted_publish(self):
+        """`to` limits delivery to one client; unknown clients are ignored."""
+        sink = Sink()
+        bus = EventBus(sink, interval=0.01)
+        bus.add_client("a")
+        bus.add_client("b")
+        bus.publish("status", {}, to="b")
+        bus.publish("status", {}, to="gone")
+        await settle(bus)
+        assert [s for s, _, _ in sink.sent] == ["b"]
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_coalesce_merges_into_one_frame(self):
+        """Deltas within one interval are emitted as a single event."""
+        sink = Sink()
+        bus = EventBus(sink, interval=0.05)
+        bus.register("transcription", "coalesce", merge_text)
+        bus.add_client("a")
+        for word in ("Hel", "lo ", "there"):
+            bus.publish("transcription", {"sender": "Jarvis", "text": word})
+        await settle(bus)
+        assert sink.sent == [("a", "transcription", {"sender": "Jarvis", "text": "Hello there"})]
+        assert bus.stats()["clients"]["a"]["coalesced"] == 2
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_coalesce_keeps_order_with_other_events(self):
+        """An ordered event flushes the pending frame ahead of itself."""
+        sink = Sink()
+        bus = EventBus(sink, interval=1.0)
+        bus.register("transcription", "coalesce", merge_text)
+        bus.add_client("a")
+        bus.publish("transcription", {"sender": "User", "text": "hi"})
+        bus.publish("transcription", {"sender": "Jarvis", "text": "hey"})
+        bus.publish("error", {"msg": "x"})
+        await asyncio.sleep(0.05)
+        assert [(e, d.get("sender")) for _, e, d in sink.sent] == [("transcription", "User"), ("transcription", "Jarvis"), ("error", None)]
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_latest_replaces_unsent(self):
+        """Only the newest lossy payload is sent while the client is busy."""
+        sink = Sink()
+        sink.gate = asyncio.Event()
+        bus = EventBus(sink, interval=0.01)
+        bus.register("audio_data", "latest")
+        bus.add_client("a")
+        bus.publish("status", {"msg": "first"})
+        await asyncio.sleep(0) # sender picks up "status" and blocks on the gate
+        for i in range(10):
+            bus.publish("audio_data", {"seq": i})
+        assert bus.stats()["clients"]["a"]["depth"] == 1
+        sink.gate.set()
+        await settle(bus)
+        assert [d for _, e, d in sink.sent if e == "audio_data"] == [{"seq": 9}]
+        assert bus.stats()["clients"]["a"]["replaced"] == 9
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_overflow_drops_lossy_first(self):
+        """A full queue sheds lossy events before ordered ones and counts the drop."""
+        sink = Sink()
+        sink.gate = asyncio.Event()
+        bus = EventBus(sink, interval=0.01, max_queue=3)
+        bus.register("browser_frame", "latest")
+        bus.add_client("a")
+        bus.publish("status", {"i": -1})
+        await asyncio.sleep(0)
+        bus.publish("browser_frame", {"image": "x"})
+        bus.publish("status", {"i": 0})
+        bus.publish("status", {"i": 1})
+        bus.publish("status", {"i": 2})
+        stats = bus.stats()
+        assert stats["dropped"] == {"browser_frame": 1}
+        assert stats["clients"]["a"]["depth"] == 3
+        sink.gate.set()
+        await settle(bus)
+        assert [d["i"] for _, e, d in sink.sent] == [-1, 0, 1, 2]
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_overflow_never_drops_ordered(self):
+        """A queue full of ordered events disconnects the client instead of losing one."""
+        sink = Sink()
+        sink.gate = asyncio.Event()
+        disconnected = []
+
+        async def disconnect(sid):
+            disconnected.append(sid)
+
+        bus = EventBus(sink, interval=0.01, max_queue=3, disconnect=disconnect)
+        bus.add_client("a")
+        bus.add_client("b")
+        bus.publish("status", {"i": -1}, to="a")
+        await asyncio.sleep(0)
+        for i in range(3):
+            bus.publish("tool_confirmation_request", {"i": i}, to="a")
+        assert bus.stats()["clients"]["a"]["depth"] == 3
+        bus.publish("error", {"i": 3})
+        await asyncio.sleep(0)
+        stats = bus.stats()
+        assert disconnected == ["a"] and bus.clients == ["b"]
+        assert stats["overflows"] == 1 and stats["dropped"] == {}
+        bus.publish("status", {"i": 4}, to="a")
+        sink.gate.set()
+        await settle(bus)
+        assert [(sid, d["i"]) for sid, _, d in sink.sent] == [("b", 3)]
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_overflow_drops_coalesced_before_ordered(self):
+        sink = Sink()
+        sink.gate = asyncio.Event()
+        bus = EventBus(sink, interval=0.01, max_queue=2)
+        bus.register("transcription", "coalesce", merge_text)
+        bus.add_client("a")
+        bus.publish("status", {"i": -1})
+        await asyncio.sleep(0)
+        bus.publish("transcription", {"sender": "Jarvis", "text": "hi"})
+        bus.publish("status", {"i": 0})
+        bus.publish("status", {"i": 1})
+        assert bus.stats()["dropped"] == {"transcription": 1}
+        sink.gate.set()
+        await settle(bus)
+        assert [d.get("i") for _, e, d in sink.sent] == [-1, 0, 1]
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_emit_error_does_not_stop_queue(self):
+        """A failed emit is counted and the next event still goes out."""
+        sent = []
+
+        async def emit(event, data, sid):
+            if data.get("fail"):
+                raise RuntimeError("socket closed")
+            sent.append(event)
+
+        bus = EventBus(emit, interval=0.01)
+        bus.add_client("a")
+        bus.publish("bad", {"fail": True})
+        bus.publish("good", {})
+        await settle(bus)
+        assert sent == ["good"]
+        assert bus.stats()["clients"]["a"]["errors"] == 1
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_remove_client(self):
+        """Disconnected clients stop receiving events."""
+        sink = Sink()
+        bus = EventBus(sink, interval=0.01)
+        bus.add_client("a")
+        bus.remove_client("a")
+        bus.publish("status", {})
+        await asyncio.sleep(0.02)
+        assert sink.sent == [] and bus.clients == []
+
+    def test_unknown_policy(self):
+        bus = EventBus(Sink())
+        with pytest.raises(ValueError):
+            bus.register("x", "sometimes")
+
+
+class TestTopicRouting:
+    """Test topic subscriptions."""
+
+    def test_parse_topics(self):
+        assert parse_topics("cad, kasa,bogus") == {"cad", "kasa"}
+        assert parse_topics(["printers", 3]) == {"printers"}
+        assert parse_topics(None) == set()
+
+    @pytest.mark.asyncio
+    async def test_routed_event_only_reaches_subscribers(self):
+        """cad_data skips a kasa-only client; unrouted events still reach everyone."""
+        sink = Sink()
+        bus = EventBus(sink, interval=0.01, routes=EVENT_TOPICS)
+        bus.add_client("desktop")
+        bus.add_client("lights", {"kasa"})
+        bus.publish("cad_data", {"data": "stl"})
+        bus.publish("kasa_devices", [])
+        bus.publish("status", {"msg": "hi"})
+        await settle(bus)
+        assert [e for s, e, _ in sink.sent if s == "desktop"] == ["cad_data", "kasa_devices", "status"]
+        assert [e for s, e, _ in sink.sent if s == "lights"] == ["kasa_devices", "status"]
+        assert bus.stats()["filtered"] == {"cad_data": 1}
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_subscribe_replaces_topics(self):
+        """Subscribing narrows (or with None, restores) what a client receives."""
+        sink = Sink()
+        bus = EventBus(sink, interval=0.01, routes=EVENT_TOPICS)
+        bus.add_client("a")
+        assert bus.subscribe("a", {"printers"})
+        bus.publish("cad_status", {"status": "generating"})
+        bus.publish("print_status_update", {})
+        bus.subscribe("a", None)
+        bus.publish("cad_status", {"status": "done"})
+        await settle(bus)
+        assert [(e, d.get("status")) for _, e, d in sink.sent] == [("print_status_update", None), ("cad_status", "done")]
+        assert not bus.subscribe("missing", {"cad"})
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_targeted_ignores_subscriptions(self):
+        """A reply to one client is delivered even if it isn't subscribed to the topic."""
+        sink = Sink()
+        bus = EventBus(sink, interval=0.01, routes=EVENT_TOPICS)
+        bus.add_client("a", {"kasa"})
+        bus.publish("printer_list", [], to="a")
+        await settle(bus)
+        assert [e for _, e, _ in sink.sent] == ["printer_list"]
+        bus.close()
+
+    @pytest.mark.asyncio
+    async def test_publish_to_client_subset(self):
+        """A session's events reach only its clients, still filtered by topic."""
+        sink = Sink()
+        bus = EventBus(sink, interval=0.01, routes=EVENT_TOPICS)
+        bus.add_client("desktop")
+        bus.add_client("remote")
+        bus.add_client("remote-lights", {"kasa"})
+        bus.publish("cad_status", {"status": "generating"}, clients=["remote", "remote-lights", "gone"])
+        await settle(bus)
+        assert [(s, e) for s, e, _ in sink.sent] == [("remote", "cad_status")]
+        assert bus.stats()["filtered"] == {"cad_status": 1}
+        bus.close()
@@ -0,0 +1,70 @@
+"""
+Tests for the named executors used for blocking work.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+
+import pytest
+
+from executors import InstrumentedExecutor, get_executor, executor_stats, AUDIO
+
+
+class TestInstrumentedExecutor:
+    """Test running work and recording queue wait."""
+
+    @pytest.mark.asyncio
+    async def test_run_returns_result_on_pool_thread(self):
+        pool = InstrumentedExecutor("test", 1)
+        name = await pool.run(lambda: threading.current_thread().name)
+        assert name.startswith("jarvis-test")
+        assert pool.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_exceptions_propagate_and_count(self):
+        pool = InstrumentedExecutor("test", 1)
+
+        def boom():
+            raise ValueError("nope")
+
+        with pytest.raises(ValueError):
+            await pool.run(boom)
+        assert pool.stats()["failed"] == 1
+        assert pool.stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_measured(self):
+        """A second job on a single-thread pool waits for the first."""
+        pool = InstrumentedExecutor("test", 1)
+        await asyncio.gather(pool.run(time.sleep, 0.05), pool.run(time.sleep, 0.0))
+        stats = pool.stats()
+        assert stats["max_pending"] == 2
+        assert stats["queue_wait_ms"]["max"] >= 40
+
+    @pytest.mark.asyncio
+    async def test_context_variables_carried(self):
+        var = contextvars.ContextVar("var", default=None)
+        var.set("session-1")
+        pool = InstrumentedExecutor("test", 1)
+        assert await pool.run(var.get) == "session-1"
+
+    @pytest.mark.asyncio
+    async def test_busy_pool_does_not_delay_another(self):
+        """Saturating one pool with slow calls leaves a separate pool's wait near zero."""
+        tools = InstrumentedExecutor("tools-test", 2)
+        audio = InstrumentedExecutor("audio-test", 2)
+        slow = [tools.run(time.sleep, 0.1) for _ in range(6)]
+        fast = [audio.run(time.sleep, 0.001) for _ in range(5)]
+        await asyncio.gather(*slow, *fast)
+        assert tools.stats()["queue_wait_ms"]["max"] >= 90
+        assert audio.stats()["queue_wait_ms"]["max"] < 50
+
+
+class TestRegistry:
+    """Test the process-wide named pools."""
+
+    def test_get_executor_is_shared(self):
+        assert get_executor(AUDIO) is get_executor(AUDIO)
+        assert get_executor(AUDIO).max_workers == 4
+        assert AUDIO in executor_stats()
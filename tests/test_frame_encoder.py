@@ -0,0 +1,53 @@
+"""
+Tests for OpenCV-based frame encoding.
+"""
+import base64
+
+import numpy as np
+import pytest
+
+# Try to import OpenCV, skip all tests if missing
+try:
+    import cv2
+    from frame_encoder import encode_frame_payload, encode_jpeg, fit_within
+    HAS_CV2 = True
+except ImportError as e:
+    HAS_CV2 = False
+    IMPORT_ERROR = str(e)
+
+pytestmark = pytest.mark.skipif(not HAS_CV2, reason=f"OpenCV not installed: {IMPORT_ERROR if not HAS_CV2 else ''}")
+
+
+def frame(width, height):
+    return np.full((height, width, 3), 128, dtype=np.uint8)
+
+
+class TestFitWithin:
+    """Test the downscale step."""
+
+    def test_keeps_aspect_ratio(self):
+        """The longer side is capped and the aspect ratio kept."""
+        out = fit_within(frame(1920, 1080), 1024)
+        assert out.shape[:2] == (576, 1024)
+
+    def test_never_upscales(self):
+        """Small frames are returned untouched."""
+        small = frame(320, 240)
+        assert fit_within(small, 1024) is small
+
+
+class TestEncode:
+    """Test JPEG output."""
+
+    def test_payload_decodes(self):
+        """The payload is a base64 JPEG of the resized frame."""
+        payload = encode_frame_payload(frame(2048, 1024), max_size=512, quality=70)
+        assert payload["mime_type"] == "image/jpeg"
+        jpeg = base64.b64decode(payload["data"])
+        decoded = cv2.imdecode(np.frombuffer(jpeg, np.uint8), cv2.IMREAD_COLOR)
+        assert decoded.shape[:2] == (256, 512)
+
+    def test_quality_controls_size(self):
+        """Lower quality gives a smaller file for a detailed frame."""
+        noisy = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+        assert len(encode_jpeg(noisy, quality=30)) < len(encode_jpeg(noisy, quality=95))
@@ -0,0 +1,71 @@
+"""
+Tests for latest-only ingestion of frontend video frames.
+"""
+import base64
+
+from frame_ingest import FrameIngest
+
+
+class TestFrameIngest:
+    """Test the latest-frame slot."""
+
+    def test_keeps_latest_only(self):
+        """Each push replaces the previous frame."""
+        ingest = FrameIngest()
+        ingest.push(b"\xff\xd8one")
+        ingest.push(b"\xff\xd8two")
+        seq, _, data = ingest.latest()
+        assert seq == 2
+        assert data == b"\xff\xd8two"
+        assert ingest.frames_received == 2
+
+    def test_replaced_counts_unused_frames(self):
+        """Only frames overwritten before anyone looked at them count as replaced."""
+        ingest = FrameIngest()
+        ingest.push(b"a")
+        ingest.push(b"b")
+        ingest.mark_used(ingest.latest()[0])
+        ingest.push(b"c")
+        assert ingest.frames_replaced == 1
+        assert ingest.frames_used == 1
+
+    def test_mark_used_once_per_frame(self):
+        """Looking at the same frame twice counts it once."""
+        ingest = FrameIngest()
+        ingest.push(b"a")
+        ingest.mark_used(1)
+        ingest.mark_used(1)
+        assert ingest.frames_used == 1
+
+    def test_accepts_base64_text(self):
+        """Older clients sending base64 strings are stored as raw JPEG bytes."""
+        ingest = FrameIngest()
+        assert ingest.push(base64.b64encode(b"\xff\xd8jpeg").decode())
+        assert ingest.latest()[2] == b"\xff\xd8jpeg"
+
+    def test_rejects_empty_and_invalid(self):
+        """Empty payloads, bad base64 and non-frame data are ignored."""
+        ingest = FrameIngest()
+        assert not ingest.push(b"")
+        assert not ingest.push("not base64!")
+        assert not ingest.push({"image": 1})
+        assert ingest.latest() is None
+        assert ingest.frames_received == 0
+
+    def test_payload_is_deferred_base64(self):
+        """The realtime payload is produced only on request, from the stored bytes."""
+        payload = FrameIngest.to_payload(b"\xff\xd8jpeg")
+        assert payload["mime_type"] == "image/jpeg"
+        assert base64.b64decode(payload["data"]) == b"\xff\xd8jpeg"
+
+    def test_clear_and_stats(self):
+        """Stats report the target rate; clear drops the stored frame."""
+        ingest = FrameIngest(target_fps=2.0)
+        ingest.push(b"abc")
+        stats = ingest.stats()
+        assert stats["target_fps"] == 2.0
+        assert stats["bytes_received"] == 3
+        assert stats["latest_age_s"] is not None
+        ingest.clear()
+        assert ingest.latest() is None
+        assert ingest.stats()["latest_age_s"] is None
@@ -0,0 +1,103 @@
+"""
+Tests for the background job supervisor.
+"""
+import asyncio
+
+import pytest
+
+from job_supervisor import JobSupervisor
+from tool_registry import ToolRegistry
+
+
+def job_states(supervisor):
+    return {row["id"]: row["state"] for row in supervisor.table()}
+
+
+class TestJobSupervisor:
+    """Test job lifecycle, limits and cancellation."""
+
+    @pytest.mark.asyncio
+    async def test_lifecycle_and_table(self):
+        """A job goes queued -> running -> done and stays in the table as history."""
+        tables = []
+        supervisor = JobSupervisor(on_change=tables.append)
+        release = asyncio.Event()
+        job = supervisor.submit("generate_cad", release.wait, label="prompt=a gear")
+        await asyncio.sleep(0)
+        assert job_states(supervisor)[job.id] == "running"
+        release.set()
+        await job.task
+        row = supervisor.table()[0]
+        assert row["state"] == "done"
+        assert row["label"] == "prompt=a gear"
+        assert row["duration_s"] is not None
+        assert [t[0]["state"] for t in tables] == ["queued", "running", "done"]
+
+    @pytest.mark.asyncio
+    async def test_per_kind_limit(self):
+        """With a limit of 1 the second job of that kind waits; other kinds don't."""
+        supervisor = JobSupervisor(limits={"generate_cad": 1})
+        release = asyncio.Event()
+        first = supervisor.submit("generate_cad", release.wait)
+        second = supervisor.submit("generate_cad", release.wait)
+        other = supervisor.submit("read_file", release.wait)
+        await asyncio.sleep(0.01)
+        states = job_states(supervisor)
+        assert states[first.id] == "running"
+        assert states[second.id] == "queued"
+        assert states[other.id] == "running"
+        release.set()
+        await asyncio.gather(first.task, second.task, other.task)
+        assert supervisor.stats()["done"] == 3
+
+    @pytest.mark.asyncio
+    async def test_failure_recorded(self):
+        """Exceptions end up on the job instead of being lost."""
+        async def boom():
+            raise RuntimeError("CadQuery crashed")
+
+        supervisor = JobSupervisor()
+        job = supervisor.submit("generate_cad", boom)
+        await job.task
+        assert job.state == "failed"
+        assert job.error == "CadQuery crashed"
+        assert supervisor.stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_and_session_end(self):
+        """Single jobs can be cancelled; session end only cancels the configured kinds."""
+        supervisor = JobSupervisor(cancel_on_reconnect=("read_file",))
+        forever = asyncio.Event().wait
+        cad = supervisor.submit("generate_cad", forever)
+        read = supervisor.submit("read_file", forever)
+        web = supervisor.submit("run_web_agent", forever)
+        await asyncio.sleep(0)
+        assert supervisor.cancel(web.id)
+        await web.task
+        assert web.state == "cancelled"
+        await supervisor.session_ended()
+        assert read.state == "cancelled"
+        assert cad.state == "running"
+        await supervisor.cancel_all()
+        assert cad.state == "cancelled"
+        assert not supervisor.cancel(cad.id)
+
+
+class TestRegistryJobs:
+    """Test background tools running under the supervisor."""
+
+    @pytest.mark.asyncio
+    async def test_background_tool_becomes_job(self):
+        async def handler(args):
+            raise ValueError("bad path")
+
+        supervisor = JobSupervisor()
+        reg = ToolRegistry(supervisor=supervisor)
+        reg.register("write_file", handler, background=True, ack="Writing file...")
+        assert await reg.call("write_file", {"path": "a.txt", "content": "x"}) == "Writing file..."
+        rows = supervisor.table()
+        assert rows[0]["kind"] == "write_file"
+        assert "path=a.txt" in rows[0]["label"]
+        await asyncio.sleep(0.01)
+        assert supervisor.table()[0]["state"] == "failed"
+        assert reg.stats()["tools"]["write_file"]["errors"] == 1
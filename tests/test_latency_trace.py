@@ -0,0 +1,130 @@
+"""
+Tests for per-turn voice latency tracing.
+"""
+import builtins
+import json
+import threading
+
+from latency_trace import LatencyHistogram, LatencyTracer, percentile
+
+
+class TestPercentile:
+    """Test the nearest-rank percentile helper."""
+
+    def test_percentiles(self):
+        """p50/p99 pick the expected samples."""
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 51
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) is None
+
+    def test_histogram_window(self):
+        """The count keeps growing while percentiles use the recent window."""
+        hist = LatencyHistogram(window=3)
+        for ms in (1000, 10, 20, 30):
+            hist.add(ms)
+        out = hist.to_dict()
+        assert out["count"] == 4
+        assert out["max"] == 30
+
+
+class TestLatencyTracer:
+    """Test turn lifecycle and mark bookkeeping."""
+
+    def test_full_turn(self, tmp_path):
+        """Marks are measured from when the voice stopped and written to the trace."""
+        tracer = LatencyTracer(trace_dir=str(tmp_path))
+        tracer.start_session()
+        tracer.audio_queued(2048, now=10.0)
+        tracer.audio_queued(2048, now=10.5)
+        tracer.speech_end(at=10.0, now=10.5)
+        tracer.audio_sent(2048, now=10.1)
+        tracer.mark("first_audio", now=11.0)
+        tracer.mark("first_audio", now=11.5)
+        tracer.mark("first_playback", now=11.1)
+        tracer.turn_complete(now=12.0)
+
+        assert tracer.turns == 1
+        row = tracer.recent[-1]
+        assert row["speech_end_sent_ms"] == 100.0
+        assert row["first_audio_ms"] == 1000.0
+        assert row["first_playback_ms"] == 1100.0
+        assert row["turn_complete_ms"] == 2000.0
+
+        tracer.flush()
+        lines = (tmp_path / tracer.trace_path.split("/")[-1]).read_text().splitlines()
+        assert json.loads(lines[0])["first_audio_ms"] == 1000.0
+        assert tracer.summary()["latency_ms"]["first_audio"]["p50"] == 1000.0
+
+    def test_send_before_speech_end_event(self):
+        """Audio already sent when the VAD hangover expires still gets its mark."""
+        tracer = LatencyTracer()
+        tracer.audio_queued(2048, now=5.0)
+        tracer.audio_sent(2048, now=5.02)
+        tracer.speech_end(at=5.0, now=5.5)
+        tracer.mark("first_audio", now=6.0)
+        tracer.mark("first_playback", now=6.1)
+        tracer.turn_complete(now=6.5)
+        assert tracer.recent[-1]["speech_end_sent_ms"] == 20.0
+
+    def test_pause_restarts_unanswered_turn(self):
+        """A second speech end before any response restarts the clock."""
+        tracer = LatencyTracer()
+        tracer.speech_end(at=1.0, now=1.5)
+        tracer.speech_end(at=3.0, now=3.5)
+        tracer.mark("first_audio", now=4.0)
+        tracer.mark("first_playback", now=4.1)
+        tracer.turn_complete(now=5.0)
+        assert tracer.turns == 1
+        assert tracer.recent[-1]["first_audio_ms"] == 1000.0
+
+    def test_turn_waits_for_playback(self):
+        """A completed turn stays open until its first audio reaches the speaker."""
+        tracer = LatencyTracer()
+        tracer.speech_end(at=1.0, now=1.5)
+        tracer.mark("first_audio", now=2.0)
+        tracer.turn_complete(now=2.5)
+        assert tracer.turns == 0
+        tracer.mark("first_playback", now=3.0)
+        assert tracer.turns == 1
+        assert tracer.recent[-1]["first_playback_ms"] == 2000.0
+
+    def test_barge_in_closes_turn(self):
+        """Speaking over a response ends that turn as interrupted."""
+        tracer = LatencyTracer()
+        tracer.speech_end(at=1.0, now=1.5)
+        tracer.mark("first_audio", now=2.0)
+        tracer.speech_end(at=4.0, now=4.5)
+        assert tracer.turns == 1
+        assert tracer.interrupted_turns == 1
+        assert tracer.recent[-1]["end"] == "barge_in"
+
+    def test_events_without_turn_ignored(self):
+        """Responses not preceded by speech (e.g. the start message) are not traced."""
+        tracer = LatencyTracer()
+        tracer.mark("first_audio", now=1.0)
+        tracer.turn_complete(now=2.0)
+        assert tracer.turns == 0
+
+    def test_trace_written_off_caller_thread(self, tmp_path, monkeypatch):
+        """Finishing a turn queues its line; the writer thread appends it."""
+        writers = []
+        real_open = builtins.open
+
+        def recording_open(file, *args, **kwargs):
+            if str(file).endswith(".jsonl"):
+                writers.append(threading.current_thread().name)
+            return real_open(file, *args, **kwargs)
+
+        monkeypatch.setattr(builtins, "open", recording_open)
+        tracer = LatencyTracer(trace_dir=str(tmp_path))
+        tracer.start_session()
+        for turn in range(3):
+            tracer.speech_end(at=turn * 10.0, now=turn * 10.0 + 0.5)
+            tracer.mark("first_audio", now=turn * 10.0 + 1.0)
+            tracer.mark("first_playback", now=turn * 10.0 + 1.1)
+            tracer.turn_complete(now=turn * 10.0 + 2.0)
+        tracer.flush()
+        assert writers and set(writers) == {"latency-trace-writer"}
+        rows = [json.loads(line) for line in real_open(tracer.trace_path).read().splitlines()]
+        assert [row["turn"] for row in rows] == [1, 2, 3]
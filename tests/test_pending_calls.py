@@ -0,0 +1,83 @@
+"""
+Tests for confirmation-gated tool calls.
+"""
+import asyncio
+
+import pytest
+
+from pending_calls import PendingCallManager
+
+
+class Recorder:
+    def __init__(self):
+        self.results = []
+        self.done = asyncio.Event()
+
+    async def __call__(self, confirmed, reason):
+        self.results.append((confirmed, reason))
+        self.done.set()
+
+
+class TestPendingCallManager:
+    """Test parking, answering and expiring confirmations."""
+
+    @pytest.mark.asyncio
+    async def test_park_returns_immediately_and_notifies(self):
+        """Parking doesn't wait for the user; the request is forwarded with its id."""
+        requests = []
+        manager = PendingCallManager(timeout=10, on_request=requests.append)
+        rec = Recorder()
+        request_id = manager.park("kill_process", {"pid": 1}, rec)
+        assert request_id in manager
+        assert requests == [{"id": request_id, "tool": "kill_process", "args": {"pid": 1}, "timeout": 10}]
+        assert rec.results == []
+        manager.cancel_all()
+
+    @pytest.mark.asyncio
+    async def test_user_confirms(self):
+        """The callback runs with the user's answer."""
+        manager = PendingCallManager(timeout=10)
+        rec = Recorder()
+        request_id = manager.park("write_file", {}, rec)
+        assert manager.resolve(request_id, True)
+        await asyncio.wait_for(rec.done.wait(), 1.0)
+        assert rec.results == [(True, "user")]
+        assert len(manager) == 0
+        assert manager.stats()["confirmed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_resolve_twice_or_unknown(self):
+        """Only the first answer counts; unknown ids are rejected."""
+        manager = PendingCallManager(timeout=10)
+        rec = Recorder()
+        request_id = manager.park("write_file", {}, rec)
+        assert manager.resolve(request_id, False)
+        assert not manager.resolve(request_id, True)
+        assert not manager.resolve("nope", True)
+        await asyncio.wait_for(rec.done.wait(), 1.0)
+        assert rec.results == [(False, "user")]
+
+    @pytest.mark.asyncio
+    async def test_timeout_auto_denies(self):
+        """No answer within the timeout counts as a denial and is reported as expired."""
+        expired = []
+        manager = PendingCallManager(timeout=0.05, on_expired=expired.append)
+        rec = Recorder()
+        request_id = manager.park("print_stl", {}, rec)
+        await asyncio.wait_for(rec.done.wait(), 1.0)
+        assert rec.results == [(False, "timeout")]
+        assert expired == [{"id": request_id, "tool": "print_stl", "reason": "timeout"}]
+        assert manager.stats()["expired"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_all(self):
+        """Ending a session denies everything still waiting."""
+        manager = PendingCallManager(timeout=None)
+        recs = [Recorder(), Recorder()]
+        for rec in recs:
+            manager.park("write_file", {}, rec)
+        manager.cancel_all("session_ended")
+        for rec in recs:
+            await asyncio.wait_for(rec.done.wait(), 1.0)
+            assert rec.results == [(False, "session_ended")]
+        assert len(manager) == 0
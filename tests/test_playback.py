@@ -0,0 +1,90 @@
+"""
+Tests for the jitter-buffered playback engine.
+"""
+import pytest
+
+# Try to import the playback module, skip all tests if dependencies missing
+try:
+    import pyaudio
+    from playback import PlaybackEngine
+    HAS_PLAYBACK = True
+except ImportError as e:
+    HAS_PLAYBACK = False
+    IMPORT_ERROR = str(e)
+
+pytestmark = pytest.mark.skipif(not HAS_PLAYBACK, reason=f"Audio dependencies not installed: {IMPORT_ERROR if not HAS_PLAYBACK else ''}")
+
+RATE = 24000
+FRAMES = 480  # 20 ms
+
+
+def pull(engine, status=0):
+    data, flag = engine._callback(None, FRAMES, {}, status)
+    assert flag == pyaudio.paContinue
+    return data
+
+
+def tone(ms, value=b"\x10\x00"):
+    return value * int(RATE * ms / 1000)
+
+
+class TestJitterBuffer:
+    """Test priming, underruns and end-of-turn handling."""
+
+    @pytest.mark.asyncio
+    async def test_waits_for_jitter_target(self):
+        """Silence is output until the jitter target is buffered."""
+        engine = PlaybackEngine(None, rate=RATE, jitter_target=0.06)
+        await engine.write(tone(40))
+        assert pull(engine) == b"\x00" * FRAMES * 2
+        await engine.write(tone(40))
+        assert pull(engine) == tone(20)
+        assert engine.stats()["buffer_depth_ms"] == pytest.approx(60.0)
+
+    @pytest.mark.asyncio
+    async def test_underrun_counted_mid_turn_only(self):
+        """Running dry mid-turn is an underrun; at end of turn it is not."""
+        engine = PlaybackEngine(None, rate=RATE, jitter_target=0.02)
+        await engine.write(tone(30))
+        pull(engine)
+        pull(engine)
+        assert engine.underruns == 1
+
+        await engine.write(tone(30))
+        engine.mark_end_of_turn()
+        pull(engine)
+        pull(engine)
+        assert engine.underruns == 1
+
+    def test_device_underflow_flag(self):
+        """paOutputUnderflow from PortAudio is counted."""
+        engine = PlaybackEngine(None, rate=RATE)
+        pull(engine, status=pyaudio.paOutputUnderflow)
+        assert engine.stats()["device_underflows"] == 1
+
+
+class TestBargeIn:
+    """Test interrupt behaviour."""
+
+    @pytest.mark.asyncio
+    async def test_interrupt_silences_next_buffer(self):
+        """After interrupt() the very next callback outputs silence and drops the backlog."""
+        engine = PlaybackEngine(None, rate=RATE, jitter_target=0.02)
+        await engine.write(tone(1000))
+        assert pull(engine) != b"\x00" * FRAMES * 2
+        engine.interrupt()
+        assert pull(engine) == b"\x00" * FRAMES * 2
+        stats = engine.stats()
+        assert stats["buffer_depth_ms"] == 0
+        assert stats["interrupts"] == 1
+        assert stats["interrupt_to_silence_ms"]["last"] is not None
+
+    @pytest.mark.asyncio
+    async def test_audio_written_after_interrupt_survives(self):
+        """Only audio written before the interrupt is discarded."""
+        engine = PlaybackEngine(None, rate=RATE, jitter_target=0.02)
+        await engine.write(tone(100))
+        engine.interrupt()
+        await engine.write(tone(40, b"\x20\x00"))
+        pull(engine)
+        assert pull(engine) == tone(20, b"\x20\x00")
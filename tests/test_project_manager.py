@@ -0,0 +1,39 @@
+"""
+Tests for ProjectManager session views and scratch projects.
+"""
+from project_manager import SCRATCH_DIR, ProjectManager
+
+
+class TestViews:
+    """Test per-session views of the shared workspace."""
+
+    def test_scratch_views_are_separate(self, tmp_path):
+        root = ProjectManager(str(tmp_path))
+        a = root.scratch_view("a")
+        b = root.scratch_view("b")
+        assert (tmp_path / "projects" / SCRATCH_DIR / "a" / "cad").is_dir()
+        a.log_chat("User", "hello from a")
+        assert (a.get_current_project_path() / "chat_history.jsonl").exists()
+        assert not (b.get_current_project_path() / "chat_history.jsonl").exists()
+        assert root.current_project == "temp"
+        assert a.is_scratch() and root.is_scratch()
+        assert SCRATCH_DIR not in root.list_projects()
+
+    def test_scratch_id_sanitized(self, tmp_path):
+        view = ProjectManager(str(tmp_path)).scratch_view("../x")
+        assert view.get_current_project_path() == tmp_path / "projects" / SCRATCH_DIR / "x"
+
+    def test_user_projects_are_not_scratch(self, tmp_path):
+        """Names like temp_sensor are ordinary projects: kept at startup, never used as scratch space."""
+        root = ProjectManager(str(tmp_path))
+        root.create_project("temp_sensor")
+        view = root.scratch_view("sensor")
+        assert view.switch_project("temp_sensor")[0] and not view.is_scratch()
+        root.create_project(SCRATCH_DIR) # sanitized to an ordinary "sessions" project
+        assert "sessions" in root.list_projects() and SCRATCH_DIR not in root.list_projects()
+        assert not root.switch_project(f"{SCRATCH_DIR}/sensor")[0]
+
+        ProjectManager(str(tmp_path))
+        assert (tmp_path / "projects" / "temp_sensor").is_dir()
+        assert not (tmp_path / "projects" / SCRATCH_DIR).exists()
+        assert (tmp_path / "projects" / "temp").is_dir()
@@ -0,0 +1,120 @@
+"""
+Tests for the coalescing realtime sender.
+"""
+import asyncio
+
+import pytest
+
+from realtime_sender import OutboundScheduler, RealtimeSender, coalesce_pcm
+
+
+def pcm(n, fill=b"\x00"):
+    return {"data": fill * n, "mime_type": "audio/pcm"}
+
+
+def jpeg(tag):
+    return {"data": tag, "mime_type": "image/jpeg"}
+
+
+class TestCoalescePcm:
+    """Test merging of adjacent PCM chunks."""
+
+    def test_merges_adjacent_pcm(self):
+        """Adjacent PCM chunks become one payload in order."""
+        out = coalesce_pcm([pcm(2, b"a"), pcm(2, b"b"), pcm(2, b"c")], max_pcm_bytes=100)
+        assert len(out) == 1
+        msg, count = out[0]
+        assert msg["data"] == b"aabbcc"
+        assert count == 3
+
+    def test_respects_byte_budget(self):
+        """A run is split once it would exceed the budget."""
+        out = coalesce_pcm([pcm(4), pcm(4), pcm(4)], max_pcm_bytes=8)
+        assert [count for _, count in out] == [2, 1]
+
+    def test_non_pcm_breaks_run(self):
+        """Images keep their position between audio runs."""
+        image = {"data": "b64", "mime_type": "image/jpeg"}
+        out = coalesce_pcm([pcm(2, b"a"), image, pcm(2, b"b")], max_pcm_bytes=100)
+        assert [m for m, _ in out] == [pcm(2, b"a"), image, pcm(2, b"b")]
+
+
+class TestRealtimeSender:
+    """Test the queue draining loop."""
+
+    @pytest.mark.asyncio
+    async def test_backlog_sent_in_one_call(self):
+        """A queued backlog is drained and sent as one merged payload."""
+        queue = asyncio.Queue()
+        for i in range(5):
+            queue.put_nowait(pcm(2048))
+        sent = []
+
+        async def send(msg):
+            sent.append(msg)
+
+        sender = RealtimeSender(sample_rate=16000, latency_budget=1.0)
+        task = asyncio.create_task(sender.run(queue, send))
+        await asyncio.sleep(0.01)
+        task.cancel()
+
+        assert len(sent) == 1
+        assert len(sent[0]["data"]) == 5 * 2048
+        stats = sender.stats.to_dict()
+        assert stats["messages_in"] == 5
+        assert stats["sends"] == 1
+        assert stats["max_batch_chunks"] == 5
+
+
+class TestOutboundScheduler:
+    """Test lane priority and latest-only images."""
+
+    def test_audio_before_image(self):
+        """Audio queued after an image is still dequeued first."""
+        sched = OutboundScheduler()
+        sched.put_nowait(jpeg("frame"))
+        sched.put_nowait(pcm(2, b"a"))
+        sched.put_nowait(pcm(2, b"b"))
+        assert [sched.get_nowait()["mime_type"] for _ in range(3)] == ["audio/pcm", "audio/pcm", "image/jpeg"]
+        assert sched.empty()
+
+    def test_stale_image_replaced(self):
+        """Only the newest waiting frame is sent; the replaced one counts as dropped."""
+        sched = OutboundScheduler()
+        sched.put_nowait(jpeg("old"))
+        sched.put_nowait(jpeg("new"))
+        assert sched.qsize() == 1
+        assert sched.get_nowait()["data"] == "new"
+        stats = sched.stats()["image"]
+        assert stats["dropped"] == 1
+        assert stats["dequeued"] == 1
+
+    @pytest.mark.asyncio
+    async def test_audio_lane_backpressure(self):
+        """put() waits while the audio lane is full, images never block."""
+        sched = OutboundScheduler(audio_maxsize=1)
+        await sched.put(pcm(2))
+        await asyncio.wait_for(sched.put(jpeg("frame")), 0.1)
+        blocked = asyncio.create_task(sched.put(pcm(2)))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        sched.get_nowait()
+        await asyncio.wait_for(blocked, 0.1)
+        assert sched.stats()["audio"]["depth"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sender_drains_scheduler(self):
+        """The sender merges the audio lane and sends the image after it."""
+        sched = OutboundScheduler()
+        sched.put_nowait(jpeg("frame"))
+        for fill in (b"a", b"b"):
+            sched.put_nowait(pcm(2, fill))
+        sent = []
+
+        async def send(msg):
+            sent.append(msg)
+
+        task = asyncio.create_task(RealtimeSender(latency_budget=1.0).run(sched, send))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        assert sent == [{"data": b"aabb", "mime_type": "audio/pcm"}, jpeg("frame")]
@@ -0,0 +1,60 @@
+"""
+Tests for the downmix + polyphase resampler.
+"""
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from resampler import PolyphaseResampler
+
+
+def tone(rate, seconds=1.0, freq=1000.0, amplitude=8000, channels=1):
+    t = np.arange(int(rate * seconds)) / rate
+    samples = (amplitude * np.sin(2 * np.pi * freq * t)).astype("<i2")
+    return np.repeat(samples, channels).tobytes()
+
+
+def stream(resampler, data, chunk_bytes):
+    return b"".join(resampler.process(data[i:i + chunk_bytes]) for i in range(0, len(data), chunk_bytes))
+
+
+def peak_frequency(pcm, rate, skip=2000):
+    y = np.frombuffer(pcm, dtype="<i2").astype(np.float64)[skip:]
+    spectrum = np.abs(np.fft.rfft(y))
+    return np.argmax(spectrum) * rate / len(y)
+
+
+class TestPolyphaseResampler:
+    """Test rate conversion, downmix and streaming state."""
+
+    @pytest.mark.parametrize("rate,channels", [(48000, 2), (44100, 2), (44100, 1), (22050, 1)])
+    def test_native_rates_to_16k(self, rate, channels):
+        """One second in gives one second of 16 kHz mono out with the tone preserved."""
+        resampler = PolyphaseResampler(rate, 16000, channels)
+        out = stream(resampler, tone(rate, channels=channels), 3072 * channels)
+        assert abs(len(out) // 2 - 16000) <= 1
+        assert peak_frequency(out, 16000) == pytest.approx(1000, abs=5)
+
+    def test_chunked_matches_one_shot(self):
+        """Carrying filter state across chunks gives the same output as one call."""
+        data = tone(44100, channels=2)
+        chunked = stream(PolyphaseResampler(44100, 16000, 2), data, 2822 * 4)
+        one_shot = PolyphaseResampler(44100, 16000, 2).process(data)
+        assert chunked == one_shot
+
+    def test_passthrough_and_downmix(self):
+        """16 kHz mono passes through untouched; 16 kHz stereo is averaged."""
+        mono = tone(16000, seconds=0.1)
+        assert PolyphaseResampler(16000, 16000, 1).process(mono) == mono
+
+        left = np.full(100, 1000, dtype="<i2")
+        right = np.full(100, 3000, dtype="<i2")
+        stereo = np.column_stack((left, right)).ravel().tobytes()
+        out = np.frombuffer(PolyphaseResampler(16000, 16000, 2).process(stereo), dtype="<i2")
+        assert (out == 2000).all()
+
+    def test_anti_aliasing(self):
+        """Content above the new Nyquist (8 kHz) is strongly attenuated."""
+        resampler = PolyphaseResampler(48000, 16000, 1)
+        out = np.frombuffer(resampler.process(tone(48000, freq=12000)), dtype="<i2")
+        assert np.abs(out[500:]).max() < 8000 * 0.05
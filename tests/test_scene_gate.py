@@ -0,0 +1,82 @@
+"""
+Tests for the scene-change gate on vision frames.
+"""
+import numpy as np
+import pytest
+
+# Try to import OpenCV, skip all tests if missing
+try:
+    import cv2
+    from scene_gate import SceneGate, frame_signature, signature_distance
+    HAS_CV2 = True
+except ImportError as e:
+    HAS_CV2 = False
+    IMPORT_ERROR = str(e)
+
+pytestmark = pytest.mark.skipif(not HAS_CV2, reason=f"OpenCV not installed: {IMPORT_ERROR if not HAS_CV2 else ''}")
+
+
+def scene(seed, noise=0.0, brightness=0):
+    """A blocky 'room' image, optionally with sensor noise and an exposure shift."""
+    rng = np.random.default_rng(seed)
+    blocks = rng.integers(30, 220, (6, 8, 3)).astype(np.float32)
+    img = cv2.resize(blocks, (640, 480), interpolation=cv2.INTER_NEAREST)
+    if noise:
+        img += np.random.default_rng(seed + 100).normal(0, noise, img.shape)
+    return np.clip(img + brightness, 0, 255).astype(np.uint8)
+
+
+class TestSignature:
+    """Test the comparison thumbnail."""
+
+    def test_noise_and_exposure_are_small(self):
+        """Sensor noise and a global brightness shift stay well under the default threshold."""
+        base = frame_signature(scene(1))
+        assert signature_distance(base, frame_signature(scene(1, noise=8))) < 0.01
+        assert signature_distance(base, frame_signature(scene(1, brightness=20))) < 0.01
+
+    def test_new_scene_is_large(self):
+        """A different scene is far above the threshold."""
+        assert signature_distance(frame_signature(scene(1)), frame_signature(scene(2))) > 0.1
+
+
+class TestSceneGate:
+    """Test gating and counters."""
+
+    def test_suppresses_unchanged_frames(self):
+        """Only frames that differ from the last sent one pass."""
+        gate = SceneGate(threshold=0.03)
+        assert gate.changed(gate.signature(scene(1)))
+        gate.mark_sent(gate.signature(scene(1)), "vad_onset")
+        assert not gate.changed(gate.signature(scene(1, noise=5)))
+        gate.record("vad_onset", False)
+        assert gate.changed(gate.signature(scene(2)))
+        gate.mark_sent(gate.signature(scene(2)), "user_input")
+        stats = gate.stats()
+        assert stats["sent"] == 2
+        assert stats["suppressed"] == 1
+        assert stats["by_source"]["vad_onset"] == {"sent": 1, "suppressed": 1}
+
+    def test_failed_send_not_suppressed(self):
+        """A frame that was checked but never sent doesn't hide the scene."""
+        gate = SceneGate()
+        sig = gate.signature(scene(5))
+        assert gate.changed(sig)
+        # send failed: no mark_sent
+        assert gate.changed(gate.signature(scene(5, noise=5)))
+
+    def test_jpeg_input(self):
+        """Frames pushed as JPEG compare against raw frames of the same scene."""
+        gate = SceneGate()
+        ok, jpeg = cv2.imencode(".jpg", scene(3))
+        gate.mark_sent(gate.signature(scene(3)), "vad_onset")
+        assert not gate.changed(gate.jpeg_signature(jpeg.tobytes()))
+
+    def test_reset_sends_next_frame(self):
+        """After a reconnect the model gets the current scene again."""
+        gate = SceneGate()
+        sig = gate.signature(scene(4))
+        gate.mark_sent(sig, "vad_onset")
+        assert not gate.changed(sig)
+        gate.reset()
+        assert gate.changed(sig)
@@ -0,0 +1,75 @@
+"""
+Tests for tile-delta screen capture.
+"""
+import numpy as np
+import pytest
+
+# screen_capture needs OpenCV; skip all tests if it is missing
+try:
+    from screen_capture import ScreenCapturer
+    HAS_CV2 = True
+except ImportError as e:
+    HAS_CV2 = False
+    IMPORT_ERROR = str(e)
+
+pytestmark = pytest.mark.skipif(not HAS_CV2, reason=f"OpenCV not installed: {IMPORT_ERROR if not HAS_CV2 else ''}")
+
+
+def screen(width=1280, height=768):
+    """BGRA frame like mss returns."""
+    img = np.full((height, width, 4), 40, dtype=np.uint8)
+    img[100:300, 100:600, :3] = 200
+    return img
+
+
+class TestChangeDetection:
+    """Test tile diffing and send decisions."""
+
+    def test_unchanged_screen_not_sent(self):
+        """The first grab is sent, an identical one is skipped."""
+        frames = iter([screen(), screen()])
+        capturer = ScreenCapturer(grab=lambda: next(frames))
+        assert capturer.capture() is not None
+        assert capturer.capture() is None
+        assert capturer.frames_sent == 1
+        assert capturer.frames_skipped == 1
+
+    def test_small_region_change_sent(self):
+        """A change in a few tiles (e.g. a new line of text) is enough."""
+        changed = screen()
+        changed[600:640, 100:400, :3] = 255
+        frames = iter([screen(), changed])
+        capturer = ScreenCapturer(grab=lambda: next(frames), change_threshold=0.005)
+        capturer.capture()
+        payload, bgr = capturer.capture()
+        assert payload["mime_type"] == "image/jpeg"
+        assert bgr.shape == (768, 1280, 3)
+        assert 0 < capturer.last_change < 0.1
+
+    def test_reset_resends(self):
+        """After reset() the next grab counts as fully changed."""
+        capturer = ScreenCapturer(grab=screen)
+        capturer.capture()
+        capturer.reset()
+        assert capturer.capture() is not None
+
+
+class TestAdaptation:
+    """Test the rate/resolution controller."""
+
+    def test_slow_ticks_lower_fps_then_size(self):
+        """Over budget: fps drops to its floor before resolution is reduced."""
+        capturer = ScreenCapturer(fps=1.0, min_fps=0.5, max_size=1024, min_size=512, cpu_budget=0.1)
+        for _ in range(10):
+            capturer.adapt(1.0)
+        assert capturer.fps == 0.5
+        assert capturer.size < 1024
+
+    def test_fast_ticks_recover(self):
+        """With headroom, resolution recovers first, then fps rises to its cap."""
+        capturer = ScreenCapturer(fps=0.5, max_fps=2.0, max_size=1024)
+        capturer.size = 600
+        for _ in range(20):
+            capturer.adapt(0.0)
+        assert capturer.size == 1024
+        assert capturer.fps == 2.0
@@ -0,0 +1,142 @@
+"""
+Tests for the concurrent session manager.
+"""
+import asyncio
+
+import pytest
+
+from session_manager import SessionLimitError, SessionManager
+
+
+class FakeLoop:
+    """Stands in for AudioLoop: run() until stop(), plus the usage getter."""
+
+    def __init__(self, fail=False):
+        self.stop_event = asyncio.Event()
+        self.fail = fail
+
+    async def run(self):
+        if self.fail:
+            raise RuntimeError("connection refused")
+        await self.stop_event.wait()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def get_usage(self):
+        return {"voice_turns": 3, "tool_calls": 1}
+
+
+class FakeFanout:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def stats(self):
+        return {"bytes_in": 100, "bytes_out": 40}
+
+
+class TestAdmission:
+    """Test the session limit and the exclusive local-audio lease."""
+
+    @pytest.mark.asyncio
+    async def test_limit(self):
+        manager = SessionManager(max_sessions=2)
+        manager.start("a", FakeLoop(), audio_io=False)
+        manager.start("b", FakeLoop(), audio_io=False)
+        assert manager.admit("c", audio_io=False) == "Session limit reached (2 running)"
+        with pytest.raises(SessionLimitError):
+            manager.start("c", FakeLoop(), audio_io=False)
+        assert manager.stats()["rejected"] == 2
+        await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_one_local_audio_session(self):
+        """A second session can run, but not on the machine's mic/speaker."""
+        manager = SessionManager(max_sessions=4)
+        manager.start("local", FakeLoop(), audio_io=True)
+        assert "Local audio is in use" in manager.admit("remote", audio_io=True)
+        manager.start("remote", FakeLoop(), audio_io=False)
+        assert manager.audio_owner == "local"
+        await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_duplicate_id_rejected(self):
+        manager = SessionManager()
+        manager.start("a", FakeLoop(), audio_io=False)
+        assert "already running" in manager.admit("a", audio_io=False)
+        await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_stop_frees_slot_and_audio(self):
+        manager = SessionManager(max_sessions=1)
+        loop = FakeLoop()
+        fanout = FakeFanout()
+        manager.start("local", loop, audio_io=True, fanout=fanout)
+        assert manager.stop("local").loop is loop
+        assert loop.stop_event.is_set() and fanout.closed
+        assert manager.admit("next", audio_io=True) is None
+
+    @pytest.mark.asyncio
+    async def test_crashed_session_released(self):
+        manager = SessionManager(max_sessions=1)
+        manager.start("a", FakeLoop(fail=True), audio_io=True)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert len(manager) == 0 and manager.audio_owner is None
+        assert manager.stats()["crashed"] == 1
+
+
+class TestClients:
+    """Test client attachment and event audiences."""
+
+    @pytest.mark.asyncio
+    async def test_unattached_clients_follow_primary(self):
+        manager = SessionManager()
+        local = manager.start("local", FakeLoop(), audio_io=True)
+        remote = manager.start("remote", FakeLoop(), audio_io=False)
+        manager.attach("sid-remote", "remote")
+        assert manager.for_client("sid-desktop") is local
+        assert manager.for_client("sid-remote") is remote
+        clients = ["sid-desktop", "sid-remote"]
+        assert manager.audience(local, clients) == ["sid-desktop"]
+        assert manager.audience(remote, clients) == ["sid-remote"]
+        await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_detach(self):
+        manager = SessionManager()
+        session = manager.start("a", FakeLoop(), audio_io=False)
+        manager.attach("sid", "a")
+        assert manager.detach("sid") is session
+        assert not session.clients and manager.session_of("sid") is None
+        await manager.stop_all()
+
+    def test_attach_unknown_session(self):
+        assert SessionManager().attach("sid", "missing") is None
+
+
+class TestAccounting:
+    """Test per-session usage reporting."""
+
+    @pytest.mark.asyncio
+    async def test_usage(self):
+        manager = SessionManager()
+        manager.start("a", FakeLoop(), audio_io=False, fanout=FakeFanout(), permissions={"kill_process": True})
+        manager.attach("sid", "a")
+        usage = manager.stats()["sessions"]["a"]
+        assert usage["clients"] == 1 and usage["running"] and not usage["audio_io"]
+        assert usage["voice_turns"] == 3 and usage["tool_calls"] == 1
+        assert usage["model_audio_bytes"] == 100 and usage["audio_bytes_emitted"] == 40
+        assert manager.get("a").permissions == {"kill_process": True}
+        await manager.stop_all()
+
+    @pytest.mark.asyncio
+    async def test_on_change(self):
+        changes = []
+        manager = SessionManager(on_change=lambda: changes.append(len(manager)))
+        manager.start("a", FakeLoop(), audio_io=False)
+        manager.stop("a")
+        assert changes == [1, 0]
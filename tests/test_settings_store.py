@@ -0,0 +1,142 @@
+"""
+Tests for the write-behind settings store.
+"""
+import asyncio
+import json
+import os
+
+import pytest
+
+from settings_store import SettingsStore
+
+DEFAULTS = {"tool_permissions": {"web_search": False, "kill_process": True}, "printers": [], "fps": 1.0}
+
+
+class TestSettingsStore:
+    """Test loading, updates, notifications and persistence."""
+
+    def test_load_merges_over_defaults(self, tmp_path):
+        path = tmp_path / "settings.json"
+        path.write_text(json.dumps({"tool_permissions": {"web_search": True}, "fps": 2.0}))
+        store = SettingsStore(path, DEFAULTS)
+        store.load()
+        assert store["tool_permissions"] == {"web_search": True, "kill_process": True}
+        assert store["fps"] == 2.0 and store["printers"] == []
+        # Defaults are copied, not shared
+        assert DEFAULTS["tool_permissions"]["web_search"] is False
+
+    def test_update_versions_and_notifies(self, tmp_path):
+        """Only real changes bump the version and reach matching subscribers."""
+        store = SettingsStore(tmp_path / "settings.json", DEFAULTS)
+        seen, perms = [], []
+        store.subscribe(seen.append)
+        store.subscribe(perms.append, keys=("tool_permissions",))
+        assert store.update({"fps": 1.0}) == {}
+        assert store.version == 0
+        store.update({"tool_permissions": {"web_search": True}})
+        store.update({"fps": 5.0})
+        assert store.version == 2
+        assert seen == [{"tool_permissions": {"web_search": True, "kill_process": True}}, {"fps": 5.0}]
+        assert perms == [{"tool_permissions": {"web_search": True, "kill_process": True}}]
+
+    def test_subscriber_error_does_not_block_update(self, tmp_path):
+        store = SettingsStore(tmp_path / "settings.json", DEFAULTS)
+        store.subscribe(lambda changes: 1 / 0)
+        assert store.update({"fps": 3.0}) == {"fps": 3.0}
+        assert store["fps"] == 3.0
+
+    @pytest.mark.asyncio
+    async def test_debounced_single_write(self, tmp_path):
+        """A burst of slider updates is written once, with the final value."""
+        path = tmp_path / "settings.json"
+        store = SettingsStore(path, DEFAULTS, debounce=0.05)
+        for i in range(30):
+            store.update({"fps": float(i)})
+        assert not path.exists()
+        await asyncio.sleep(0.2)
+        assert json.loads(path.read_text())["fps"] == 29.0
+        stats = store.stats()
+        assert stats["writes"] == 1 and stats["updates"] == 30 and not stats["dirty"]
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_immediately(self, tmp_path):
+        path = tmp_path / "settings.json"
+        store = SettingsStore(path, DEFAULTS, debounce=60)
+        store.update({"printers": [{"host": "10.0.0.5"}]})
+        await store.flush()
+        assert json.loads(path.read_text())["printers"] == [{"host": "10.0.0.5"}]
+        await store.flush()
+        assert store.stats()["writes"] == 1
+
+    def test_stale_version_not_written(self, tmp_path):
+        """A write serialized at an older version never replaces a newer file."""
+        path = tmp_path / "settings.json"
+        store = SettingsStore(path, DEFAULTS)
+        old = store._snapshot()
+        store.update({"fps": 9.0})
+        store.flush_sync()
+        store._write(*old)
+        assert json.loads(path.read_text())["fps"] == 9.0
+
+    def test_atomic_write_leaves_no_temp_files(self, tmp_path):
+        path = tmp_path / "settings.json"
+        path.write_text("{}")
+        store = SettingsStore(path, DEFAULTS)
+        store.update({"fps": 4.0}) # no running loop: written straight away
+        assert json.loads(path.read_text())["fps"] == 4.0
+        assert os.listdir(tmp_path) == ["settings.json"]
+
+    def test_failed_write_keeps_old_file(self, tmp_path, monkeypatch):
+        path = tmp_path / "settings.json"
+        path.write_text('{"fps": 1.0}')
+        store = SettingsStore(path, DEFAULTS)
+
+        def broken_replace(src, dst):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(os, "replace", broken_replace)
+        store.update({"fps": 7.0})
+        assert json.loads(path.read_text()) == {"fps": 1.0}
+        assert os.listdir(tmp_path) == ["settings.json"]
+        assert store.stats()["write_errors"] == 1 and store.stats()["dirty"]
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_retried(self, tmp_path, monkeypatch):
+        """A failed debounced write is retried without waiting for another change."""
+        path = tmp_path / "settings.json"
+        store = SettingsStore(path, DEFAULTS, debounce=0.01)
+        real_replace = os.replace
+        calls = []
+
+        def flaky_replace(src, dst):
+            calls.append(src)
+            if len(calls) == 1:
+                raise OSError("disk full")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(os, "replace", flaky_replace)
+        store.update({"fps": 5.0})
+        await asyncio.sleep(0.3)
+        assert json.loads(path.read_text())["fps"] == 5.0
+        stats = store.stats()
+        assert stats["write_errors"] == 1 and stats["writes"] == 1 and not stats["dirty"]
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_write_keeps_file_mode(self, tmp_path):
+        """The replaced settings.json keeps its permissions."""
+        path = tmp_path / "settings.json"
+        path.write_text("{}")
+        os.chmod(path, 0o640)
+        store = SettingsStore(path, DEFAULTS)
+        store.update({"fps": 2.0})
+        assert json.loads(path.read_text())["fps"] == 2.0
+        assert os.stat(path).st_mode & 0o777 == 0o640
+
+    @pytest.mark.skipif(os.name != "posix", reason="POSIX file modes")
+    def test_new_file_not_private(self, tmp_path):
+        """A new settings.json gets the same mode as any file open() creates, not 0600."""
+        reference = tmp_path / "reference.json"
+        reference.write_text("{}")
+        path = tmp_path / "settings.json"
+        SettingsStore(path, DEFAULTS).update({"fps": 2.0})
+        assert os.stat(path).st_mode & 0o777 == os.stat(reference).st_mode & 0o777
@@ -0,0 +1,52 @@
+"""
+Tests for the upstream silence gate.
+"""
+from silence_gate import SilenceGate
+
+CHUNK = b"\x01\x00" * 1024
+CHUNK_SECONDS = 1024 / 16000
+
+
+class TestSilenceGate:
+    """Test gating, pre-roll replay and keepalives."""
+
+    def run_silence(self, gate, start, seconds):
+        out = []
+        now = start
+        while now < start + seconds:
+            out.extend(gate.process(CHUNK, False, None, now=now))
+            now += CHUNK_SECONDS
+        return out, now
+
+    def test_forwards_until_silence_window(self):
+        """Audio flows for silence_window seconds, then the gate closes."""
+        gate = SilenceGate(silence_window=1.0, keepalive_interval=0)
+        gate.process(CHUNK, True, None, now=0.0)
+        out, _ = self.run_silence(gate, CHUNK_SECONDS, 3.0)
+        # About 1 s of chunks forwarded, the rest gated
+        assert 14 <= len(out) <= 17
+        assert not gate.is_open
+        assert gate.stats()["bytes_saved"] > 0
+
+    def test_pre_roll_replayed_on_speech(self):
+        """Gated chunks in the pre-roll ring are sent ahead of the onset chunk."""
+        gate = SilenceGate(silence_window=0.5, pre_roll=0.2, keepalive_interval=0)
+        _, now = self.run_silence(gate, 0.0, 2.0)
+        assert not gate.is_open
+        onset = b"\x02\x00" * 1024
+        out = gate.process(onset, True, None, now=now)
+        assert out[-1] == onset
+        assert len(out) == 1 + 4  # ceil(0.2 / 0.064) pre-roll chunks
+        assert gate.is_open
+        stats = gate.stats()
+        assert stats["gate_opens"] == 1
+        assert stats["bytes_forwarded"] + stats["bytes_saved"] == stats["bytes_captured"]
+
+    def test_keepalive_while_gated(self):
+        """A short silent frame is emitted every keepalive_interval while gated."""
+        gate = SilenceGate(silence_window=0.5, keepalive_interval=1.0, keepalive_ms=20)
+        gate.process(CHUNK, True, None, now=0.0)
+        out, _ = self.run_silence(gate, CHUNK_SECONDS, 4.0)
+        keepalives = [b for b in out if b == gate.keepalive_frame]
+        assert len(gate.keepalive_frame) == 640
+        assert len(keepalives) == gate.stats()["keepalives_sent"] >= 2
@@ -0,0 +1,135 @@
+"""
+Tests for the TTL/LRU tool result cache.
+"""
+import pytest
+
+from tool_cache import ToolCache, normalize_args
+from tool_registry import ToolFailure, ToolRegistry
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNormalizeArgs:
+    """Test argument normalization for cache keys."""
+
+    def test_equivalent_args_match(self):
+        """Key order, case, whitespace and None values don't matter."""
+        a = normalize_args({"query": "  Weather in  Paris", "limit": 5, "lang": None})
+        b = normalize_args({"limit": 5, "query": "weather in paris"})
+        assert a == b
+
+    def test_different_args_differ(self):
+        assert normalize_args({"query": "paris"}) != normalize_args({"query": "london"})
+        assert normalize_args(None) == normalize_args({})
+
+
+class TestToolCache:
+    """Test TTL expiry, LRU eviction and invalidation."""
+
+    def test_hit_until_ttl_expires(self):
+        clock = FakeClock()
+        cache = ToolCache(clock=clock)
+        cache.put("web_search", {"query": "x"}, "result", ttl=60)
+        assert cache.get("web_search", {"query": "X "}) == (True, "result")
+        clock.now = 61
+        assert cache.get("web_search", {"query": "x"}) == (False, None)
+        assert len(cache) == 0
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self):
+        """The least recently used entry goes first."""
+        cache = ToolCache(max_entries=2, clock=FakeClock())
+        cache.put("t", {"n": 1}, "one", ttl=60)
+        cache.put("t", {"n": 2}, "two", ttl=60)
+        cache.get("t", {"n": 1})
+        cache.put("t", {"n": 3}, "three", ttl=60)
+        assert cache.get("t", {"n": 2}) == (False, None)
+        assert cache.get("t", {"n": 1}) == (True, "one")
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate_by_tool(self):
+        cache = ToolCache(clock=FakeClock())
+        cache.put("get_today_schedule", {}, "9am standup", ttl=60)
+        cache.put("web_search", {"query": "x"}, "r", ttl=60)
+        assert cache.invalidate("get_today_schedule") == 1
+        assert cache.get("get_today_schedule", {}) == (False, None)
+        assert cache.get("web_search", {"query": "x"})[0]
+
+
+class TestRegistryCaching:
+    """Test the cache in front of the tool registry."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_call_served_from_cache(self):
+        runs = []
+
+        async def search(args):
+            runs.append(args["query"])
+            return f"results for {args['query']}"
+
+        reg = ToolRegistry(cache=ToolCache())
+        reg.register("web_search", search, cache_ttl=300)
+        assert await reg.call("web_search", {"query": "python"}) == "results for python"
+        assert await reg.call("web_search", {"query": " Python"}) == "results for python"
+        assert runs == ["python"]
+        assert reg.stats()["tools"]["web_search"]["cache_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_errors_not_cached(self):
+        runs = []
+
+        async def flaky(args):
+            runs.append(1)
+            if len(runs) == 1:
+                raise RuntimeError("offline")
+            return "ok"
+
+        reg = ToolRegistry(cache=ToolCache())
+        reg.register("wikipedia_lookup", flaky, cache_ttl=60)
+        assert "offline" in await reg.call("wikipedia_lookup", {})
+        assert await reg.call("wikipedia_lookup", {}) == "ok"
+        assert len(runs) == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_text_not_cached(self):
+        """A failure reported as text reaches the model but isn't served again from the cache."""
+        runs = []
+
+        async def search(args):
+            runs.append(1)
+            if len(runs) == 1:
+                return ToolFailure("Search failed: rate limited")
+            return "results"
+
+        reg = ToolRegistry(cache=ToolCache())
+        reg.register("web_search", search, cache_ttl=300)
+        assert await reg.call("web_search", {"query": "x"}) == "Search failed: rate limited"
+        assert await reg.call("web_search", {"query": "x"}) == "results"
+        assert len(runs) == 2
+        assert reg.stats()["tools"]["web_search"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_side_effect_invalidates(self):
+        """reschedule_event drops the cached schedule."""
+        schedule = ["9:00 standup"]
+
+        async def get_schedule(args):
+            return ", ".join(schedule)
+
+        async def reschedule(args):
+            schedule[0] = "10:00 standup"
+            return "Event rescheduled successfully."
+
+        reg = ToolRegistry(cache=ToolCache())
+        reg.register("get_today_schedule", get_schedule, cache_ttl=60)
+        reg.register("reschedule_event", reschedule, invalidates=("get_today_schedule",))
+        assert await reg.call("get_today_schedule", {}) == "9:00 standup"
+        await reg.call("reschedule_event", {"event_id": "1"})
+        assert await reg.call("get_today_schedule", {}) == "10:00 standup"
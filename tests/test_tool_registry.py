@@ -0,0 +1,140 @@
+"""
+Tests for the tool registry and concurrent function-call dispatch.
+"""
+import asyncio
+import time
+
+import pytest
+
+from tool_registry import ToolRegistry
+
+
+class FakeCall:
+    def __init__(self, name, args=None):
+        self.name = name
+        self.args = args or {}
+
+
+def sleeper(delay, result):
+    async def handler(args):
+        await asyncio.sleep(delay)
+        return result
+    return handler
+
+
+class TestToolRegistry:
+    """Test registration, execution options and stats."""
+
+    @pytest.mark.asyncio
+    async def test_foreground_result(self):
+        """Foreground tools return their handler's result."""
+        reg = ToolRegistry()
+        reg.register("echo", sleeper(0, "hi"))
+        assert "echo" in reg
+        assert await reg.call("echo", {}) == "hi"
+        assert reg.stats()["tools"]["echo"]["calls"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_handler_runs_in_thread(self):
+        """Plain handlers run off the event loop."""
+        reg = ToolRegistry()
+        reg.register("blocking", lambda args: args["x"] * 2)
+        assert await reg.call("blocking", {"x": 21}) == 42
+
+    @pytest.mark.asyncio
+    async def test_background_acks_immediately(self):
+        """Background tools answer with their ack while the handler keeps running."""
+        done = asyncio.Event()
+
+        async def handler(args):
+            await asyncio.sleep(0.05)
+            done.set()
+
+        reg = ToolRegistry()
+        reg.register("bg", handler, background=True, ack="Started.")
+        assert await reg.call("bg", {}) == "Started."
+        assert not done.is_set()
+        assert reg.stats()["background_running"] == 1
+        await asyncio.wait_for(done.wait(), 1.0)
+
+    @pytest.mark.asyncio
+    async def test_timeout_and_error_become_results(self):
+        """Timeouts and exceptions are reported to the model, not raised."""
+        async def boom(args):
+            raise RuntimeError("no printer")
+
+        reg = ToolRegistry()
+        reg.register("slow", sleeper(1.0, "late"), timeout=0.05)
+        reg.register("boom", boom)
+        assert "timed out" in await reg.call("slow", {})
+        assert "no printer" in await reg.call("boom", {})
+        stats = reg.stats()["tools"]
+        assert stats["slow"]["timeouts"] == 1
+        assert stats["boom"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """A tool with concurrency=1 never runs twice at once."""
+        running = 0
+        peak = 0
+
+        async def handler(args):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            return "ok"
+
+        reg = ToolRegistry()
+        reg.register("serial", handler, concurrency=1)
+        await asyncio.gather(*(reg.call("serial", {}) for _ in range(3)))
+        assert peak == 1
+        assert reg.stats()["tools"]["serial"]["wait_ms"]["max"] > 0
+
+
+class TestDispatch:
+    """Test concurrent dispatch of one tool_call message."""
+
+    @pytest.mark.asyncio
+    async def test_calls_run_concurrently_and_respond_in_completion_order(self):
+        """Two 0.1 s tools finish in ~0.1 s, and the fast one responds first."""
+        reg = ToolRegistry()
+        reg.register("slow", sleeper(0.1, "slow"))
+        reg.register("fast", sleeper(0.02, "fast"))
+        responses = []
+
+        async def execute(fc):
+            return await reg.call(fc.name, fc.args)
+
+        async def respond(result):
+            responses.append(result)
+
+        start = time.monotonic()
+        await reg.dispatch([FakeCall("slow"), FakeCall("slow"), FakeCall("fast")], execute, respond)
+        assert time.monotonic() - start < 0.18
+        assert responses[0] == "fast"
+        assert sorted(responses) == ["fast", "slow", "slow"]
+
+    @pytest.mark.asyncio
+    async def test_none_results_and_failures_are_skipped(self):
+        """No response for None results; one failing call doesn't stop the others."""
+        responses = []
+
+        async def execute(fc):
+            if fc.name == "bad":
+                raise RuntimeError("bad call")
+            return None if fc.name == "silent" else fc.name
+
+        async def respond(result):
+            responses.append(result)
+
+        await ToolRegistry().dispatch([FakeCall("bad"), FakeCall("silent"), FakeCall("ok")], execute, respond)
+        assert responses == ["ok"]
+
+    def test_denied_counted(self):
+        """Denials show up in the stats."""
+        reg = ToolRegistry()
+        reg.register("kill_process", sleeper(0, "ok"))
+        reg.record_denied("kill_process")
+        assert reg.stats()["tools"]["kill_process"]["denied"] == 1
@@ -0,0 +1,79 @@
+"""
+Tests for the microphone Voice Activity Detector.
+"""
+import math
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from vad import VoiceActivityDetector, pcm16_rms, SPEECH_START, SPEECH_END
+
+CHUNK_SIZE = 1024
+CHUNK_SECONDS = CHUNK_SIZE / 16000
+
+
+def make_chunk(amplitude, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.normal(0, amplitude, CHUNK_SIZE).clip(-32768, 32767).astype("<i2").tobytes()
+
+
+class TestPcmRms:
+    """Test the NumPy RMS helper."""
+
+    def test_matches_struct_path(self):
+        """RMS matches the legacy struct.unpack computation."""
+        data = make_chunk(2000)
+        shorts = struct.unpack(f"<{len(data) // 2}h", data)
+        expected = math.sqrt(sum(s**2 for s in shorts) / len(shorts))
+        assert pcm16_rms(data) == pytest.approx(expected, rel=1e-4)
+
+    def test_empty_and_odd_buffers(self):
+        """Empty buffers are silent and a trailing odd byte is ignored."""
+        assert pcm16_rms(b"") == 0.0
+        assert pcm16_rms(b"\x00") == 0.0
+        assert pcm16_rms(struct.pack("<h", 1000) + b"\x7f") == pytest.approx(1000.0)
+
+
+class TestVoiceActivityDetector:
+    """Test utterance boundaries, noise floor and pre-roll."""
+
+    def test_onset_and_hangover(self):
+        """Speech starts on a loud chunk and ends only after the hangover."""
+        vad = VoiceActivityDetector(hangover=0.5)
+        now = 0.0
+        assert vad.process(make_chunk(50), now=now) is None
+        now += CHUNK_SECONDS
+        assert vad.process(make_chunk(5000), now=now) == SPEECH_START
+        assert vad.is_speaking
+
+        events = []
+        for i in range(20):
+            now += CHUNK_SECONDS
+            events.append(vad.process(make_chunk(50, seed=i), now=now))
+        assert events.count(SPEECH_END) == 1
+        # 0.5 s of hangover is at least 8 chunks of 64 ms
+        assert events.index(SPEECH_END) >= 8
+        assert not vad.is_speaking
+
+    def test_noise_floor_adapts(self):
+        """A steady background raises the floor so it no longer triggers speech."""
+        vad = VoiceActivityDetector(min_threshold=100.0, initial_noise_floor=50.0)
+        for i in range(200):
+            vad.process(make_chunk(400, seed=i), now=i * CHUNK_SECONDS)
+        assert vad.noise_floor > 300
+        assert not vad.is_speaking
+        assert vad.threshold > 400
+
+    def test_pre_roll_keeps_onset_context(self):
+        """Pre-roll holds the chunks leading into the onset chunk."""
+        vad = VoiceActivityDetector(pre_roll=0.2)
+        quiet = [make_chunk(50, seed=i) for i in range(10)]
+        for i, c in enumerate(quiet):
+            vad.process(c, now=i * CHUNK_SECONDS)
+        loud = make_chunk(5000)
+        assert vad.process(loud, now=1.0) == SPEECH_START
+        chunks = vad.pre_roll_chunks()
+        assert chunks[-1] == loud
+        assert chunks[:-1] == quiet[-(len(chunks) - 1):]